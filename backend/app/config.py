@@ -1,7 +1,7 @@
 """Application Configuration"""
 
 from pydantic_settings import BaseSettings
-from typing import Literal
+from typing import Literal, Optional
 
 
 class Settings(BaseSettings):
@@ -23,12 +23,46 @@ class Settings(BaseSettings):
     frontend_url: str = "http://localhost:3000"
     environment: Literal["development", "production"] = "development"
 
+    # Direct Postgres (asyncpg pool); without it the Supabase client is used
+    database_url: Optional[str] = None
+    database_pool_min_size: int = 1
+    database_pool_max_size: int = 10
+    database_statement_cache_size: int = 100  # 0 behind a transaction-mode pooler
+    database_command_timeout_seconds: float = 5.0
+    voice_session_bootstrap_rpc: bool = False  # without DATABASE_URL; requires migrations/005
+
     # Security
     tool_callback_secret: str
 
     # Optional
     swisseph_path: str = "/usr/share/swisseph"
 
+    # Astro engine
+    transit_cache_bucket_seconds: int = 60
+    transit_cache_max_entries: int = 128
+    astro_batch_workers: int = 0  # 0 = all cores
+    astro_batch_chunk_size: int = 1000
+    astro_executor: Literal["thread", "process"] = "thread"
+    astro_pool_size: int = 4
+    astro_call_timeout_seconds: float = 5.0
+    natal_chart_cache_size: int = 4096
+    exact_time_cache_size: int = 4096
+    exact_time_cache_ttl_seconds: int = 3600
+    chebyshev_ephemeris_path: Optional[str] = None
+    forecast_max_days: int = 366
+    event_catalog_path: Optional[str] = None  # built by app.services.event_catalog
+    astrocartography_lat_step: float = 0.5
+    astrocartography_cache_size: int = 1024
+    astrocartography_target_ms: float = 50.0  # logged as slow above this
+    transit_session_max_entries: int = 1024
+    transit_session_ttl_seconds: int = 3600
+    transit_session_max_age_seconds: int = 600  # orbs refreshed at least this often
+    session_context_cache_size: int = 1024  # entries expire with the signed URL
+    context_branch_timeout_seconds: float = 2.0  # per data type in get_context
+    natal_chart_cache_path: Optional[str] = None  # SQLite file for the disk tier
+    natal_chart_cache_disk_max_rows: int = 100000  # oldest charts are dropped beyond this
+    natal_payload_v2_reads: bool = False  # enable after migrations/003_natal_payload_v2.sql
+
     # DSGVO
     current_consent_version: str = "v1.0.0"
     voice_session_retention_days: int = 90
@@ -7,6 +7,9 @@ import jwt
 from supabase import create_client, Client
 from app.config import settings
 from app.models.user import User
+from app.repositories.base import Repositories
+from app.repositories.supabase import supabase_repositories
+from app.services.astro_engine import AstroEngine
 import logging
 
 logger = logging.getLogger(__name__)
@@ -32,6 +35,25 @@ def get_supabase() -> Client:
     return _supabase_client
 
 
+def get_repositories(request: Request, supabase: Client = Depends(get_supabase)) -> Repositories:
+    """
+    Get the data repositories.
+
+    asyncpg on the application pool when DATABASE_URL is set (created in
+    the lifespan), else the Supabase client. An override of get_supabase
+    (tests) always wins.
+    """
+    repositories = getattr(request.app.state, "repositories", None)
+    if repositories is None or get_supabase in request.app.dependency_overrides:
+        return supabase_repositories(supabase)
+    return repositories
+
+
+def get_astro_engine(request: Request) -> AstroEngine:
+    """Get the application-lifetime astro engine (created in the lifespan)"""
+    return request.app.state.astro_engine
+
+
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     supabase: Client = Depends(get_supabase)
@@ -0,0 +1,89 @@
+"""
+Backfill natal_charts.payload_v2 (binary payload format v2).
+
+Walks natal charts without a v2 payload in id order (keyset pagination)
+and stores the compact encoding next to the JSON payload. Payloads that
+can't be encoded losslessly are skipped and keep being read as JSON.
+Safe to re-run; every run only touches rows that are still pending.
+
+Usage:
+    python -m app.jobs.backfill_payload_v2 --batch-size 500
+"""
+
+from typing import Dict, List, Optional
+import argparse
+from supabase import Client
+from app.services.chart_codec import encode_payload
+from app.services.natal_chart_store import PAYLOAD_FORMAT_V2
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def backfill_payload_v2(
+    supabase: Client,
+    batch_size: int = 500,
+    limit: Optional[int] = None
+) -> Dict[str, int]:
+    """
+    Encode pending natal chart payloads.
+
+    Args:
+        supabase: Supabase client (service role)
+        batch_size: Rows fetched per page
+        limit: Stop after this many rows (all pending rows if None)
+
+    Returns:
+        Counts of encoded and skipped rows
+    """
+    counts = {"encoded": 0, "skipped": 0}
+    last_id: Optional[str] = None
+
+    while limit is None or counts["encoded"] + counts["skipped"] < limit:
+        page_size = batch_size if limit is None else min(batch_size, limit - counts["encoded"] - counts["skipped"])
+
+        query = supabase.table("natal_charts") \
+            .select("id, payload") \
+            .is_("payload_v2", "null")
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        rows: List[dict] = query.order("id").limit(page_size).execute().data
+
+        for row in rows:
+            try:
+                encoded = encode_payload(row["payload"])
+            except ValueError as e:
+                logger.warning(f"Natal chart {row['id']} kept as JSON: {e}")
+                counts["skipped"] += 1
+                continue
+
+            supabase.table("natal_charts") \
+                .update({"payload_v2": "\\x" + encoded.hex(), "payload_format": PAYLOAD_FORMAT_V2}) \
+                .eq("id", row["id"]) \
+                .execute()
+            counts["encoded"] += 1
+
+        if len(rows) < page_size:
+            break
+        last_id = rows[-1]["id"]
+        logger.info(f"Backfilled {counts['encoded']} natal charts ({counts['skipped']} skipped)")
+
+    return counts
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the backfill from the command line"""
+    from app.dependencies import get_supabase
+
+    parser = argparse.ArgumentParser(description="Backfill natal_charts.payload_v2")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per page")
+    parser.add_argument("--limit", type=int, default=None, help="Maximum rows to process")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    counts = backfill_payload_v2(get_supabase(), batch_size=args.batch_size, limit=args.limit)
+    print(f"Encoded {counts['encoded']} natal charts, skipped {counts['skipped']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Checkpoints for resumable batch jobs (batch_job_checkpoints table)"""
+
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+from supabase import Client
+
+CHECKPOINT_TABLE = "batch_job_checkpoints"
+
+
+def load_checkpoint(supabase: Client, job: str, run_key: str) -> Optional[Dict[str, Any]]:
+    """
+    Load a job run's checkpoint.
+
+    Returns:
+        Row with cursor, processed and finished_at, or None for a new run
+    """
+    response = supabase.table(CHECKPOINT_TABLE) \
+        .select("cursor, processed, finished_at") \
+        .eq("job", job) \
+        .eq("run_key", run_key) \
+        .limit(1) \
+        .execute()
+    return response.data[0] if response.data else None
+
+
+def save_checkpoint(
+    supabase: Client,
+    job: str,
+    run_key: str,
+    cursor: Optional[str],
+    processed: int,
+    finished: bool = False
+) -> None:
+    """Record progress after a committed page (or the end of the run)"""
+    now = datetime.now(timezone.utc).isoformat()
+    supabase.table(CHECKPOINT_TABLE) \
+        .upsert({
+            "job": job,
+            "run_key": run_key,
+            "cursor": cursor,
+            "processed": processed,
+            "finished_at": now if finished else None,
+            "updated_at": now
+        }, on_conflict="job,run_key") \
+        .execute()
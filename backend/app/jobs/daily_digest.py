@@ -0,0 +1,245 @@
+"""
+Nightly daily transit digest for all users.
+
+Walks users in id order (keyset pagination over natal_charts), takes
+each user's most recent natal chart and matches the whole page against
+the day's sky in one vectorized pass (one sky position lookup per run,
+see SkyCache). The tightest aspects per user are bulk-upserted into
+daily_transit_digests.
+
+Progress is checkpointed after every page in batch_job_checkpoints, so
+a crashed run resumes after the last committed page; a finished run is
+not repeated unless --restart is given.
+
+Usage:
+    python -m app.jobs.daily_digest --date 2025-01-31 --batch-size 1000
+"""
+
+from datetime import date, datetime, time, timezone
+from typing import Any, Dict, List, Mapping, Optional
+import argparse
+import time as clock
+import numpy as np
+from supabase import Client
+from app.config import settings
+from app.jobs.checkpoints import load_checkpoint, save_checkpoint
+from app.services.aspects import natal_longitudes
+from app.services.astro import AstroService, sky_cache
+from app.services.chart_codec import decode_payload, is_encoded
+import logging
+
+logger = logging.getLogger(__name__)
+
+JOB = "daily_digest"
+DIGEST_TABLE = "daily_transit_digests"
+
+# Aspects kept per user, tightest orb first
+DIGEST_MAX_ASPECTS = 12
+
+# Transits are taken at noon UTC of the digest date
+DIGEST_TIME = time(12, 0)
+
+
+def run_daily_digest(
+    supabase: Client,
+    digest_date: date,
+    batch_size: int = 1000,
+    restart: bool = False
+) -> Dict[str, Any]:
+    """
+    Compute and store the digest of every user for one day.
+
+    Args:
+        supabase: Supabase client (service role)
+        digest_date: Day of the digest
+        batch_size: natal_charts rows fetched per page
+        restart: Ignore an existing checkpoint and start from the first user
+
+    Returns:
+        Run statistics: charts computed in this run, total processed for
+        the date, elapsed seconds and charts per second
+    """
+    run_key = digest_date.isoformat()
+    checkpoint = None if restart else load_checkpoint(supabase, JOB, run_key)
+
+    if checkpoint and checkpoint.get("finished_at"):
+        logger.info(f"Daily digest for {run_key} already finished at {checkpoint['finished_at']}")
+        return {"charts": 0, "processed": checkpoint["processed"], "seconds": 0.0, "charts_per_second": 0.0}
+
+    cursor: Optional[str] = checkpoint["cursor"] if checkpoint else None
+    processed: int = checkpoint["processed"] if checkpoint else 0
+    if cursor:
+        logger.info(f"Resuming daily digest for {run_key} after user {cursor} ({processed} done)")
+
+    service = AstroService()
+    sky = sky_cache.get(datetime.combine(digest_date, DIGEST_TIME, tzinfo=timezone.utc))
+    transit_names = list(sky.longitudes)
+    transit_lons = np.fromiter(sky.longitudes.values(), dtype=np.float64)
+
+    charts = 0
+    started = clock.perf_counter()
+
+    while True:
+        rows = _fetch_page(supabase, cursor, batch_size)
+        if not rows:
+            break
+
+        latest = _latest_per_user(rows)
+        payloads = _load_payloads(supabase, latest)
+        digests = build_digests(service, transit_names, transit_lons, latest, payloads, digest_date)
+
+        if digests:
+            supabase.table(DIGEST_TABLE) \
+                .upsert(digests, on_conflict="user_id,digest_date") \
+                .execute()
+
+        cursor = rows[-1]["user_id"]
+        charts += len(latest)
+        processed += len(latest)
+        save_checkpoint(supabase, JOB, run_key, cursor, processed)
+
+        elapsed = clock.perf_counter() - started
+        logger.info(f"Daily digest {run_key}: {processed} users ({charts / elapsed:.0f} charts/s)")
+
+        if len(rows) < batch_size:
+            break
+
+    save_checkpoint(supabase, JOB, run_key, cursor, processed, finished=True)
+
+    elapsed = clock.perf_counter() - started
+    return {
+        "charts": charts,
+        "processed": processed,
+        "seconds": round(elapsed, 3),
+        "charts_per_second": round(charts / elapsed, 1) if elapsed > 0 else 0.0
+    }
+
+
+def build_digests(
+    service: AstroService,
+    transit_names: List[str],
+    transit_lons: np.ndarray,
+    rows: List[Dict[str, Any]],
+    payloads: Dict[str, Mapping[str, Any]],
+    digest_date: date
+) -> List[Dict[str, Any]]:
+    """
+    Match a page of natal charts against the day's sky in one pass.
+
+    Returns:
+        daily_transit_digests rows (charts without a payload are skipped)
+    """
+    rows = [row for row in rows if row["id"] in payloads]
+    if not rows:
+        return []
+
+    # (C, P) natal longitudes in transit planet order, NaN when missing
+    stacked = np.full((len(rows), len(transit_names)), np.nan)
+    column = {name: i for i, name in enumerate(transit_names)}
+    for c, row in enumerate(rows):
+        names, lons = natal_longitudes(payloads[row["id"]])
+        for name, lon in zip(names, lons.tolist()):
+            if name in column:
+                stacked[c, column[name]] = lon
+
+    hits = service.aspect_kernel.match(transit_lons, stacked)
+
+    # Tightest first within each chart
+    order = np.lexsort((hits.orb, hits.chart))
+    chart = hits.chart[order].tolist()
+    transit = hits.transit[order].tolist()
+    natal = hits.natal[order].tolist()
+    aspect = hits.aspect[order].tolist()
+    orb = hits.orb[order].tolist()
+
+    aspects: List[List[List[Any]]] = [[] for _ in rows]
+    for c, t, n, a, o in zip(chart, transit, natal, aspect, orb):
+        if len(aspects[c]) < DIGEST_MAX_ASPECTS:
+            aspects[c].append([transit_names[t], service.aspect_kernel.names[a], transit_names[n], round(o, 2)])
+
+    return [
+        {
+            "user_id": row["user_id"],
+            "digest_date": digest_date.isoformat(),
+            "natal_chart_id": row["id"],
+            "engine_version": AstroService.ENGINE_VERSION,
+            "aspects": aspects[c]
+        }
+        for c, row in enumerate(rows)
+    ]
+
+
+def _fetch_page(supabase: Client, cursor: Optional[str], batch_size: int) -> List[Dict[str, Any]]:
+    """Next page of natal chart rows, ordered by user (latest chart first)"""
+    columns = "id, user_id, payload_v2" if settings.natal_payload_v2_reads else "id, user_id, payload"
+    query = supabase.table("natal_charts").select(columns)
+    if cursor is not None:
+        query = query.gt("user_id", cursor)
+    return query \
+        .order("user_id") \
+        .order("computed_at", desc=True) \
+        .limit(batch_size) \
+        .execute() \
+        .data
+
+
+def _latest_per_user(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    First row of each user (rows are ordered by user, latest chart first).
+
+    A user whose charts continue on the next page is already covered:
+    the next page starts after this user.
+    """
+    latest = []
+    seen = set()
+    for row in rows:
+        if row["user_id"] not in seen:
+            seen.add(row["user_id"])
+            latest.append(row)
+    return latest
+
+
+def _load_payloads(supabase: Client, rows: List[Dict[str, Any]]) -> Dict[str, Mapping[str, Any]]:
+    """Payload per chart id: binary v2 where present, JSON for the rest (one extra query)"""
+    payloads: Dict[str, Mapping[str, Any]] = {}
+    pending = []
+    for row in rows:
+        if is_encoded(row.get("payload_v2")):
+            payloads[row["id"]] = decode_payload(row["payload_v2"])
+        elif row.get("payload"):
+            payloads[row["id"]] = row["payload"]
+        else:
+            pending.append(row["id"])
+
+    if pending:
+        response = supabase.table("natal_charts") \
+            .select("id, payload") \
+            .in_("id", pending) \
+            .execute()
+        for row in response.data:
+            payloads[row["id"]] = row["payload"]
+
+    return payloads
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the digest from the command line"""
+    from app.dependencies import get_supabase
+
+    parser = argparse.ArgumentParser(description="Compute the daily transit digest for all users")
+    parser.add_argument("--date", type=date.fromisoformat, default=None, help="Digest date (default: today, UTC)")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Rows per page")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint of this date")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    digest_date = args.date or datetime.now(timezone.utc).date()
+    stats = run_daily_digest(get_supabase(), digest_date, batch_size=args.batch_size, restart=args.restart)
+    print(
+        f"Digest {digest_date}: {stats['charts']} charts in {stats['seconds']} s "
+        f"({stats['charts_per_second']} charts/s), {stats['processed']} users total"
+    )
+
+
+if __name__ == "__main__":
+    main()
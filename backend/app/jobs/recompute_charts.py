@@ -0,0 +1,333 @@
+"""
+Recompute natal charts stored with an outdated engine version.
+
+Walks natal_charts whose engine_version differs from the current
+AstroService.ENGINE_VERSION in id order (keyset pagination), recomputes
+each page from birth_data on the batch process pool, diffs old and new
+payloads and writes the page back with one bulk upsert (JSON and v2
+payload, engine_version). computed_at is kept, so "latest chart per
+user" ordering does not change.
+
+Charts are skipped (and stay outdated) when the user has no birth data,
+the house system is unknown, or birth_data was edited after the chart
+was computed: the chart then belongs to earlier birth data that is no
+longer known.
+
+Writes are throttled to --max-rows-per-second. Progress is checkpointed
+per page in batch_job_checkpoints (run key = target engine version), so
+an interrupted run resumes after the last committed page.
+
+Usage:
+    python -m app.jobs.recompute_charts --batch-size 500 --max-rows-per-second 200
+    python -m app.jobs.recompute_charts --dry-run   # diff only, no writes
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Mapping, Optional
+import argparse
+import time as clock
+import numpy as np
+from supabase import Client
+from app.jobs.checkpoints import load_checkpoint, save_checkpoint
+from app.services.astro import AstroService
+from app.services.astro_batch import BirthBatch
+from app.services.chart_codec import encode_payload
+from app.services.natal_chart_store import PAYLOAD_FORMAT_JSON, PAYLOAD_FORMAT_V2
+import logging
+
+logger = logging.getLogger(__name__)
+
+JOB = "recompute_charts"
+
+# Longitude changes below this (degrees) are rounding noise, not a change
+DIFF_TOLERANCE = 1e-4
+
+
+def recompute_natal_charts(
+    supabase: Client,
+    batch_size: int = 500,
+    max_workers: Optional[int] = None,
+    max_rows_per_second: Optional[float] = None,
+    dry_run: bool = False,
+    restart: bool = False
+) -> Dict[str, Any]:
+    """
+    Recompute all natal charts not computed with the current engine version.
+
+    Args:
+        supabase: Supabase client (service role)
+        batch_size: natal_charts rows fetched (and written) per page
+        max_workers: Worker processes of the run's one pool (defaults to
+            settings / all cores)
+        max_rows_per_second: Write rate limit (unlimited if None)
+        dry_run: Compute and diff only; nothing (not even the checkpoint) is written
+        restart: Ignore an existing checkpoint and start from the first row
+
+    Returns:
+        Counts: updated, unchanged (payload identical), changed (sign,
+        house, angle or pattern differences), skipped per reason, plus
+        elapsed seconds and charts per second
+    """
+    target = AstroService.ENGINE_VERSION
+    checkpoint = None if restart or dry_run else load_checkpoint(supabase, JOB, target)
+
+    counts: Dict[str, Any] = {
+        "updated": 0,
+        "unchanged": 0,
+        "changed": 0,
+        "skipped": {"no_birth_data": 0, "birth_data_changed": 0, "house_system": 0}
+    }
+
+    if checkpoint and checkpoint.get("finished_at"):
+        logger.info(f"Recompute to {target} already finished at {checkpoint['finished_at']}")
+        return {**counts, "seconds": 0.0, "charts_per_second": 0.0}
+
+    cursor: Optional[str] = checkpoint["cursor"] if checkpoint else None
+    processed: int = checkpoint["processed"] if checkpoint else 0
+    if cursor:
+        logger.info(f"Resuming recompute to {target} after chart {cursor} ({processed} done)")
+
+    service = AstroService()
+    workers = service.batch_workers(max_workers)
+    started = clock.perf_counter()
+    charts = 0
+
+    # One pool for the whole run: workers start and load the ephemeris once
+    with service.natal_batch_pool(workers) as pool:
+        while True:
+            rows = _fetch_outdated(supabase, target, cursor, batch_size)
+            if not rows:
+                break
+
+            births = _load_births(supabase, {row["user_id"] for row in rows})
+            payloads = recompute_page(service, rows, births, counts["skipped"], workers, pool)
+
+            updates = []
+            for row in rows:
+                payload = payloads.get(row["id"])
+                if payload is None:
+                    continue
+
+                diff = diff_payloads(row["payload"], payload)
+                if diff is None:
+                    counts["unchanged"] += 1
+                else:
+                    counts["changed"] += 1
+                    logger.info(f"Natal chart {row['id']} ({row['engine_version']} -> {target}): {diff}")
+
+                updates.append(_update_row(row, payload, target))
+
+            if updates and not dry_run:
+                supabase.table("natal_charts") \
+                    .upsert(updates, on_conflict="id") \
+                    .execute()
+                counts["updated"] += len(updates)
+
+            cursor = rows[-1]["id"]
+            charts += len(updates)
+            processed += len(rows)
+            if not dry_run:
+                save_checkpoint(supabase, JOB, target, cursor, processed)
+                _throttle(started, counts["updated"], max_rows_per_second)
+
+            elapsed = clock.perf_counter() - started
+            logger.info(
+                f"Recompute to {target}: {processed} rows, {counts['changed']} changed "
+                f"({charts / elapsed:.0f} charts/s)"
+            )
+
+            if len(rows) < batch_size:
+                break
+
+    if not dry_run:
+        save_checkpoint(supabase, JOB, target, cursor, processed, finished=True)
+
+    elapsed = clock.perf_counter() - started
+    return {
+        **counts,
+        "seconds": round(elapsed, 3),
+        "charts_per_second": round(charts / elapsed, 1) if elapsed > 0 else 0.0
+    }
+
+
+def recompute_page(
+    service: AstroService,
+    rows: List[Dict[str, Any]],
+    births: Mapping[str, Dict[str, Any]],
+    skipped: Dict[str, int],
+    max_workers: Optional[int] = None,
+    executor: Optional[ProcessPoolExecutor] = None
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Recompute one page of natal charts on the batch process pool.
+
+    Rows are grouped by house system (one batch each). Rows that can't be
+    recomputed are counted in `skipped` by reason. Pass the run's pool as
+    `executor` (with its worker count as `max_workers`); otherwise a pool
+    is created per batch.
+
+    Returns:
+        New payload per chart id
+    """
+    groups: Dict[str, List[Dict[str, Any]]] = {}
+    for row in rows:
+        birth = births.get(row["user_id"])
+        house_code = AstroService.HOUSE_SYSTEMS.get((row.get("house_system") or "placidus").lower())
+        if birth is None:
+            skipped["no_birth_data"] += 1
+        elif house_code is None:
+            skipped["house_system"] += 1
+        elif _parse_time(birth["updated_at"]) > _parse_time(row["computed_at"]):
+            skipped["birth_data_changed"] += 1
+        else:
+            groups.setdefault(house_code, []).append(row)
+
+    payloads: Dict[str, Dict[str, Any]] = {}
+    for house_code, group in groups.items():
+        group_births = [births[row["user_id"]] for row in group]
+        batch_births = BirthBatch(
+            birth_utc=[_parse_time(birth["birth_utc"]) for birth in group_births],
+            lat=np.array([float(birth["lat"]) for birth in group_births]),
+            lon=np.array([float(birth["lon"]) for birth in group_births])
+        )
+
+        # One chunk per worker
+        workers = service.batch_workers(max_workers)
+        chunk_size = max(1, -(-len(group) // workers))
+        for batch in service.calculate_natal_charts_batch(
+            batch_births, house_code, chunk_size=chunk_size, max_workers=workers, executor=executor
+        ):
+            for i, record in enumerate(service.natal_records_from_batch(batch)):
+                payloads[group[batch.offset + i]["id"]] = record.to_payload()
+
+    return payloads
+
+
+def diff_payloads(old: Mapping[str, Any], new: Mapping[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Summarize what a recompute changes in a chart.
+
+    Returns:
+        None if nothing changed beyond DIFF_TOLERANCE, else a dict with
+        the largest longitude shift and the planets/angles whose sign or
+        house changed (and whether the aspect patterns changed)
+    """
+    diff: Dict[str, Any] = {"max_shift": 0.0, "signs": [], "houses": []}
+
+    old_planets = old.get("planets", {})
+    for name, planet in new.get("planets", {}).items():
+        before = old_planets.get(name)
+        if before is None:
+            diff["signs"].append(name)
+            continue
+        shift = abs((planet["lon_absolute"] - before.get("lon_absolute", 0.0) + 180.0) % 360.0 - 180.0)
+        diff["max_shift"] = max(diff["max_shift"], shift)
+        if planet["sign"] != before.get("sign"):
+            diff["signs"].append(name)
+        if planet.get("house") != before.get("house"):
+            diff["houses"].append(name)
+
+    for key in ("ascendant", "midheaven"):
+        if key in new and key in old:
+            shift = abs((new[key]["lon_absolute"] - old[key]["lon_absolute"] + 180.0) % 360.0 - 180.0)
+            diff["max_shift"] = max(diff["max_shift"], shift)
+            if new[key]["sign"] != old[key]["sign"]:
+                diff["signs"].append(key)
+
+    if old.get("patterns") != new.get("patterns"):
+        diff["patterns"] = True
+
+    diff["max_shift"] = round(diff["max_shift"], 6)
+    if diff["max_shift"] <= DIFF_TOLERANCE and not (diff["signs"] or diff["houses"] or "patterns" in diff):
+        return None
+    return diff
+
+
+def _fetch_outdated(
+    supabase: Client,
+    target: str,
+    cursor: Optional[str],
+    batch_size: int
+) -> List[Dict[str, Any]]:
+    """Next page of natal charts not computed with the target engine version"""
+    query = supabase.table("natal_charts") \
+        .select("id, user_id, computed_at, engine_version, house_system, payload") \
+        .neq("engine_version", target)
+    if cursor is not None:
+        query = query.gt("id", cursor)
+    return query.order("id").limit(batch_size).execute().data
+
+
+def _load_births(supabase: Client, user_ids: set) -> Dict[str, Dict[str, Any]]:
+    """birth_data rows of a page's users (one query)"""
+    response = supabase.table("birth_data") \
+        .select("user_id, birth_utc, lat, lon, updated_at") \
+        .in_("user_id", sorted(user_ids)) \
+        .execute()
+    return {row["user_id"]: row for row in response.data}
+
+
+def _update_row(row: Dict[str, Any], payload: Dict[str, Any], target: str) -> Dict[str, Any]:
+    """Upsert row for a recomputed chart (v2 payload when it encodes losslessly)"""
+    try:
+        payload_v2: Optional[str] = "\\x" + encode_payload(payload).hex()
+    except ValueError as e:
+        logger.warning(f"Natal chart {row['id']} kept as JSON: {e}")
+        payload_v2 = None
+
+    return {
+        "id": row["id"],
+        "user_id": row["user_id"],
+        "engine_version": target,
+        "payload": payload,
+        "payload_v2": payload_v2,
+        "payload_format": PAYLOAD_FORMAT_V2 if payload_v2 else PAYLOAD_FORMAT_JSON
+    }
+
+
+def _parse_time(value: str) -> datetime:
+    """Parse a timestamptz column (naive values are UTC)"""
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _throttle(started: float, written: int, max_rows_per_second: Optional[float]) -> None:
+    """Sleep until the average write rate is back under the limit"""
+    if not max_rows_per_second:
+        return
+    ahead = written / max_rows_per_second - (clock.perf_counter() - started)
+    if ahead > 0:
+        clock.sleep(ahead)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the recompute from the command line"""
+    from app.dependencies import get_supabase
+
+    parser = argparse.ArgumentParser(description="Recompute natal charts with an outdated engine version")
+    parser.add_argument("--batch-size", type=int, default=500, help="Rows per page")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--max-rows-per-second", type=float, default=None, help="Write rate limit")
+    parser.add_argument("--dry-run", action="store_true", help="Diff only, write nothing")
+    parser.add_argument("--restart", action="store_true", help="Ignore the checkpoint of this engine version")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    counts = recompute_natal_charts(
+        get_supabase(),
+        batch_size=args.batch_size,
+        max_workers=args.workers,
+        max_rows_per_second=args.max_rows_per_second,
+        dry_run=args.dry_run,
+        restart=args.restart
+    )
+    print(
+        f"Recomputed {counts['updated']} natal charts to {AstroService.ENGINE_VERSION} "
+        f"({counts['changed']} changed, {counts['unchanged']} unchanged, skipped {counts['skipped']}) "
+        f"in {counts['seconds']} s ({counts['charts_per_second']} charts/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 """AstroMirror Voice Chat Backend - FastAPI Application"""
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
@@ -7,7 +8,11 @@ from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
 from app.config import settings
-from app.routers import voice, elevenlabs
+from app.routers import voice, elevenlabs, astro
+from app.repositories.postgres import create_pool, postgres_repositories
+from app.services.astro_engine import AstroEngine
+from app.services.chart_cache import NatalChartCache
+from app.services.session_context import session_context_cache
 import logging
 
 # Configure logging
@@ -21,13 +26,50 @@ logger = logging.getLogger(__name__)
 # Rate limiter
 limiter = Limiter(key_func=get_remote_address)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan: own the astro engine and database pool for the worker's lifetime"""
+    astro_engine = AstroEngine(
+        pool_size=settings.astro_pool_size,
+        executor=settings.astro_executor,
+        timeout=settings.astro_call_timeout_seconds,
+        chart_cache=NatalChartCache(
+            max_entries=settings.natal_chart_cache_size,
+            disk_path=settings.natal_chart_cache_path,
+            disk_max_rows=settings.natal_chart_cache_disk_max_rows
+        )
+    )
+    await astro_engine.start()
+    app.state.astro_engine = astro_engine
+
+    # Direct Postgres pool (optional, see get_repositories)
+    db_pool = None
+    app.state.repositories = None
+    if settings.database_url:
+        db_pool = await create_pool(
+            settings.database_url,
+            min_size=settings.database_pool_min_size,
+            max_size=settings.database_pool_max_size,
+            statement_cache_size=settings.database_statement_cache_size,
+            command_timeout=settings.database_command_timeout_seconds
+        )
+        app.state.repositories = postgres_repositories(db_pool)
+
+    yield
+
+    if db_pool is not None:
+        await db_pool.close()
+    astro_engine.shutdown()
+
+
 # FastAPI app
 app = FastAPI(
     title="AstroMirror Voice Chat API",
     description="DSGVO-compliant voice chat backend with ElevenLabs integration",
     version="1.0.0",
     docs_url="/docs" if settings.environment == "development" else None,
-    redoc_url="/redoc" if settings.environment == "development" else None
+    redoc_url="/redoc" if settings.environment == "development" else None,
+    lifespan=lifespan
 )
 
 # Add rate limiter
@@ -67,6 +109,7 @@ async def add_security_headers(request: Request, call_next):
 # Include routers
 app.include_router(voice.router)
 app.include_router(elevenlabs.router)
+app.include_router(astro.router)
 
 
 # Health check
@@ -77,7 +120,9 @@ async def health_check(request: Request):
     return {
         "status": "ok",
         "environment": settings.environment,
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "astro_engine": request.app.state.astro_engine.stats(),
+        "session_context_cache": session_context_cache.stats()
     }
 
 
@@ -1,7 +1,7 @@
 """Astrology Models"""
 
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Literal
 from pydantic import BaseModel, UUID4
 
 
@@ -46,11 +46,28 @@ class Aspect(BaseModel):
     natal_planet: str
     orb: float
     exact_date: Optional[datetime] = None
+    transit_retrograde: bool = False
+
+
+class AspectPattern(BaseModel):
+    """Aspect pattern (grand trine, T-square, yod, stellium)"""
+    type: str  # 'grand_trine', 't_square', 'yod', 'stellium'
+    planets: list[str]
+    apex: Optional[str] = None  # Focal planet of a T-square or yod
+
+
+class SynastryAspect(BaseModel):
+    """Aspect between two natal charts"""
+    type: str  # 'conjunction', 'square', 'opposition', 'trine', 'sextile'
+    planet_a: str
+    planet_b: str
+    orb: float
 
 
 class Transit(BaseModel):
     """Transit information"""
     aspects: list[Aspect]
+    patterns: list[AspectPattern] = []
     computed_at: datetime
 
     def to_agent_format(self) -> dict:
@@ -66,3 +83,25 @@ class Transit(BaseModel):
             }
 
         return result
+
+
+class TransitEvent(BaseModel):
+    """Transit aspect event within a forecast window"""
+    event: Literal["active", "orb_start", "exact", "orb_end"]
+    type: str  # aspect type
+    transit_planet: str
+    natal_planet: str
+    date: datetime
+    orb: float
+
+
+class SkyEvent(BaseModel):
+    """Precomputed sky event (station, ingress, lunation, eclipse)"""
+    kind: Literal[
+        "station_retrograde", "station_direct", "ingress",
+        "new_moon", "full_moon", "solar_eclipse", "lunar_eclipse"
+    ]
+    body: Optional[str] = None  # None for eclipses
+    date: datetime
+    sign: Optional[str] = None  # Sign entered / occupied (not for eclipses)
+    eclipse_type: Optional[str] = None  # total, annular, partial, hybrid, penumbral
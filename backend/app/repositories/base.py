@@ -0,0 +1,284 @@
+"""
+Async repository interfaces for the voice chat tables.
+
+Routers and services talk to these instead of building PostgREST
+chains. Two implementations exist: asyncpg on a pooled connection
+(app/repositories/postgres.py, used when DATABASE_URL is set) and the
+Supabase client run in worker threads (app/repositories/supabase.py).
+
+Rows are returned in the PostgREST JSON shape (UUIDs and timestamps as
+strings) whichever implementation is used.
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Literal, Mapping, Optional, TypedDict
+
+
+class EntitlementsRow(TypedDict, total=False):
+    """entitlements row"""
+    user_id: str
+    plan: str  # 'free' | 'premium'
+    status: str
+    voice_minutes_monthly: int
+    voice_minutes_used: int
+    period_start: str
+    period_end: str
+    updated_at: str
+
+
+class VoiceSessionRow(TypedDict, total=False):
+    """voice_sessions row"""
+    id: str
+    user_id: str
+    elevenlabs_session_id: Optional[str]
+    elevenlabs_conversation_id: Optional[str]
+    status: str  # 'active' | 'completed' | 'failed' | 'expired'
+    voice_mode: str
+    started_at: str
+    ended_at: Optional[str]
+    duration_seconds: Optional[int]
+
+
+class VoiceConsentRow(TypedDict, total=False):
+    """voice_consents row"""
+    user_id: str
+    consent_version: str
+    consent_at: str
+    consent_text: str
+    withdrawn_at: Optional[str]
+    created_at: str
+    updated_at: str
+
+
+class ProfileRow(TypedDict, total=False):
+    """Projected profiles row (what the voice features need)"""
+    display_name: Optional[str]
+    locale: str
+
+
+class BirthDataRow(TypedDict, total=False):
+    """Projected birth_data row"""
+    birth_utc: str
+    lat: float
+    lon: float
+
+
+class NatalChartRow(TypedDict, total=False):
+    """natal_charts row (JSON payload)"""
+    id: str
+    user_id: str
+    computed_at: str
+    engine_version: str
+    house_system: str
+    payload: Dict[str, Any]
+
+
+# Why a session can't be started (see migrations/005_voice_session_bootstrap.sql)
+BootstrapError = Literal[
+    "consent_required",
+    "consent_outdated",
+    "no_entitlements",
+    "premium_required",
+    "minutes_exhausted",
+    "no_natal_chart",
+]
+
+
+@dataclass
+class SessionBootstrap:
+    """Result of VoiceSessionRepository.bootstrap"""
+    error: Optional[BootstrapError] = None
+    entitlements: Optional[EntitlementsRow] = None
+    natal_chart: Optional[Dict[str, Any]] = None  # latest natal_charts.payload
+    display_name: Optional[str] = None
+    locale: Optional[str] = None
+
+    @classmethod
+    def from_result(cls, result: Mapping[str, Any]) -> "SessionBootstrap":
+        """Build from the bootstrap_voice_session() JSON result"""
+        return cls(
+            error=result.get("error"),
+            entitlements=result.get("entitlements"),
+            natal_chart=result.get("natal_chart"),
+            display_name=result.get("display_name"),
+            locale=result.get("locale")
+        )
+
+
+class EntitlementsRepository(ABC):
+    """entitlements table"""
+
+    @abstractmethod
+    async def get(self, user_id: str) -> Optional[EntitlementsRow]:
+        """Entitlements of a user, or None"""
+
+
+class VoiceSessionRepository(ABC):
+    """voice_sessions table"""
+
+    @abstractmethod
+    async def get(self, session_id: str) -> Optional[VoiceSessionRow]:
+        """Session by id, or None"""
+
+    @abstractmethod
+    async def get_by_conversation(self, conversation_id: str) -> Optional[VoiceSessionRow]:
+        """Session by ElevenLabs conversation id, or None"""
+
+    @abstractmethod
+    async def bootstrap(
+        self,
+        session_id: str,
+        user_id: str,
+        voice_mode: str,
+        consent_version: str,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> SessionBootstrap:
+        """
+        Check and start a voice session.
+
+        Checks consent (active, current version), plan and remaining
+        minutes, loads the latest natal chart and the profile, and inserts
+        the active session with its session_created audit entry. Nothing
+        is written when a check fails.
+
+        Returns:
+            SessionBootstrap with `error` set on the first failed check
+        """
+
+    @abstractmethod
+    async def set_elevenlabs_session_id(self, session_id: str, elevenlabs_session_id: str) -> None:
+        """Record the ElevenLabs session of a bootstrapped session"""
+
+    @abstractmethod
+    async def fail(self, session_id: str, error_message: str) -> None:
+        """Mark a session failed (e.g. ElevenLabs could not start it)"""
+
+    @abstractmethod
+    async def set_conversation_id(self, session_id: str, conversation_id: str) -> None:
+        """Record the ElevenLabs conversation id"""
+
+    @abstractmethod
+    async def recent_for_user(self, user_id: str, limit: int = 10) -> List[VoiceSessionRow]:
+        """Most recent sessions of a user (newest first)"""
+
+
+class VoiceUsageRepository(ABC):
+    """voice_usage_events ledger (aggregate: entitlements.voice_minutes_used)"""
+
+    @abstractmethod
+    async def record(
+        self,
+        session_id: str,
+        user_id: str,
+        conversation_id: str,
+        duration_seconds: int,
+        minutes: int,
+        ended_at: datetime
+    ) -> bool:
+        """
+        Book the minutes of an ended session and complete it.
+
+        Appends the usage event, adds the minutes to the user's usage of
+        the current period and marks the session completed, atomically
+        (see migrations/006_voice_usage_ledger.sql).
+
+        Returns:
+            False if the session's usage was already recorded
+        """
+
+
+class VoiceConsentRepository(ABC):
+    """voice_consents table"""
+
+    @abstractmethod
+    async def get(self, user_id: str) -> Optional[VoiceConsentRow]:
+        """Consent of a user (withdrawn or not), or None"""
+
+    @abstractmethod
+    async def get_active(self, user_id: str) -> Optional[VoiceConsentRow]:
+        """Consent of a user that is not withdrawn, or None"""
+
+    @abstractmethod
+    async def upsert(
+        self,
+        user_id: str,
+        consent_version: str,
+        consent_text: str,
+        consent_at: datetime
+    ) -> Optional[VoiceConsentRow]:
+        """Grant (or renew) consent; returns the stored row"""
+
+    @abstractmethod
+    async def withdraw(self, user_id: str, withdrawn_at: datetime) -> None:
+        """Withdraw consent"""
+
+
+class ProfileRepository(ABC):
+    """profiles table"""
+
+    @abstractmethod
+    async def get(self, user_id: str) -> Optional[ProfileRow]:
+        """Display name and locale of a user, or None"""
+
+
+class BirthDataRepository(ABC):
+    """birth_data table"""
+
+    @abstractmethod
+    async def get(self, user_id: str) -> Optional[BirthDataRow]:
+        """Birth time and place of a user, or None"""
+
+
+class NatalChartRepository(ABC):
+    """natal_charts table"""
+
+    @abstractmethod
+    async def latest(self, user_id: str) -> Optional[NatalChartRow]:
+        """Most recent natal chart row of a user (JSON payload), or None"""
+
+    @abstractmethod
+    async def latest_payload(self, user_id: str, chart_id: Optional[str] = None) -> Optional[Mapping[str, Any]]:
+        """
+        Most recent natal chart payload of a user (or the given chart).
+
+        Reads the binary v2 payload when present (see natal_chart_store).
+        """
+
+
+class AuditLogRepository(ABC):
+    """voice_audit_logs table"""
+
+    @abstractmethod
+    async def insert(
+        self,
+        log_id: str,
+        event_type: str,
+        created_at: datetime,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+        data_accessed: Optional[Dict[str, Any]] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> None:
+        """Insert an audit log entry"""
+
+    @abstractmethod
+    async def list_for_user(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent audit log entries of a user (newest first)"""
+
+
+@dataclass
+class Repositories:
+    """All repositories of one backend (Postgres or Supabase)"""
+    entitlements: EntitlementsRepository
+    voice_sessions: VoiceSessionRepository
+    voice_usage: VoiceUsageRepository
+    voice_consents: VoiceConsentRepository
+    profiles: ProfileRepository
+    birth_data: BirthDataRepository
+    natal_charts: NatalChartRepository
+    audit_logs: AuditLogRepository
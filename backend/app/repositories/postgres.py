@@ -0,0 +1,324 @@
+"""
+Repositories on a pooled asyncpg connection (direct Postgres).
+
+Used when DATABASE_URL is set. Every query is a fixed SQL statement, so
+asyncpg prepares it once per connection and reuses it from its
+statement cache (set DATABASE_STATEMENT_CACHE_SIZE=0 behind a
+transaction-mode pooler such as PgBouncer/Supavisor on port 6543).
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Mapping, Optional
+from uuid import UUID
+import json
+import asyncpg
+from app.config import settings
+from app.repositories.base import (
+    AuditLogRepository,
+    BirthDataRepository,
+    BirthDataRow,
+    EntitlementsRepository,
+    EntitlementsRow,
+    NatalChartRepository,
+    NatalChartRow,
+    ProfileRepository,
+    ProfileRow,
+    Repositories,
+    SessionBootstrap,
+    VoiceConsentRepository,
+    VoiceConsentRow,
+    VoiceSessionRepository,
+    VoiceSessionRow,
+    VoiceUsageRepository,
+)
+from app.services.chart_codec import decode_payload, is_encoded
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+async def create_pool(
+    dsn: str,
+    min_size: int = 1,
+    max_size: int = 10,
+    statement_cache_size: int = 100,
+    command_timeout: Optional[float] = None
+) -> asyncpg.Pool:
+    """
+    Create the application's connection pool (see main.lifespan).
+
+    JSON and JSONB columns are decoded to Python objects.
+    """
+    pool = await asyncpg.create_pool(
+        dsn,
+        min_size=min_size,
+        max_size=max_size,
+        statement_cache_size=statement_cache_size,
+        command_timeout=command_timeout,
+        init=_init_connection
+    )
+    logger.info(f"Database pool ready: {min_size}-{max_size} connections")
+    return pool
+
+
+async def _init_connection(connection: asyncpg.Connection) -> None:
+    """Per-connection setup: JSON codecs"""
+    for type_name in ("json", "jsonb"):
+        await connection.set_type_codec(
+            type_name,
+            encoder=json.dumps,
+            decoder=json.loads,
+            schema="pg_catalog"
+        )
+
+
+def _value(value: Any) -> Any:
+    """Column value in its PostgREST JSON form"""
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def _row(record: Optional[asyncpg.Record]) -> Optional[Dict[str, Any]]:
+    """Record as a PostgREST-shaped dict"""
+    if record is None:
+        return None
+    return {key: _value(value) for key, value in record.items()}
+
+
+class PostgresRepository:
+    """Base class: holds the pool"""
+
+    def __init__(self, pool: asyncpg.Pool):
+        self.pool = pool
+
+
+class PostgresEntitlementsRepository(PostgresRepository, EntitlementsRepository):
+    """entitlements via asyncpg"""
+
+    async def get(self, user_id: str) -> Optional[EntitlementsRow]:
+        return _row(await self.pool.fetchrow(
+            "SELECT * FROM entitlements WHERE user_id = $1",
+            user_id
+        ))
+
+
+class PostgresVoiceSessionRepository(PostgresRepository, VoiceSessionRepository):
+    """voice_sessions via asyncpg"""
+
+    async def get(self, session_id: str) -> Optional[VoiceSessionRow]:
+        return _row(await self.pool.fetchrow(
+            "SELECT * FROM voice_sessions WHERE id = $1",
+            session_id
+        ))
+
+    async def get_by_conversation(self, conversation_id: str) -> Optional[VoiceSessionRow]:
+        return _row(await self.pool.fetchrow(
+            "SELECT * FROM voice_sessions WHERE elevenlabs_conversation_id = $1 LIMIT 1",
+            conversation_id
+        ))
+
+    async def bootstrap(
+        self,
+        session_id: str,
+        user_id: str,
+        voice_mode: str,
+        consent_version: str,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> SessionBootstrap:
+        # One round trip: checks, reads and inserts run in the database
+        # (migrations/005_voice_session_bootstrap.sql)
+        result = await self.pool.fetchval(
+            "SELECT bootstrap_voice_session($1, $2, $3, $4, $5, $6)",
+            session_id, user_id, voice_mode, consent_version, ip_address, user_agent
+        )
+        return SessionBootstrap.from_result(result)
+
+    async def set_elevenlabs_session_id(self, session_id: str, elevenlabs_session_id: str) -> None:
+        await self.pool.execute(
+            "UPDATE voice_sessions SET elevenlabs_session_id = $2, updated_at = now() WHERE id = $1",
+            session_id, elevenlabs_session_id
+        )
+
+    async def fail(self, session_id: str, error_message: str) -> None:
+        await self.pool.execute(
+            "UPDATE voice_sessions SET status = 'failed', error_message = $2, updated_at = now() WHERE id = $1",
+            session_id, error_message
+        )
+
+    async def set_conversation_id(self, session_id: str, conversation_id: str) -> None:
+        await self.pool.execute(
+            "UPDATE voice_sessions SET elevenlabs_conversation_id = $2, updated_at = now() WHERE id = $1",
+            session_id, conversation_id
+        )
+
+    async def recent_for_user(self, user_id: str, limit: int = 10) -> List[VoiceSessionRow]:
+        records = await self.pool.fetch(
+            "SELECT id, started_at, ended_at, duration_seconds, voice_mode, status FROM voice_sessions "
+            "WHERE user_id = $1 ORDER BY started_at DESC LIMIT $2",
+            user_id, limit
+        )
+        return [_row(record) for record in records]
+
+
+class PostgresVoiceUsageRepository(PostgresRepository, VoiceUsageRepository):
+    """voice_usage_events via asyncpg"""
+
+    async def record(
+        self,
+        session_id: str,
+        user_id: str,
+        conversation_id: str,
+        duration_seconds: int,
+        minutes: int,
+        ended_at: datetime
+    ) -> bool:
+        # One statement: ledger insert, aggregate increment, session update
+        return await self.pool.fetchval(
+            "SELECT record_voice_usage($1, $2, $3, $4, $5, $6)",
+            session_id, user_id, conversation_id, duration_seconds, minutes, ended_at
+        )
+
+
+class PostgresVoiceConsentRepository(PostgresRepository, VoiceConsentRepository):
+    """voice_consents via asyncpg"""
+
+    async def get(self, user_id: str) -> Optional[VoiceConsentRow]:
+        return _row(await self.pool.fetchrow(
+            "SELECT * FROM voice_consents WHERE user_id = $1",
+            user_id
+        ))
+
+    async def get_active(self, user_id: str) -> Optional[VoiceConsentRow]:
+        return _row(await self.pool.fetchrow(
+            "SELECT * FROM voice_consents WHERE user_id = $1 AND withdrawn_at IS NULL",
+            user_id
+        ))
+
+    async def upsert(
+        self,
+        user_id: str,
+        consent_version: str,
+        consent_text: str,
+        consent_at: datetime
+    ) -> Optional[VoiceConsentRow]:
+        return _row(await self.pool.fetchrow(
+            "INSERT INTO voice_consents (user_id, consent_version, consent_text, consent_at, withdrawn_at) "
+            "VALUES ($1, $2, $3, $4, NULL) "
+            "ON CONFLICT (user_id) DO UPDATE SET consent_version = EXCLUDED.consent_version, "
+            "consent_text = EXCLUDED.consent_text, consent_at = EXCLUDED.consent_at, "
+            "withdrawn_at = NULL, updated_at = now() "
+            "RETURNING *",
+            user_id, consent_version, consent_text, consent_at
+        ))
+
+    async def withdraw(self, user_id: str, withdrawn_at: datetime) -> None:
+        await self.pool.execute(
+            "UPDATE voice_consents SET withdrawn_at = $2, updated_at = now() WHERE user_id = $1",
+            user_id, withdrawn_at
+        )
+
+
+class PostgresProfileRepository(PostgresRepository, ProfileRepository):
+    """profiles via asyncpg"""
+
+    async def get(self, user_id: str) -> Optional[ProfileRow]:
+        return _row(await self.pool.fetchrow(
+            "SELECT display_name, locale FROM profiles WHERE id = $1",
+            user_id
+        ))
+
+
+class PostgresBirthDataRepository(PostgresRepository, BirthDataRepository):
+    """birth_data via asyncpg"""
+
+    async def get(self, user_id: str) -> Optional[BirthDataRow]:
+        return _row(await self.pool.fetchrow(
+            "SELECT birth_utc, lat, lon FROM birth_data WHERE user_id = $1",
+            user_id
+        ))
+
+
+class PostgresNatalChartRepository(PostgresRepository, NatalChartRepository):
+    """natal_charts via asyncpg"""
+
+    async def latest(self, user_id: str) -> Optional[NatalChartRow]:
+        return _row(await self.pool.fetchrow(
+            "SELECT id, user_id, computed_at, engine_version, house_system, payload FROM natal_charts "
+            "WHERE user_id = $1 ORDER BY computed_at DESC LIMIT 1",
+            user_id
+        ))
+
+    async def latest_payload(self, user_id: str, chart_id: Optional[str] = None) -> Optional[Mapping[str, Any]]:
+        if not settings.natal_payload_v2_reads:
+            record = await self.pool.fetchrow(
+                "SELECT payload FROM natal_charts "
+                "WHERE user_id = $1 AND ($2::uuid IS NULL OR id = $2::uuid) "
+                "ORDER BY computed_at DESC LIMIT 1",
+                user_id, chart_id
+            )
+            return record["payload"] if record else None
+
+        # One round trip: the JSON payload is only sent for rows without v2
+        record = await self.pool.fetchrow(
+            "SELECT payload_v2, CASE WHEN payload_v2 IS NULL THEN payload END AS payload FROM natal_charts "
+            "WHERE user_id = $1 AND ($2::uuid IS NULL OR id = $2::uuid) "
+            "ORDER BY computed_at DESC LIMIT 1",
+            user_id, chart_id
+        )
+        if record is None:
+            return None
+        if is_encoded(record["payload_v2"]):
+            return decode_payload(record["payload_v2"])
+        return record["payload"]
+
+
+class PostgresAuditLogRepository(PostgresRepository, AuditLogRepository):
+    """voice_audit_logs via asyncpg"""
+
+    async def insert(
+        self,
+        log_id: str,
+        event_type: str,
+        created_at: datetime,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+        data_accessed: Optional[Dict[str, Any]] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> None:
+        await self.pool.execute(
+            "INSERT INTO voice_audit_logs (id, event_type, user_id, session_id, conversation_id, "
+            "data_accessed, ip_address, user_agent, created_at) "
+            "VALUES ($1, $2, $3, $4, $5, $6, $7::text::inet, $8, $9)",
+            log_id, event_type, user_id, session_id, conversation_id,
+            data_accessed, ip_address, user_agent, created_at
+        )
+
+    async def list_for_user(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+        records = await self.pool.fetch(
+            "SELECT * FROM voice_audit_logs WHERE user_id = $1 ORDER BY created_at DESC LIMIT $2",
+            user_id, limit
+        )
+        return [_row(record) for record in records]
+
+
+def postgres_repositories(pool: asyncpg.Pool) -> Repositories:
+    """Repositories on an asyncpg pool"""
+    return Repositories(
+        entitlements=PostgresEntitlementsRepository(pool),
+        voice_sessions=PostgresVoiceSessionRepository(pool),
+        voice_usage=PostgresVoiceUsageRepository(pool),
+        voice_consents=PostgresVoiceConsentRepository(pool),
+        profiles=PostgresProfileRepository(pool),
+        birth_data=PostgresBirthDataRepository(pool),
+        natal_charts=PostgresNatalChartRepository(pool),
+        audit_logs=PostgresAuditLogRepository(pool)
+    )
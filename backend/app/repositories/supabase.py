@@ -0,0 +1,347 @@
+"""
+Repositories on the Supabase client (PostgREST over HTTP).
+
+Fallback when no DATABASE_URL is configured. The client is synchronous,
+so every query runs in a worker thread instead of blocking the event
+loop. Usage recording calls its SQL function over RPC; session
+bootstrap does so when VOICE_SESSION_BOOTSTRAP_RPC is set, else issues
+its queries one by one.
+"""
+
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Mapping, Optional, TypeVar
+from uuid import uuid4
+import asyncio
+from supabase import Client
+from app.config import settings
+from app.repositories.base import (
+    AuditLogRepository,
+    BirthDataRepository,
+    BirthDataRow,
+    EntitlementsRepository,
+    EntitlementsRow,
+    NatalChartRepository,
+    NatalChartRow,
+    ProfileRepository,
+    ProfileRow,
+    Repositories,
+    SessionBootstrap,
+    VoiceConsentRepository,
+    VoiceConsentRow,
+    VoiceSessionRepository,
+    VoiceSessionRow,
+    VoiceUsageRepository,
+)
+from app.services.natal_chart_store import load_latest_natal_payload
+
+T = TypeVar("T")
+
+
+class SupabaseRepository:
+    """Base class: holds the client and runs queries off the event loop"""
+
+    def __init__(self, supabase: Client):
+        self.supabase = supabase
+
+    async def _run(self, query: Callable[[], T]) -> T:
+        return await asyncio.to_thread(query)
+
+    async def _first(self, query: Callable[[], Any]) -> Optional[Dict[str, Any]]:
+        data = (await self._run(lambda: query().execute())).data
+        return data[0] if data else None
+
+
+class SupabaseEntitlementsRepository(SupabaseRepository, EntitlementsRepository):
+    """entitlements via PostgREST"""
+
+    async def get(self, user_id: str) -> Optional[EntitlementsRow]:
+        return await self._first(lambda: self.supabase.table("entitlements")
+                                 .select("*")
+                                 .eq("user_id", user_id))
+
+
+class SupabaseVoiceSessionRepository(SupabaseRepository, VoiceSessionRepository):
+    """voice_sessions via PostgREST"""
+
+    async def get(self, session_id: str) -> Optional[VoiceSessionRow]:
+        return await self._first(lambda: self.supabase.table("voice_sessions")
+                                 .select("*")
+                                 .eq("id", session_id))
+
+    async def get_by_conversation(self, conversation_id: str) -> Optional[VoiceSessionRow]:
+        return await self._first(lambda: self.supabase.table("voice_sessions")
+                                 .select("*")
+                                 .eq("elevenlabs_conversation_id", conversation_id))
+
+    async def bootstrap(
+        self,
+        session_id: str,
+        user_id: str,
+        voice_mode: str,
+        consent_version: str,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> SessionBootstrap:
+        if settings.voice_session_bootstrap_rpc:
+            response = await self._run(lambda: self.supabase.rpc("bootstrap_voice_session", {
+                "p_session_id": session_id,
+                "p_user_id": user_id,
+                "p_voice_mode": voice_mode,
+                "p_consent_version": consent_version,
+                "p_ip_address": ip_address,
+                "p_user_agent": user_agent
+            }).execute())
+            return SessionBootstrap.from_result(response.data)
+
+        return await self._run(lambda: self._bootstrap_queries(
+            session_id, user_id, voice_mode, consent_version, ip_address, user_agent
+        ))
+
+    def _bootstrap_queries(
+        self,
+        session_id: str,
+        user_id: str,
+        voice_mode: str,
+        consent_version: str,
+        ip_address: Optional[str],
+        user_agent: Optional[str]
+    ) -> SessionBootstrap:
+        """bootstrap_voice_session() as separate requests (one worker thread)"""
+        def first(query: Any) -> Optional[Dict[str, Any]]:
+            data = query.execute().data
+            return data[0] if data else None
+
+        consent = first(self.supabase.table("voice_consents")
+                        .select("*")
+                        .eq("user_id", user_id)
+                        .is_("withdrawn_at", "null"))
+        if not consent:
+            return SessionBootstrap(error="consent_required")
+        if consent["consent_version"] != consent_version:
+            return SessionBootstrap(error="consent_outdated")
+
+        entitlements = first(self.supabase.table("entitlements")
+                             .select("*")
+                             .eq("user_id", user_id))
+        if not entitlements:
+            return SessionBootstrap(error="no_entitlements")
+        if entitlements["plan"] != "premium":
+            return SessionBootstrap(error="premium_required")
+        if entitlements["voice_minutes_monthly"] - entitlements["voice_minutes_used"] <= 0:
+            return SessionBootstrap(error="minutes_exhausted")
+
+        natal_chart = first(self.supabase.table("natal_charts")
+                            .select("payload")
+                            .eq("user_id", user_id)
+                            .order("computed_at", desc=True)
+                            .limit(1))
+        if not natal_chart:
+            return SessionBootstrap(error="no_natal_chart")
+
+        profile = first(self.supabase.table("profiles")
+                        .select("display_name, locale")
+                        .eq("id", user_id)) or {}
+
+        self.supabase.table("voice_sessions").insert({
+            "id": session_id,
+            "user_id": user_id,
+            "status": "active",
+            "voice_mode": voice_mode
+        }).execute()
+
+        self.supabase.table("voice_audit_logs").insert({
+            "id": str(uuid4()),
+            "event_type": "session_created",
+            "user_id": user_id,
+            "session_id": session_id,
+            "data_accessed": {"voice_mode": voice_mode},
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "created_at": datetime.utcnow().isoformat()
+        }).execute()
+
+        return SessionBootstrap(
+            entitlements=entitlements,
+            natal_chart=natal_chart["payload"],
+            display_name=profile.get("display_name"),
+            locale=profile.get("locale")
+        )
+
+    async def set_elevenlabs_session_id(self, session_id: str, elevenlabs_session_id: str) -> None:
+        await self._run(lambda: self.supabase.table("voice_sessions")
+                        .update({"elevenlabs_session_id": elevenlabs_session_id})
+                        .eq("id", session_id)
+                        .execute())
+
+    async def fail(self, session_id: str, error_message: str) -> None:
+        await self._run(lambda: self.supabase.table("voice_sessions")
+                        .update({"status": "failed", "error_message": error_message})
+                        .eq("id", session_id)
+                        .execute())
+
+    async def set_conversation_id(self, session_id: str, conversation_id: str) -> None:
+        await self._run(lambda: self.supabase.table("voice_sessions")
+                        .update({"elevenlabs_conversation_id": conversation_id})
+                        .eq("id", session_id)
+                        .execute())
+
+    async def recent_for_user(self, user_id: str, limit: int = 10) -> List[VoiceSessionRow]:
+        response = await self._run(lambda: self.supabase.table("voice_sessions")
+                                   .select("id, started_at, ended_at, duration_seconds, voice_mode, status")
+                                   .eq("user_id", user_id)
+                                   .order("started_at", desc=True)
+                                   .limit(limit)
+                                   .execute())
+        return response.data
+
+
+class SupabaseVoiceUsageRepository(SupabaseRepository, VoiceUsageRepository):
+    """voice_usage_events via PostgREST"""
+
+    async def record(
+        self,
+        session_id: str,
+        user_id: str,
+        conversation_id: str,
+        duration_seconds: int,
+        minutes: int,
+        ended_at: datetime
+    ) -> bool:
+        # Atomic and idempotent in the database (migrations/006)
+        response = await self._run(lambda: self.supabase.rpc("record_voice_usage", {
+            "p_session_id": session_id,
+            "p_user_id": user_id,
+            "p_conversation_id": conversation_id,
+            "p_duration_seconds": duration_seconds,
+            "p_minutes": minutes,
+            "p_ended_at": ended_at.isoformat()
+        }).execute())
+        return bool(response.data)
+
+
+class SupabaseVoiceConsentRepository(SupabaseRepository, VoiceConsentRepository):
+    """voice_consents via PostgREST"""
+
+    async def get(self, user_id: str) -> Optional[VoiceConsentRow]:
+        return await self._first(lambda: self.supabase.table("voice_consents")
+                                 .select("*")
+                                 .eq("user_id", user_id))
+
+    async def get_active(self, user_id: str) -> Optional[VoiceConsentRow]:
+        return await self._first(lambda: self.supabase.table("voice_consents")
+                                 .select("*")
+                                 .eq("user_id", user_id)
+                                 .is_("withdrawn_at", "null"))
+
+    async def upsert(
+        self,
+        user_id: str,
+        consent_version: str,
+        consent_text: str,
+        consent_at: datetime
+    ) -> Optional[VoiceConsentRow]:
+        return await self._first(lambda: self.supabase.table("voice_consents")
+                                 .upsert({
+                                     "user_id": user_id,
+                                     "consent_version": consent_version,
+                                     "consent_text": consent_text,
+                                     "consent_at": consent_at.isoformat(),
+                                     "withdrawn_at": None
+                                 }))
+
+    async def withdraw(self, user_id: str, withdrawn_at: datetime) -> None:
+        await self._run(lambda: self.supabase.table("voice_consents")
+                        .update({"withdrawn_at": withdrawn_at.isoformat()})
+                        .eq("user_id", user_id)
+                        .execute())
+
+
+class SupabaseProfileRepository(SupabaseRepository, ProfileRepository):
+    """profiles via PostgREST"""
+
+    async def get(self, user_id: str) -> Optional[ProfileRow]:
+        return await self._first(lambda: self.supabase.table("profiles")
+                                 .select("display_name, locale")
+                                 .eq("id", user_id))
+
+
+class SupabaseBirthDataRepository(SupabaseRepository, BirthDataRepository):
+    """birth_data via PostgREST"""
+
+    async def get(self, user_id: str) -> Optional[BirthDataRow]:
+        return await self._first(lambda: self.supabase.table("birth_data")
+                                 .select("birth_utc, lat, lon")
+                                 .eq("user_id", user_id)
+                                 .limit(1))
+
+
+class SupabaseNatalChartRepository(SupabaseRepository, NatalChartRepository):
+    """natal_charts via PostgREST"""
+
+    async def latest(self, user_id: str) -> Optional[NatalChartRow]:
+        return await self._first(lambda: self.supabase.table("natal_charts")
+                                 .select("*")
+                                 .eq("user_id", user_id)
+                                 .order("computed_at", desc=True)
+                                 .limit(1))
+
+    async def latest_payload(self, user_id: str, chart_id: Optional[str] = None) -> Optional[Mapping[str, Any]]:
+        return await self._run(lambda: load_latest_natal_payload(self.supabase, user_id, chart_id))
+
+
+class SupabaseAuditLogRepository(SupabaseRepository, AuditLogRepository):
+    """voice_audit_logs via PostgREST"""
+
+    async def insert(
+        self,
+        log_id: str,
+        event_type: str,
+        created_at: datetime,
+        user_id: Optional[str] = None,
+        session_id: Optional[str] = None,
+        conversation_id: Optional[str] = None,
+        data_accessed: Optional[Dict[str, Any]] = None,
+        ip_address: Optional[str] = None,
+        user_agent: Optional[str] = None
+    ) -> None:
+        await self._run(lambda: self.supabase.table("voice_audit_logs")
+                        .insert({
+                            "id": log_id,
+                            "event_type": event_type,
+                            "user_id": user_id,
+                            "session_id": session_id,
+                            "conversation_id": conversation_id,
+                            "data_accessed": data_accessed,
+                            "ip_address": ip_address,
+                            "user_agent": user_agent,
+                            "created_at": created_at.isoformat()
+                        })
+                        .execute())
+
+    async def list_for_user(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+        response = await self._run(lambda: self.supabase.table("voice_audit_logs")
+                                   .select("*")
+                                   .eq("user_id", user_id)
+                                   .order("created_at", desc=True)
+                                   .limit(limit)
+                                   .execute())
+        return response.data
+
+
+def supabase_repositories(supabase: Client) -> Repositories:
+    """Repositories on a Supabase client"""
+    return Repositories(
+        entitlements=SupabaseEntitlementsRepository(supabase),
+        voice_sessions=SupabaseVoiceSessionRepository(supabase),
+        voice_usage=SupabaseVoiceUsageRepository(supabase),
+        voice_consents=SupabaseVoiceConsentRepository(supabase),
+        profiles=SupabaseProfileRepository(supabase),
+        birth_data=SupabaseBirthDataRepository(supabase),
+        natal_charts=SupabaseNatalChartRepository(supabase),
+        audit_logs=SupabaseAuditLogRepository(supabase)
+    )
+
+
+def as_repositories(db: Any) -> Repositories:
+    """Repositories as given, or wrapped around a Supabase client"""
+    return db if isinstance(db, Repositories) else supabase_repositories(db)
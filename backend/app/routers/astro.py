@@ -0,0 +1,394 @@
+"""Astrology API Routes"""
+
+from datetime import datetime, timedelta, timezone
+from math import ceil
+from typing import Dict, Iterator, List, Optional
+import hashlib
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from app.dependencies import get_current_user, get_repositories, get_astro_engine
+from app.models.user import User
+from app.models.astro import SkyEvent
+from app.repositories.base import Repositories
+from app.schemas.astro import AstrocartographyResponse, NatalChartResponse, TransitResponse
+from app.services.aspects import natal_longitudes
+from app.services.astro import AstroService, sky_cache
+from app.services.astro_engine import AstroEngine
+from app.services.event_catalog import EVENT_KINDS
+from app.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/v1/astro", tags=["astro"])
+
+# Natal charts only change with the engine version (part of the ETag),
+# so they may be kept for a day and revalidated cheaply. Birth data is
+# personal (DSGVO) and part of the URL: browser cache only, never shared
+NATAL_CACHE_CONTROL = "private, max-age=86400"
+
+# Transits for an explicit past/future date never change (exact dates
+# are solved from the bucket's sky, see ExactTimeSolver)
+FIXED_DATE_MAX_AGE = 86400
+
+
+def _etag(digest: str) -> str:
+    """Strong ETag from a hex digest"""
+    return f'"{digest}"'
+
+
+def _not_modified(request: Request, etag: str, headers: Dict[str, str]) -> Optional[Response]:
+    """304 response if If-None-Match matches the ETag, else None"""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return None
+
+    # If-None-Match uses weak comparison
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if "*" in candidates or etag in candidates:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return None
+
+
+@router.get("/natal", response_model=NatalChartResponse)
+async def get_natal_chart(
+    request: Request,
+    response: Response,
+    birth_utc: datetime,
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    house_system: str = "placidus",
+    user: User = Depends(get_current_user),
+    astro_engine: AstroEngine = Depends(get_astro_engine)
+):
+    """
+    Calculate a natal chart.
+
+    The ETag is the hash of the inputs and engine version, so a
+    revalidation is answered with 304 before touching the engine.
+
+    Args:
+        birth_utc: Birth time (naive times are UTC)
+        lat: Latitude
+        lon: Longitude
+        house_system: placidus, koch, porphyry, regiomontanus, campanus,
+            equal or whole_sign
+
+    Returns:
+        NatalChartResponse
+    """
+    house_code = AstroService.HOUSE_SYSTEMS.get(house_system.lower())
+    if house_code is None:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unbekanntes Häusersystem: {house_system}"
+        )
+
+    if birth_utc.tzinfo is None:
+        birth_utc = birth_utc.replace(tzinfo=timezone.utc)
+
+    headers = {
+        "ETag": _etag(AstroEngine.chart_key(birth_utc, lat, lon, house_code, include_patterns=True)),
+        "Cache-Control": NATAL_CACHE_CONTROL
+    }
+    not_modified = _not_modified(request, headers["ETag"], headers)
+    if not_modified is not None:
+        return not_modified
+
+    payload = await astro_engine.natal_chart(birth_utc, lat, lon, house_code, include_patterns=True)
+
+    response.headers.update(headers)
+    return NatalChartResponse(
+        planets=payload["planets"],
+        ascendant=payload["ascendant"],
+        midheaven=payload["midheaven"],
+        houses=payload["houses"],
+        patterns=payload.get("patterns", []),
+        engine_version=AstroService.ENGINE_VERSION
+    )
+
+
+@router.get("/transits", response_model=TransitResponse)
+async def get_transits(
+    request: Request,
+    response: Response,
+    transit_date: Optional[datetime] = None,
+    natal_chart_id: Optional[str] = None,
+    user: User = Depends(get_current_user),
+    repositories: Repositories = Depends(get_repositories),
+    astro_engine: AstroEngine = Depends(get_astro_engine)
+):
+    """
+    Calculate transits to the user's natal chart.
+
+    Transits are computed for the start of the sky-cache time bucket
+    containing `transit_date` (default: now), so all requests within a
+    bucket share one ETag. For "now" the response may be cached until
+    the bucket ends.
+
+    Args:
+        transit_date: Moment for the transits (defaults to now)
+        natal_chart_id: Natal chart to use (defaults to the most recent)
+
+    Returns:
+        TransitResponse
+    """
+    try:
+        natal_chart = await repositories.natal_charts.latest_payload(str(user.id), natal_chart_id)
+
+        if not natal_chart:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Bitte Geburtsdaten eingeben"
+            )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error loading natal chart for transits: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Interner Serverfehler"
+        )
+
+    now = datetime.now(timezone.utc)
+    bucket = sky_cache.bucket_for(transit_date or now)
+    bucket_start = sky_cache.bucket_start(bucket)
+
+    if transit_date is None:
+        bucket_end = bucket_start + timedelta(seconds=sky_cache.bucket_seconds)
+        max_age = max(0, ceil((bucket_end - now).total_seconds()))
+    else:
+        max_age = FIXED_DATE_MAX_AGE
+
+    natal_names, natal_lons = natal_longitudes(natal_chart)
+    digest = hashlib.sha256()
+    digest.update(",".join(natal_names).encode())
+    digest.update(natal_lons.astype("<f8").tobytes())
+    digest.update(f"|{bucket_start.isoformat()}|{AstroService.ENGINE_VERSION}".encode())
+
+    headers = {
+        "ETag": _etag(digest.hexdigest()),
+        "Cache-Control": f"private, max-age={max_age}"
+    }
+    not_modified = _not_modified(request, headers["ETag"], headers)
+    if not_modified is not None:
+        return not_modified
+
+    transits = await astro_engine.transits(
+        natal_chart, bucket_start, resolve_exact_dates=True, include_patterns=True
+    )
+
+    response.headers.update(headers)
+    return TransitResponse(
+        aspects=[aspect.model_dump(mode="json") for aspect in transits.aspects],
+        patterns=[pattern.model_dump() for pattern in transits.patterns],
+        computed_at=transits.computed_at
+    )
+
+
+@router.get("/astrocartography", response_model=AstrocartographyResponse)
+async def get_astrocartography(
+    request: Request,
+    response: Response,
+    user: User = Depends(get_current_user),
+    repositories: Repositories = Depends(get_repositories),
+    astro_engine: AstroEngine = Depends(get_astro_engine)
+):
+    """
+    Astrocartography lines (where each planet is rising, setting,
+    culminating or anti-culminating) for the user's birth moment.
+
+    Lines only depend on the birth time and engine version, so they are
+    cached per birth moment and revalidated via ETag.
+
+    Returns:
+        AstrocartographyResponse with [lon, lat] polylines per planet and angle
+    """
+    try:
+        birth = await repositories.birth_data.get(str(user.id))
+
+        if not birth:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Bitte Geburtsdaten eingeben"
+            )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error loading birth data for astrocartography: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Interner Serverfehler"
+        )
+
+    birth_utc = datetime.fromisoformat(birth["birth_utc"])
+    if birth_utc.tzinfo is None:
+        birth_utc = birth_utc.replace(tzinfo=timezone.utc)
+
+    headers = {
+        "ETag": _etag(AstroEngine.line_key(birth_utc, settings.astrocartography_lat_step)),
+        "Cache-Control": "private, no-cache"  # Birth data may be edited; revalidate via ETag
+    }
+    not_modified = _not_modified(request, headers["ETag"], headers)
+    if not_modified is not None:
+        return not_modified
+
+    lines = await astro_engine.astrocartography(birth_utc)
+
+    response.headers.update(headers)
+    return AstrocartographyResponse(
+        birth_utc=birth_utc,
+        lines=lines,
+        engine_version=AstroService.ENGINE_VERSION
+    )
+
+
+@router.get("/forecast")
+async def get_transit_forecast(
+    start: Optional[datetime] = None,
+    days: int = Query(30, ge=1, le=settings.forecast_max_days),
+    user: User = Depends(get_current_user),
+    repositories: Repositories = Depends(get_repositories),
+    astro_engine: AstroEngine = Depends(get_astro_engine)
+):
+    """
+    Stream transit-to-natal aspect events over a date range.
+
+    Events (orb start, exact, orb end; "active" for aspects already within
+    orb at the window start) are streamed as NDJSON in chronological order
+    while the sweep runs, so memory stays flat for long windows.
+
+    Args:
+        start: Window start (defaults to now, UTC)
+        days: Window length in days (max FORECAST_MAX_DAYS)
+
+    Returns:
+        application/x-ndjson stream of TransitEvent objects
+    """
+    try:
+        natal_chart = await repositories.natal_charts.latest_payload(str(user.id))
+
+        if not natal_chart:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Bitte Geburtsdaten eingeben"
+            )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error loading natal chart for forecast: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Interner Serverfehler"
+        )
+
+    if start is None:
+        start = datetime.now(timezone.utc)
+    elif start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    end = start + timedelta(days=days)
+
+    events = astro_engine.service.iter_transit_events(natal_chart, start, end)
+
+    def ndjson() -> Iterator[str]:
+        for event in events:
+            yield event.model_dump_json() + "\n"
+
+    logger.info(f"Streaming {days}-day transit forecast for user {user.id}")
+
+    # Sync iterator: Starlette runs it on the threadpool, off the event loop
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+def _event_service(astro_engine: AstroEngine, kinds: List[str], body: Optional[str]) -> AstroService:
+    """Service with a loaded event catalog, after validating kind/body filters"""
+    service = astro_engine.service
+    if service.event_catalog is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Ereigniskalender nicht verfügbar"
+        )
+
+    unknown = [kind for kind in kinds if kind not in EVENT_KINDS]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unbekannte Ereignisart: {', '.join(unknown)}"
+        )
+    if body is not None and body not in service.event_catalog.bodies:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unbekannter Himmelskörper: {body}"
+        )
+    return service
+
+
+@router.get("/events", response_model=List[SkyEvent])
+async def get_sky_events(
+    start: Optional[datetime] = None,
+    days: int = Query(30, ge=1, le=settings.forecast_max_days),
+    kind: List[str] = Query([]),
+    body: Optional[str] = None,
+    user: User = Depends(get_current_user),
+    astro_engine: AstroEngine = Depends(get_astro_engine)
+):
+    """
+    List retrograde stations, sign ingresses, lunations and eclipses.
+
+    Served from the precomputed event catalog (EVENT_CATALOG_PATH).
+
+    Args:
+        start: Window start (defaults to now, UTC)
+        days: Window length in days (max FORECAST_MAX_DAYS)
+        kind: Event kinds to include (repeatable; all if omitted)
+        body: Planet to filter by, e.g. "mercury"
+
+    Returns:
+        SkyEvent list in chronological order
+    """
+    service = _event_service(astro_engine, kind, body)
+
+    if start is None:
+        start = datetime.now(timezone.utc)
+    elif start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+
+    return service.sky_events(start, start + timedelta(days=days), kind or None, body)
+
+
+@router.get("/events/next", response_model=SkyEvent)
+async def get_next_sky_event(
+    kind: str,
+    body: Optional[str] = None,
+    after: Optional[datetime] = None,
+    user: User = Depends(get_current_user),
+    astro_engine: AstroEngine = Depends(get_astro_engine)
+):
+    """
+    Next event of a kind, e.g. `?kind=station_retrograde&body=mercury`.
+
+    Args:
+        kind: Event kind
+        body: Planet (any if omitted)
+        after: Search start (defaults to now, UTC)
+
+    Returns:
+        SkyEvent
+    """
+    service = _event_service(astro_engine, [kind], body)
+
+    if after is None:
+        after = datetime.now(timezone.utc)
+    elif after.tzinfo is None:
+        after = after.replace(tzinfo=timezone.utc)
+
+    event = service.next_sky_event(kind, after, body)
+    if event is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Kein Ereignis im Kalenderzeitraum gefunden"
+        )
+    return event
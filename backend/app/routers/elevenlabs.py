@@ -1,27 +1,36 @@
 """ElevenLabs Integration Routes (Tool Callbacks & Webhooks)"""
 
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from supabase import Client
-from app.dependencies import get_supabase
+from typing import Any, Awaitable, Dict, List, Tuple
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request
+from app.dependencies import get_repositories, get_astro_engine
+from app.repositories.base import Repositories
 from app.schemas.voice import ToolCallRequest, PostCallWebhook
-from app.services.elevenlabs import validate_elevenlabs_signature
-from app.services.astro import AstroService
+from app.services.elevenlabs import ElevenLabsService, validate_elevenlabs_signature
+from app.services.astro_engine import AstroEngine
+from app.services.transit_session import TransitSession
 from app.services.audit import AuditService
+from app.services.session_context import DEFAULT_DISPLAY_NAME, SessionContext, session_context_cache
 from app.config import settings
 from math import ceil
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/v1/elevenlabs", tags=["elevenlabs"])
 
+# Response key of a requested data type (default: the data type)
+RESPONSE_KEYS = {"profile": "user_context"}
+
 
 @router.post("/tool/get_context")
 async def get_context_tool(
     request: Request,
     body: ToolCallRequest,
-    supabase: Client = Depends(get_supabase)
+    background_tasks: BackgroundTasks,
+    repositories: Repositories = Depends(get_repositories),
+    astro_engine: AstroEngine = Depends(get_astro_engine)
 ):
     """
     Tool callback for ElevenLabs agent to get user context.
@@ -35,11 +44,20 @@ async def get_context_tool(
         - DSGVO: Only returns minimal necessary data
         - Creates audit log
 
+    Performance:
+        Session, profile and natal chart come from the session context
+        cache, so a warm call reads nothing from the database; its only
+        round trip is the audit log insert, awaited before responding. The
+        requested data types are gathered concurrently, each with its own
+        timeout, so the call takes as long as its slowest branch.
+
     Args:
         body: ToolCallRequest with session_id and data_types
 
     Returns:
-        Dictionary with requested user context (natal_chart, transits, profile)
+        Dictionary with requested user context (natal_chart, transits,
+        profile); branches that failed or timed out are listed under
+        "unavailable"
     """
     try:
         # 1. Validate ElevenLabs signature
@@ -57,121 +75,50 @@ async def get_context_tool(
                 detail="Invalid signature"
             )
 
-        # 2. Validate session
-        session_response = supabase.table("voice_sessions") \
-            .select("*") \
-            .eq("id", body.session_id) \
-            .execute()
+        # 2. Validate session (cached from create_voice_session; the
+        # database is only read when this worker has no entry)
+        context = session_context_cache.get(body.session_id)
+        if context is None:
+            context, expires_at = await _load_session_context(repositories, body.session_id)
+            session_context_cache.put(body.session_id, context, expires_at)
 
-        if not session_response.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Session not found"
-            )
+        user_id = context.user_id
 
-        session = session_response.data[0]
-
-        if session["status"] != "active":
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Session is not active"
-            )
-
-        user_id = session["user_id"]
+        # Update session with conversation_id if not set (after the response)
+        if not context.conversation_id:
+            context.conversation_id = body.conversation_id
+            background_tasks.add_task(_store_conversation_id, repositories, body.session_id, body.conversation_id)
 
-        # Update session with conversation_id if not set
-        if not session.get("elevenlabs_conversation_id"):
-            supabase.table("voice_sessions") \
-                .update({"elevenlabs_conversation_id": body.conversation_id}) \
-                .eq("id", body.session_id) \
-                .execute()
-
-        # 3. Gather requested data
-        response_data = {}
+        # 3. Gather requested data: the branches are independent, so they
+        # run concurrently; one that fails or times out is reported in
+        # "unavailable" instead of failing the call
         data_types = body.parameters.get("data_types", [])
 
-        # Profile data
-        if "profile" in data_types:
-            profile_response = supabase.table("profiles") \
-                .select("display_name, locale") \
-                .eq("id", user_id) \
-                .execute()
-
-            if profile_response.data:
-                profile = profile_response.data[0]
-                response_data["user_context"] = {
-                    "display_name": profile.get("display_name") or "Sternenwanderer",
-                    "locale": profile.get("locale", "de")
-                }
-
-        # Natal chart data
-        if "natal_chart" in data_types:
-            natal_chart_response = supabase.table("natal_charts") \
-                .select("payload") \
-                .eq("user_id", user_id) \
-                .order("computed_at", desc=True) \
-                .limit(1) \
-                .execute()
-
-            if natal_chart_response.data:
-                natal_chart = natal_chart_response.data[0]["payload"]
-
-                # Convert to agent-friendly format (data minimization)
-                planets = natal_chart.get("planets", {})
-                response_data["natal_chart"] = {
-                    planet_name: {
-                        "sign": data.get("sign"),
-                        "degree": round(data.get("degree", 0), 1),
-                        "house": data.get("house")
-                    }
-                    for planet_name, data in planets.items()
-                }
-
-                # Add ascendant and midheaven
-                if "ascendant" in natal_chart:
-                    response_data["natal_chart"]["ascendant"] = {
-                        "sign": natal_chart["ascendant"].get("sign"),
-                        "degree": round(natal_chart["ascendant"].get("degree", 0), 1)
-                    }
-
-                if "midheaven" in natal_chart:
-                    response_data["natal_chart"]["midheaven"] = {
-                        "sign": natal_chart["midheaven"].get("sign"),
-                        "degree": round(natal_chart["midheaven"].get("degree", 0), 1)
-                    }
-
-        # Current transits
-        if "current_transits" in data_types:
-            # Get natal chart for transit calculation
-            natal_chart_response = supabase.table("natal_charts") \
-                .select("payload") \
-                .eq("user_id", user_id) \
-                .order("computed_at", desc=True) \
-                .limit(1) \
-                .execute()
-
-            if natal_chart_response.data:
-                astro_service = AstroService()
-                natal_chart = natal_chart_response.data[0]["payload"]
-
-                # Calculate current transits
-                transits = astro_service.calculate_transits(natal_chart)
-
-                # Convert to agent-friendly format
-                transit_data = {}
-                for aspect in transits.aspects:
-                    key = f"{aspect.transit_planet}_{aspect.type}_{aspect.natal_planet}"
-                    transit_data[key] = {
-                        "type": aspect.type,
-                        "transit_planet": aspect.transit_planet,
-                        "natal_planet": aspect.natal_planet,
-                        "orb": round(aspect.orb, 1)
-                    }
-
-                response_data["current_transits"] = transit_data
-
-        # 4. Create audit log (DSGVO)
-        audit_service = AuditService(supabase)
+        # Natal chart is kept with its transit state for the conversation
+        # (see TransitSession); both chart branches share it
+        transit_session = None
+        if context.natal_chart and ("natal_chart" in data_types or "current_transits" in data_types):
+            transit_session = astro_engine.transit_session(body.session_id, lambda: context.natal_chart)
+
+        branches = {}
+        if "profile" in data_types and context.has_profile:
+            branches["profile"] = _profile_branch(context)
+        if "natal_chart" in data_types and transit_session:
+            branches["natal_chart"] = _natal_chart_branch(transit_session.natal_chart)
+        if "current_transits" in data_types and transit_session:
+            branches["current_transits"] = _transits_branch(astro_engine, transit_session)
+
+        results, unavailable = await _gather_branches(
+            branches,
+            timeout=settings.context_branch_timeout_seconds
+        )
+        response_data = {RESPONSE_KEYS.get(data_type, data_type): result for data_type, result in results.items()}
+        if unavailable:
+            response_data["unavailable"] = unavailable
+
+        # 4. Create audit log (DSGVO). Awaited, not a background task: the
+        # record of the access must exist before the data leaves the server
+        audit_service = AuditService(repositories)
         await audit_service.log_context_accessed(
             user_id=user_id,
             session_id=body.session_id,
@@ -194,18 +141,156 @@ async def get_context_tool(
         )
 
 
+async def _gather_branches(
+    branches: Dict[str, Awaitable[Any]],
+    timeout: float
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Run the context branches concurrently, each with its own timeout.
+
+    Returns:
+        Results of the finished branches by data type, and the data types
+        whose branch failed or timed out
+    """
+    keys = list(branches)
+    results = await asyncio.gather(
+        *(asyncio.wait_for(branch, timeout=timeout) for branch in branches.values()),
+        return_exceptions=True
+    )
+
+    finished = {}
+    unavailable = []
+    for key, result in zip(keys, results):
+        if isinstance(result, asyncio.TimeoutError):
+            logger.warning(f"Context branch {key} timed out after {timeout}s")
+            unavailable.append(key)
+        elif isinstance(result, Exception):
+            logger.error(f"Context branch {key} failed: {result}")
+            unavailable.append(key)
+        else:
+            finished[key] = result
+
+    return finished, unavailable
+
+
+async def _profile_branch(context: SessionContext) -> Dict[str, Any]:
+    """Profile data"""
+    return context.profile()
+
+
+async def _natal_chart_branch(natal_chart: Dict[str, Any]) -> Dict[str, Any]:
+    """Natal chart in agent-friendly format (data minimization)"""
+    planets = natal_chart.get("planets", {})
+    chart_data = {
+        planet_name: {
+            "sign": data.get("sign"),
+            "degree": round(data.get("degree", 0), 1),
+            "house": data.get("house")
+        }
+        for planet_name, data in planets.items()
+    }
+
+    # Add ascendant and midheaven
+    if "ascendant" in natal_chart:
+        chart_data["ascendant"] = {
+            "sign": natal_chart["ascendant"].get("sign"),
+            "degree": round(natal_chart["ascendant"].get("degree", 0), 1)
+        }
+
+    if "midheaven" in natal_chart:
+        chart_data["midheaven"] = {
+            "sign": natal_chart["midheaven"].get("sign"),
+            "degree": round(natal_chart["midheaven"].get("degree", 0), 1)
+        }
+
+    return chart_data
+
+
+async def _transits_branch(astro_engine: AstroEngine, transit_session: TransitSession) -> Dict[str, Any]:
+    """Current transits in agent-friendly format"""
+    # Only planets that may have entered or left an orb since the last
+    # call are re-checked (off the event loop)
+    aspects = await astro_engine.session_transits(transit_session, resolve_exact_dates=True)
+
+    transit_data = {}
+    for aspect in aspects:
+        key = f"{aspect.transit_planet}_{aspect.type}_{aspect.natal_planet}"
+        transit_data[key] = {
+            "type": aspect.type,
+            "transit_planet": aspect.transit_planet,
+            "natal_planet": aspect.natal_planet,
+            "orb": round(aspect.orb, 1),
+            "exact_date": aspect.exact_date.isoformat() if aspect.exact_date else None
+        }
+
+    return transit_data
+
+
+async def _load_session_context(repositories: Repositories, session_id: str) -> Tuple[SessionContext, datetime]:
+    """
+    Load a session's context from the database (cache miss).
+
+    Returns:
+        Context and the expiry of the session's signed URL
+
+    Raises:
+        HTTPException: 404 if the session doesn't exist, 400 if it is not active
+    """
+    session = await repositories.voice_sessions.get(session_id)
+
+    if not session:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session not found"
+        )
+
+    if session["status"] != "active":
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Session is not active"
+        )
+
+    # Profile and natal chart only depend on the user: fetch both at once
+    user_id = session["user_id"]
+    profile, natal_chart = await asyncio.gather(
+        repositories.profiles.get(user_id),
+        repositories.natal_charts.latest_payload(user_id)
+    )
+    profile = profile or {}
+
+    context = SessionContext(
+        user_id=user_id,
+        display_name=profile.get("display_name") or DEFAULT_DISPLAY_NAME,
+        locale=profile.get("locale") or "de",
+        natal_chart=natal_chart,
+        conversation_id=session.get("elevenlabs_conversation_id"),
+        has_profile=bool(profile)
+    )
+    started_at = datetime.fromisoformat(session["started_at"]) if session.get("started_at") else datetime.utcnow()
+    return context, started_at + ElevenLabsService.SIGNED_URL_TTL
+
+
+async def _store_conversation_id(repositories: Repositories, session_id: str, conversation_id: str) -> None:
+    """Record the ElevenLabs conversation id of a session (background task)"""
+    try:
+        await repositories.voice_sessions.set_conversation_id(session_id, conversation_id)
+    except Exception as e:
+        logger.error(f"Failed to store conversation id for session {session_id}: {e}")
+
+
 @router.post("/webhook/post-call")
 async def post_call_webhook(
     request: Request,
     body: PostCallWebhook,
-    supabase: Client = Depends(get_supabase)
+    repositories: Repositories = Depends(get_repositories),
+    astro_engine: AstroEngine = Depends(get_astro_engine)
 ):
     """
     Webhook endpoint called by ElevenLabs after conversation ends.
 
     Updates:
-        - Voice session status
-        - Usage statistics (minutes used)
+        - Usage ledger, usage statistics (minutes used) and voice session
+          status, in one atomic call
         - Audit log
 
     Security:
@@ -229,63 +314,49 @@ async def post_call_webhook(
 
         # 2. Find session
         # Try by session_id first, then by conversation_id
-        session_response = None
+        session = None
 
         if body.session_id:
-            session_response = supabase.table("voice_sessions") \
-                .select("*") \
-                .eq("id", body.session_id) \
-                .execute()
+            session = await repositories.voice_sessions.get(body.session_id)
 
-        if not session_response or not session_response.data:
+        if not session:
             # Fallback: find by conversation_id
-            session_response = supabase.table("voice_sessions") \
-                .select("*") \
-                .eq("elevenlabs_conversation_id", body.conversation_id) \
-                .execute()
+            session = await repositories.voice_sessions.get_by_conversation(body.conversation_id)
 
-        if not session_response or not session_response.data:
+        if not session:
             logger.warning(f"Session not found for conversation {body.conversation_id}")
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Session not found"
             )
 
-        session = session_response.data[0]
         user_id = session["user_id"]
         session_id = session["id"]
 
+        # Conversation is over: drop its cached context and transit state
+        session_context_cache.invalidate(session_id)
+        astro_engine.transit_sessions.discard(session_id)
+
         # 3. Calculate usage
         minutes_used = ceil(body.duration_seconds / 60)
 
-        # 4. Update entitlements
-        entitlements_response = supabase.table("entitlements") \
-            .select("*") \
-            .eq("user_id", user_id) \
-            .execute()
-
-        if entitlements_response.data:
-            current_used = entitlements_response.data[0]["voice_minutes_used"]
-            new_used = current_used + minutes_used
-
-            supabase.table("entitlements") \
-                .update({"voice_minutes_used": new_used}) \
-                .eq("user_id", user_id) \
-                .execute()
-
-        # 5. Update session
-        supabase.table("voice_sessions") \
-            .update({
-                "status": "completed",
-                "ended_at": body.ended_at.isoformat(),
-                "duration_seconds": body.duration_seconds,
-                "elevenlabs_conversation_id": body.conversation_id
-            }) \
-            .eq("id", session_id) \
-            .execute()
-
-        # 6. Audit log
-        audit_service = AuditService(supabase)
+        # 4. Book usage and complete the session (one atomic call; a
+        # repeated webhook for the same session books nothing)
+        recorded = await repositories.voice_usage.record(
+            session_id,
+            user_id=user_id,
+            conversation_id=body.conversation_id,
+            duration_seconds=body.duration_seconds,
+            minutes=minutes_used,
+            ended_at=body.ended_at
+        )
+
+        if not recorded:
+            logger.info(f"Usage of session {session_id} already recorded")
+            return {"status": "ok", "minutes_used": 0}
+
+        # 5. Audit log
+        audit_service = AuditService(repositories)
         await audit_service.log_session_ended(
             user_id=user_id,
             session_id=session_id,
@@ -1,16 +1,13 @@
 """Voice Chat API Routes"""
 
-from datetime import datetime
-from typing import Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, status, Request
-from supabase import Client
-from app.dependencies import get_current_user, get_supabase, get_client_info
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, Request
+from app.dependencies import get_current_user, get_repositories, get_client_info
 from app.models.user import User
+from app.repositories.base import BootstrapError, Repositories
 from app.schemas.voice import VoiceSessionRequest, VoiceSessionResponse, VoiceUsageResponse
-from app.services.consent import ConsentService
+from app.services.consent import ConsentOutdatedException, ConsentRequiredException
 from app.services.elevenlabs import ElevenLabsService
-from app.services.astro import AstroService
-from app.services.audit import AuditService
+from app.services.session_context import DEFAULT_DISPLAY_NAME, SessionContext, session_context_cache
 from app.config import settings
 import secrets
 from math import ceil
@@ -25,123 +22,91 @@ router = APIRouter(prefix="/v1/voice", tags=["voice"])
 async def create_voice_session(
     request_data: VoiceSessionRequest,
     request: Request,
+    background_tasks: BackgroundTasks,
     user: User = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    repositories: Repositories = Depends(get_repositories)
 ):
     """
     Create a new voice chat session.
 
     Steps:
-    1. Check voice consent
-    2. Check entitlements (plan, minutes)
-    3. Load natal chart
-    4. Create ElevenLabs session
-    5. Save session to DB
-    6. Create audit log
+    1. Bootstrap the session in one database call: check voice consent,
+       entitlements (plan, minutes) and natal chart, insert the session
+       and its audit log
+    2. Create ElevenLabs session
+    3. Record the ElevenLabs session id (background) and cache the
+       session context for the tool callback
 
     Returns:
         VoiceSessionResponse with signed URL and usage limits
     """
     try:
-        # Initialize services
-        consent_service = ConsentService(supabase)
         elevenlabs_service = ElevenLabsService()
-        astro_service = AstroService()
-        audit_service = AuditService(supabase)
 
-        # 1. Check consent
-        await consent_service.check_voice_consent(str(user.id))
-
-        # 2. Check entitlements
-        entitlements_response = supabase.table("entitlements") \
-            .select("*") \
-            .eq("user_id", str(user.id)) \
-            .execute()
-
-        if not entitlements_response.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Keine Entitlements gefunden"
-            )
+        # 1. Bootstrap session
+        session_id = f"vs_{secrets.token_urlsafe(16)}"
+        client_info = await get_client_info(request)
 
-        entitlements = entitlements_response.data[0]
+        bootstrap = await repositories.voice_sessions.bootstrap(
+            session_id=session_id,
+            user_id=str(user.id),
+            voice_mode=request_data.voice_mode,
+            consent_version=settings.current_consent_version,
+            ip_address=client_info["ip_address"],
+            user_agent=client_info["user_agent"]
+        )
 
-        # Check plan
-        if entitlements["plan"] != "premium":
-            raise HTTPException(
-                status_code=status.HTTP_402_PAYMENT_REQUIRED,
-                detail="Premium-Abo erforderlich für Voice-Features"
-            )
+        if bootstrap.error:
+            logger.info(f"Voice session for user {user.id} refused: {bootstrap.error}")
+            raise _bootstrap_exception(bootstrap.error)
 
-        # Check minutes
+        entitlements = bootstrap.entitlements
+        natal_chart = bootstrap.natal_chart
+        display_name = bootstrap.display_name or DEFAULT_DISPLAY_NAME
+        locale = bootstrap.locale or "de"
         remaining = entitlements["voice_minutes_monthly"] - entitlements["voice_minutes_used"]
-        if remaining <= 0:
-            raise HTTPException(
-                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                detail="Monatliche Voice-Minuten aufgebraucht"
-            )
-
-        # 3. Load natal chart
-        natal_chart_response = supabase.table("natal_charts") \
-            .select("*") \
-            .eq("user_id", str(user.id)) \
-            .order("computed_at", desc=True) \
-            .limit(1) \
-            .execute()
-
-        if not natal_chart_response.data:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Bitte Geburtsdaten eingeben"
-            )
-
-        natal_chart = natal_chart_response.data[0]
-
-        # Get profile for display name
-        profile_response = supabase.table("profiles") \
-            .select("display_name") \
-            .eq("id", str(user.id)) \
-            .execute()
 
-        display_name = "Sternenwanderer"
-        if profile_response.data:
-            display_name = profile_response.data[0].get("display_name") or "Sternenwanderer"
-
-        # 4. Create ElevenLabs session
-        session_id = f"vs_{secrets.token_urlsafe(16)}"
+        # 2. Create ElevenLabs session
         tool_callback_url = f"{settings.api_url}/v1/elevenlabs/tool/get_context"
 
-        elevenlabs_response = await elevenlabs_service.create_session(
-            user_id=str(user.id),
-            voice_mode=request_data.voice_mode,
-            tool_callback_url=tool_callback_url,
-            natal_chart=natal_chart["payload"]
+        try:
+            elevenlabs_response = await elevenlabs_service.create_session(
+                user_id=str(user.id),
+                voice_mode=request_data.voice_mode,
+                tool_callback_url=tool_callback_url,
+                natal_chart=natal_chart
+            )
+        except Exception as e:
+            # Keep the ElevenLabs error: a failing status update must not replace it
+            try:
+                await repositories.voice_sessions.fail(session_id, str(e))
+            except Exception as fail_error:
+                logger.error(f"Could not mark voice session {session_id} failed: {fail_error}")
+            raise
+
+        # 3. Link the ElevenLabs session after responding
+        background_tasks.add_task(
+            repositories.voice_sessions.set_elevenlabs_session_id,
+            session_id,
+            elevenlabs_response.conversation_id
         )
 
-        # 5. Save session to DB
-        session_data = {
-            "id": session_id,
-            "user_id": str(user.id),
-            "elevenlabs_session_id": elevenlabs_response.conversation_id,
-            "status": "active",
-            "voice_mode": request_data.voice_mode,
-            "started_at": datetime.utcnow().isoformat()
-        }
-
-        supabase.table("voice_sessions").insert(session_data).execute()
-
-        # 6. Audit log
-        client_info = await get_client_info(request)
-        await audit_service.log_session_created(
-            user_id=str(user.id),
-            session_id=session_id,
-            voice_mode=request_data.voice_mode,
-            ip_address=client_info["ip_address"],
-            user_agent=client_info["user_agent"]
+        # Tool calls of this session are served from memory until the
+        # signed URL expires or the post-call webhook ends the session
+        session_context_cache.put(
+            session_id,
+            SessionContext(
+                user_id=str(user.id),
+                display_name=display_name,
+                locale=locale,
+                natal_chart=natal_chart,
+                has_profile=bootstrap.locale is not None  # profiles.locale is NOT NULL
+            ),
+            expires_at=elevenlabs_response.expires_at
         )
 
         # Extract sun sign for dynamic variables
-        sun_sign = natal_chart["payload"].get("planets", {}).get("sun", {}).get("sign", "Unknown")
+        sun_sign = natal_chart.get("planets", {}).get("sun", {}).get("sign", "Unknown")
 
         return VoiceSessionResponse(
             signed_url=elevenlabs_response.signed_url,
@@ -168,10 +133,37 @@ async def create_voice_session(
         )
 
 
+def _bootstrap_exception(error: BootstrapError) -> HTTPException:
+    """HTTP error for a refused session bootstrap"""
+    if error == "consent_required":
+        return ConsentRequiredException()
+    if error == "consent_outdated":
+        return ConsentOutdatedException()
+    if error == "no_entitlements":
+        return HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Keine Entitlements gefunden"
+        )
+    if error == "premium_required":
+        return HTTPException(
+            status_code=status.HTTP_402_PAYMENT_REQUIRED,
+            detail="Premium-Abo erforderlich für Voice-Features"
+        )
+    if error == "minutes_exhausted":
+        return HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Monatliche Voice-Minuten aufgebraucht"
+        )
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Bitte Geburtsdaten eingeben"
+    )
+
+
 @router.get("/usage", response_model=VoiceUsageResponse)
 async def get_voice_usage(
     user: User = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase)
+    repositories: Repositories = Depends(get_repositories)
 ):
     """
     Get voice usage statistics for current user.
@@ -180,30 +172,21 @@ async def get_voice_usage(
         VoiceUsageResponse with plan, minutes, and recent sessions
     """
     try:
-        # Get entitlements
-        entitlements_response = supabase.table("entitlements") \
-            .select("*") \
-            .eq("user_id", str(user.id)) \
-            .execute()
+        # Get entitlements (voice_minutes_used is the aggregate of the
+        # usage ledger, kept current by the post-call webhook)
+        entitlements = await repositories.entitlements.get(str(user.id))
 
-        if not entitlements_response.data:
+        if not entitlements:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Keine Entitlements gefunden"
             )
 
-        entitlements = entitlements_response.data[0]
-
         # Get recent sessions
-        sessions_response = supabase.table("voice_sessions") \
-            .select("id, started_at, ended_at, duration_seconds, voice_mode, status") \
-            .eq("user_id", str(user.id)) \
-            .order("started_at", desc=True) \
-            .limit(10) \
-            .execute()
+        sessions = await repositories.voice_sessions.recent_for_user(str(user.id), limit=10)
 
         recent_sessions = []
-        for session in sessions_response.data:
+        for session in sessions:
             duration_minutes = 0
             if session.get("duration_seconds"):
                 duration_minutes = ceil(session["duration_seconds"] / 60)
@@ -19,7 +19,15 @@ class NatalChartResponse(BaseModel):
     ascendant: Dict[str, Any]
     midheaven: Dict[str, Any]
     houses: list[float]
-    computed_at: datetime
+    patterns: list[Dict[str, Any]] = []
+    engine_version: str  # Response depends only on the input and this version
+
+
+class AstrocartographyResponse(BaseModel):
+    """Astrocartography lines for the user's birth moment"""
+    birth_utc: datetime
+    lines: list[Dict[str, Any]]  # {"planet", "angle", "segments": [[[lon, lat], ...], ...]}
+    engine_version: str
 
 
 class TransitRequest(BaseModel):
@@ -31,4 +39,5 @@ class TransitRequest(BaseModel):
 class TransitResponse(BaseModel):
     """Response with transit data"""
     aspects: list[Dict[str, Any]]
+    patterns: list[Dict[str, Any]] = []
     computed_at: datetime
@@ -0,0 +1,148 @@
+"""Vectorized aspect matching (NumPy)"""
+
+from typing import Any, Dict, Iterable, List, NamedTuple, Sequence, Tuple
+import numpy as np
+from app.services.chart_codec import LazyChartPayload
+
+
+class AspectHits(NamedTuple):
+    """
+    Matched aspects as parallel index arrays.
+
+    Hits are ordered by chart, then transit planet, then natal planet,
+    then aspect type - the same order as a nested Python loop.
+    """
+    chart: np.ndarray      # Index into the stacked natal charts
+    transit: np.ndarray    # Index into the transit longitudes
+    natal: np.ndarray      # Index into the natal planet columns
+    aspect: np.ndarray     # Index into the aspect table
+    orb: np.ndarray        # Distance from the exact aspect angle (degrees)
+
+
+class AspectKernel:
+    """
+    Broadcast aspect search over all planet pairs and aspect types.
+
+    Angular differences and orb tests for every (chart, transit planet,
+    natal planet, aspect) combination are evaluated as one array
+    operation per chunk of charts instead of a Python triple loop.
+    """
+
+    def __init__(self, aspects: Sequence[Tuple[str, float, float]]):
+        """
+        Args:
+            aspects: Aspect table as (name, angle, orb) tuples
+        """
+        self.names = [name for name, _, _ in aspects]
+        self.angles = np.array([angle for _, angle, _ in aspects], dtype=np.float64)
+        self.orbs = np.array([orb for _, _, orb in aspects], dtype=np.float64)
+
+    def match(
+        self,
+        transit_lons: np.ndarray,
+        natal_lons: np.ndarray,
+        chunk_size: int = 4096
+    ) -> AspectHits:
+        """
+        Find all aspects between transiting and natal longitudes.
+
+        Args:
+            transit_lons: Transiting longitudes, shape (T,)
+            natal_lons: Natal longitudes, shape (P,) for one chart or
+                (C, P) for a stack of charts. NaN marks a missing planet.
+            chunk_size: Charts per broadcast block (bounds peak memory)
+
+        Returns:
+            AspectHits (chart index is always 0 for a single chart)
+        """
+        transit_lons = np.asarray(transit_lons, dtype=np.float64)
+        natal_lons = np.asarray(natal_lons, dtype=np.float64)
+        if natal_lons.ndim == 1:
+            natal_lons = natal_lons[np.newaxis, :]
+
+        parts = []
+        for start in range(0, natal_lons.shape[0], chunk_size):
+            block = natal_lons[start:start + chunk_size]
+
+            # (C, T, P) smallest angular separation
+            diff = np.abs(transit_lons[np.newaxis, :, np.newaxis] - block[:, np.newaxis, :])
+            diff = np.where(diff > 180, 360 - diff, diff)
+
+            # (C, T, P, K) deviation from each aspect angle
+            deviation = np.abs(diff[..., np.newaxis] - self.angles)
+            chart, transit, natal, aspect = np.nonzero(deviation <= self.orbs)
+
+            parts.append((chart + start, transit, natal, aspect, deviation[chart, transit, natal, aspect]))
+
+        if not parts:
+            empty = np.empty(0, dtype=np.intp)
+            return AspectHits(empty, empty, empty, empty, np.empty(0, dtype=np.float64))
+
+        return AspectHits(*(np.concatenate(column) for column in zip(*parts)))
+
+    def boundary_distance(self, transit_lons: np.ndarray, natal_lons: np.ndarray) -> np.ndarray:
+        """
+        Distance of each transiting planet to its nearest orb boundary.
+
+        A transiting planet that moves less than this can't enter or
+        leave any aspect to the (fixed) natal positions.
+
+        Args:
+            transit_lons: Transiting longitudes, shape (T,)
+            natal_lons: Natal longitudes of one chart, shape (P,); NaN is ignored
+
+        Returns:
+            Degrees per transiting planet, shape (T,) (inf without natal planets)
+        """
+        transit_lons = np.asarray(transit_lons, dtype=np.float64)
+        natal_lons = np.asarray(natal_lons, dtype=np.float64)
+        natal_lons = natal_lons[~np.isnan(natal_lons)]
+        if natal_lons.size == 0:
+            return np.full(transit_lons.shape, np.inf)
+
+        diff = np.abs(transit_lons[:, np.newaxis] - natal_lons[np.newaxis, :])
+        diff = np.where(diff > 180, 360 - diff, diff)
+        deviation = np.abs(diff[..., np.newaxis] - self.angles)
+        return np.abs(deviation - self.orbs).min(axis=(1, 2))
+
+
+def natal_longitudes(natal_chart: Dict[str, Any]) -> Tuple[List[str], np.ndarray]:
+    """
+    Extract planet names and longitudes from a natal chart payload.
+
+    Returns:
+        Tuple of (planet names in payload order, longitudes array)
+    """
+    if isinstance(natal_chart, LazyChartPayload):
+        # Read straight from the packed array, no planet dicts
+        return natal_chart.longitudes()
+
+    planets = natal_chart.get("planets", {})
+    names = list(planets)
+    lons = np.fromiter(
+        (planets[name]["lon_absolute"] for name in names),
+        dtype=np.float64,
+        count=len(names)
+    )
+    return names, lons
+
+
+def stack_natal_longitudes(
+    natal_charts: Iterable[Dict[str, Any]],
+    planet_names: Sequence[str]
+) -> np.ndarray:
+    """
+    Stack many natal chart payloads into a (C, P) longitude array.
+
+    Planets missing from a payload are filled with NaN, which never
+    matches an aspect.
+    """
+    rows = []
+    for natal_chart in natal_charts:
+        planets = natal_chart.get("planets", {})
+        rows.append([
+            planets[name]["lon_absolute"] if name in planets else np.nan
+            for name in planet_names
+        ])
+
+    return np.array(rows, dtype=np.float64).reshape(len(rows), len(planet_names))
@@ -1,10 +1,26 @@
 """Astrology Service (Swiss Ephemeris Integration)"""
 
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
-from typing import Dict, Any, Optional, List
+from pathlib import Path
+from typing import Dict, Any, Iterator, Optional, List, Tuple
+import os
+import numpy as np
 import swisseph as swe
 from app.config import settings
-from app.models.astro import PlanetPosition, Aspect, Transit
+from app.models.astro import PlanetPosition, Aspect, AspectPattern, SkyEvent, SynastryAspect, Transit, TransitEvent
+from app.services.aspects import AspectHits, AspectKernel, natal_longitudes, stack_natal_longitudes
+from app.services.astro_batch import BirthBatch, NatalChartBatch, batch_pool, iter_natal_chart_batches, to_julian_days
+from app.services.astrocartography import angular_lines, lines_to_payload
+from app.services.chart_record import ChartRecord, SIGNS as ZODIAC_SIGNS, find_house, unwrap_cusps
+from app.services.chebyshev import ChebyshevEphemeris
+from app.services.event_catalog import ECLIPSE_TYPES, CatalogEvent, EventCatalog
+from app.services.exact_time import ExactTimeSolver, datetime_from_jd
+from app.services.forecast import iter_transit_events
+from app.services.patterns import PatternHits, detect_patterns, patterns_to_payload
+from app.services.sky_cache import SkyCache, SkyPositions
+from app.services.synastry import SynastryKernel
+from app.services.transit_session import TransitPlanetUpdate, TransitSession
 import logging
 
 logger = logging.getLogger(__name__)
@@ -14,11 +30,7 @@ class AstroService:
     """Service for astrological calculations using Swiss Ephemeris"""
 
     # Zodiac signs (German)
-    SIGNS = [
-        "Widder", "Stier", "Zwillinge", "Krebs",
-        "Löwe", "Jungfrau", "Waage", "Skorpion",
-        "Schütze", "Steinbock", "Wassermann", "Fische"
-    ]
+    SIGNS = ZODIAC_SIGNS
 
     # Planets to calculate
     PLANETS = [
@@ -34,6 +46,17 @@ class AstroService:
         (swe.PLUTO, "pluto"),
     ]
 
+    # House system names (API) to Swiss Ephemeris codes
+    HOUSE_SYSTEMS = {
+        "placidus": "P",
+        "koch": "K",
+        "porphyry": "O",
+        "regiomontanus": "R",
+        "campanus": "C",
+        "equal": "E",
+        "whole_sign": "W",
+    }
+
     # Major aspects
     ASPECTS = [
         ("conjunction", 0, 8),    # Orb: ±8°
@@ -43,19 +66,94 @@ class AstroService:
         ("opposition", 180, 8),    # Orb: ±8°
     ]
 
+    # Vectorized matcher over ASPECTS
+    aspect_kernel = AspectKernel(ASPECTS)
+
+    # Vectorized chart-to-chart scoring over ASPECTS
+    synastry_kernel = SynastryKernel(ASPECTS)
+
+    # Stored with each chart (natal_charts.engine_version)
+    ENGINE_VERSION = "swisseph-" + ".".join(swe.version.split(".")[:2])
+
+    # Bumped whenever the natal payload layout changes
+    PAYLOAD_VERSION = 3
+
+    # Ephemeris files required for full Swiss Ephemeris precision
+    # (planets and moon, 1800-2399 AD)
+    EPHEMERIS_FILES = ["sepl_18.se1", "semo_18.se1"]
+
+    # Set once per process by configure_ephemeris()
+    _ephemeris_configured = False
+    _chebyshev: Optional[ChebyshevEphemeris] = None
+    _event_catalog: Optional[EventCatalog] = None
+
     def __init__(self):
         """Initialize Swiss Ephemeris"""
+        self.configure_ephemeris()
+
+    @classmethod
+    def configure_ephemeris(cls) -> None:
+        """Set the ephemeris path (once per process)"""
+        if cls._ephemeris_configured:
+            return
+
         # Set ephemeris path if configured
         if settings.swisseph_path:
             swe.set_ephe_path(settings.swisseph_path)
+
+        # Optional precomputed ephemeris for bulk positions
+        if settings.chebyshev_ephemeris_path:
+            try:
+                cls._chebyshev = ChebyshevEphemeris(settings.chebyshev_ephemeris_path)
+            except OSError as e:
+                logger.warning(f"Chebyshev ephemeris not loaded: {e}")
+
+        # Optional precomputed stations/ingresses/lunations/eclipses
+        if settings.event_catalog_path:
+            try:
+                cls._event_catalog = EventCatalog(settings.event_catalog_path)
+            except OSError as e:
+                logger.warning(f"Event catalog not loaded: {e}")
+
+        cls._ephemeris_configured = True
         logger.info("AstroService initialized")
 
+    @classmethod
+    def missing_ephemeris_files(cls) -> List[str]:
+        """List required .se1 files not present under settings.swisseph_path"""
+        ephe_dir = Path(settings.swisseph_path or ".")
+        return [name for name in cls.EPHEMERIS_FILES if not (ephe_dir / name).is_file()]
+
+    def warmup(self) -> str:
+        """
+        Run sample calculations so ephemeris files are opened and cached.
+
+        Returns:
+            Ephemeris mode actually used: 'swisseph' or 'moshier'
+        """
+        jd = swe.julday(2000, 1, 1, 12.0)
+        mode = "swisseph"
+
+        for planet_id, _ in self.PLANETS:
+            _, ret_flag = swe.calc_ut(jd, planet_id)
+            if ret_flag & swe.FLG_MOSEPH:
+                mode = "moshier"
+
+        swe.houses(jd, 52.52, 13.40, b"P")
+        return mode
+
+    @classmethod
+    def init_worker(cls) -> None:
+        """Process pool initializer: configure and warm up each worker once, before its first task"""
+        cls().warmup()
+
     def calculate_natal_chart(
         self,
         birth_utc: datetime,
         lat: float,
         lon: float,
-        house_system: str = "P"  # P = Placidus
+        house_system: str = "P",  # P = Placidus
+        include_patterns: bool = False
     ) -> Dict[str, Any]:
         """
         Calculate natal chart using Swiss Ephemeris.
@@ -65,9 +163,24 @@ class AstroService:
             lat: Latitude
             lon: Longitude
             house_system: House system ('P' = Placidus, 'K' = Koch, etc.)
+            include_patterns: Add "patterns" (grand trine, T-square, yod,
+                stellium); about as expensive as the chart itself
 
         Returns:
-            Dictionary with planets, ascendant, midheaven, houses
+            Dictionary with planets, ascendant, midheaven, houses (and patterns)
+        """
+        return self.calculate_natal_record(birth_utc, lat, lon, house_system, include_patterns).to_payload()
+
+    def calculate_natal_record(
+        self,
+        birth_utc: datetime,
+        lat: float,
+        lon: float,
+        house_system: str = "P",
+        include_patterns: bool = False
+    ) -> ChartRecord:
+        """
+        Calculate a natal chart as a compact ChartRecord (see calculate_natal_chart).
         """
         try:
             # Calculate Julian Day
@@ -79,58 +192,122 @@ class AstroService:
             )
 
             # Calculate planets
-            planets = {}
-            for planet_id, planet_name in self.PLANETS:
+            lons, speeds = [], []
+            for planet_id, _ in self.PLANETS:
                 result, ret_flag = swe.calc_ut(jd, planet_id)
-                lon_deg = result[0]  # Ecliptic longitude
-
-                sign, degree = self._to_zodiac(lon_deg)
-
-                planets[planet_name] = {
-                    "sign": sign,
-                    "degree": round(degree, 2),
-                    "lon_absolute": round(lon_deg, 6)
-                }
+                lons.append(result[0])  # Ecliptic longitude
+                speeds.append(result[3])
 
             # Calculate houses (Placidus or other system)
             houses_cusps, ascmc = swe.houses(jd, lat, lon, house_system.encode())
 
-            # Assign houses to planets
-            for planet_name in planets:
-                planet_lon = planets[planet_name]["lon_absolute"]
-                house_num = self._find_house(planet_lon, houses_cusps)
-                planets[planet_name]["house"] = house_num
-
-            # Ascendant & Midheaven
-            asc_sign, asc_deg = self._to_zodiac(ascmc[0])
-            mc_sign, mc_deg = self._to_zodiac(ascmc[1])
-
-            result = {
-                "planets": planets,
-                "ascendant": {
-                    "sign": asc_sign,
-                    "degree": round(asc_deg, 2),
-                    "lon_absolute": round(ascmc[0], 6)
-                },
-                "midheaven": {
-                    "sign": mc_sign,
-                    "degree": round(mc_deg, 2),
-                    "lon_absolute": round(ascmc[1], 6)
-                },
-                "houses": [round(h, 2) for h in houses_cusps]
-            }
+            # Signs, rounding and house assignment (binary search on unwrapped cusps)
+            record = ChartRecord.from_calculation(
+                [planet_name for _, planet_name in self.PLANETS],
+                lons,
+                speeds,
+                houses_cusps,
+                ascendant=ascmc[0],
+                midheaven=ascmc[1]
+            )
+
+            # Aspect patterns (grand trine, T-square, yod, stellium)
+            if include_patterns:
+                hits = detect_patterns(record.lons[np.newaxis], record.signs[np.newaxis], self.ASPECTS)
+                record.extras["patterns"] = patterns_to_payload(hits, record.planets)
 
             logger.info(f"Natal chart calculated for {birth_utc}")
-            return result
+            return record
 
         except Exception as e:
             logger.error(f"Error calculating natal chart: {e}")
             raise
 
+    def calculate_natal_charts_batch(
+        self,
+        births: BirthBatch,
+        house_system: str = "P",
+        chunk_size: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        executor: Optional[ProcessPoolExecutor] = None
+    ) -> Iterator[NatalChartBatch]:
+        """
+        Calculate many natal charts across a bounded process pool.
+
+        Args:
+            births: Columnar birth times (UTC) and coordinates
+            house_system: House system ('P' = Placidus, 'K' = Koch, etc.)
+            chunk_size: Charts per chunk (defaults to settings)
+            max_workers: Worker processes (defaults to settings / all cores)
+            executor: Shared pool from natal_batch_pool() (a pool per call if None)
+
+        Yields:
+            NatalChartBatch with columnar longitudes, signs, houses and cusps,
+            in input order
+        """
+        return iter_natal_chart_batches(
+            births,
+            planet_ids=[planet_id for planet_id, _ in self.PLANETS],
+            house_system=house_system,
+            chunk_size=chunk_size or settings.astro_batch_chunk_size,
+            max_workers=self.batch_workers(max_workers),
+            ephe_path=settings.swisseph_path,
+            executor=executor
+        )
+
+    @staticmethod
+    def batch_workers(max_workers: Optional[int] = None) -> int:
+        """Worker processes a natal batch runs on (argument, settings, then all cores)"""
+        return max_workers or settings.astro_batch_workers or os.cpu_count() or 1
+
+    def natal_batch_pool(self, max_workers: Optional[int] = None) -> ProcessPoolExecutor:
+        """Process pool to share across calculate_natal_charts_batch calls"""
+        return batch_pool(self.batch_workers(max_workers), settings.swisseph_path)
+
+    def natal_records_from_batch(self, batch: NatalChartBatch) -> List[ChartRecord]:
+        """
+        Build ChartRecords from a batch chunk, as calculate_natal_record would.
+
+        Applies the payload rounding and house assignment per chart and
+        detects aspect patterns for the whole chunk in one pass.
+
+        Returns:
+            ChartRecord per batch row, in batch order
+        """
+        planet_names = [name for _, name in self.PLANETS]
+        records = [
+            ChartRecord.from_calculation(
+                planet_names,
+                batch.longitudes[i].tolist(),
+                batch.speeds[i].tolist(),
+                batch.cusps[i].tolist(),
+                ascendant=float(batch.ascendant[i]),
+                midheaven=float(batch.midheaven[i])
+            )
+            for i in range(len(batch))
+        ]
+        if not records:
+            return records
+
+        hits = detect_patterns(
+            np.stack([record.lons for record in records]),
+            np.stack([record.signs for record in records]),
+            self.ASPECTS
+        )
+        bounds = np.searchsorted(hits.chart, np.arange(len(records) + 1))
+        for chart, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+            records[chart].extras["patterns"] = patterns_to_payload(
+                PatternHits(*(column[start:end] for column in hits)), planet_names, chart
+            )
+
+        return records
+
     def calculate_transits(
         self,
         natal_chart: Dict[str, Any],
-        transit_date: Optional[datetime] = None
+        transit_date: Optional[datetime] = None,
+        resolve_exact_dates: bool = False,
+        include_patterns: bool = False
     ) -> Transit:
         """
         Calculate current transits to natal chart.
@@ -138,6 +315,10 @@ class AstroService:
         Args:
             natal_chart: Natal chart payload
             transit_date: Date for transits (defaults to now)
+            resolve_exact_dates: Fill Aspect.exact_date (nearest time the
+                aspect is or was exact)
+            include_patterns: Fill Transit.patterns (mixed transit/natal
+                patterns; costs more than matching the aspects)
 
         Returns:
             Transit object with aspects
@@ -146,46 +327,26 @@ class AstroService:
             if transit_date is None:
                 transit_date = datetime.now(timezone.utc)
 
-            # Calculate Julian Day for transit date
-            jd = swe.julday(
-                transit_date.year,
-                transit_date.month,
-                transit_date.day,
-                transit_date.hour + transit_date.minute / 60.0
-            )
-
-            # Calculate current planet positions
-            transiting_planets = {}
-            for planet_id, planet_name in self.PLANETS:
-                result, _ = swe.calc_ut(jd, planet_id)
-                transiting_planets[planet_name] = result[0]
-
-            # Find aspects
-            aspects: List[Aspect] = []
-            natal_planets = natal_chart.get("planets", {})
-
-            for transit_name, transit_lon in transiting_planets.items():
-                for natal_name, natal_data in natal_planets.items():
-                    natal_lon = natal_data["lon_absolute"]
+            # Transiting positions are shared by all users (see SkyCache)
+            sky = sky_cache.get(transit_date)
+            transiting_planets = sky.longitudes
 
-                    # Check each aspect type
-                    for aspect_name, aspect_angle, orb in self.ASPECTS:
-                        angle_diff = self._calculate_angle_diff(transit_lon, natal_lon)
+            # Find aspects (all pairs and aspect types in one broadcast)
+            natal_names, natal_lons = natal_longitudes(natal_chart)
+            transit_names = list(transiting_planets)
 
-                        aspect_orb = abs(angle_diff - aspect_angle)
+            aspects = self._transit_aspects(sky, transit_names, natal_names, natal_lons, resolve_exact_dates)
 
-                        if aspect_orb <= orb:
-                            aspects.append(Aspect(
-                                type=aspect_name,
-                                transit_planet=transit_name,
-                                natal_planet=natal_name,
-                                orb=round(aspect_orb, 2)
-                            ))
+            patterns = []
+            if include_patterns:
+                transit_lons = np.fromiter(transiting_planets.values(), dtype=np.float64)
+                patterns = self._transit_patterns(natal_names, natal_lons, transit_names, transit_lons)
 
             logger.info(f"Calculated {len(aspects)} transits for {transit_date}")
 
             return Transit(
                 aspects=aspects,
+                patterns=patterns,
                 computed_at=transit_date
             )
 
@@ -193,6 +354,379 @@ class AstroService:
             logger.error(f"Error calculating transits: {e}")
             raise
 
+    def evaluate_transit_session(
+        self,
+        session: TransitSession,
+        transit_date: Optional[datetime] = None,
+        resolve_exact_dates: bool = False
+    ) -> Tuple[List[Aspect], int]:
+        """
+        Bring a conversation's transits up to date incrementally.
+
+        Only planets that could have crossed an orb boundary since their
+        last evaluation (see TransitSession.stale) are matched again; the
+        others keep their aspects from memory.
+
+        Args:
+            session: Per-conversation transit state
+            transit_date: Date for transits (defaults to now)
+            resolve_exact_dates: Fill Aspect.exact_date
+
+        Returns:
+            Tuple of (aspects in calculate_transits order, number of
+            planets re-checked)
+        """
+        if transit_date is None:
+            transit_date = datetime.now(timezone.utc)
+
+        jd = sky_cache.bucket_jd(sky_cache.bucket_for(transit_date))
+        max_age_days = settings.transit_session_max_age_seconds / 86400
+
+        with session.lock:
+            rows = session.stale_rows(jd, max_age_days, resolve_exact_dates)
+            if rows:
+                update = self.evaluate_transit_planets(
+                    [session.planets[row] for row in rows],
+                    session.natal_names,
+                    session.natal_lons,
+                    transit_date,
+                    resolve_exact_dates
+                )
+                session.apply(rows, update, resolve_exact_dates)
+
+            return session.current_aspects(), len(rows)
+
+    def evaluate_transit_planets(
+        self,
+        planets: List[str],
+        natal_names: List[str],
+        natal_lons: np.ndarray,
+        transit_date: datetime,
+        resolve_exact_dates: bool = False
+    ) -> TransitPlanetUpdate:
+        """
+        Aspects and orb boundary distances of some transiting planets.
+
+        Takes and returns plain values only, so it can run in a worker
+        process; the caller applies the result to its TransitSession.
+        """
+        sky = sky_cache.get(transit_date)
+        aspects = self._transit_aspects(sky, planets, natal_names, natal_lons, resolve_exact_dates)
+        lons = np.array([sky.longitudes[name] for name in planets])
+
+        return TransitPlanetUpdate(
+            jd=sky.jd,
+            aspects=[[aspect for aspect in aspects if aspect.transit_planet == name] for name in planets],
+            margins=self.aspect_kernel.boundary_distance(lons, natal_lons),
+            speeds=np.array([sky.speeds[name] for name in planets])
+        )
+
+    def _transit_aspects(
+        self,
+        sky: SkyPositions,
+        transit_names: List[str],
+        natal_names: List[str],
+        natal_lons: np.ndarray,
+        resolve_exact_dates: bool = False
+    ) -> List[Aspect]:
+        """Aspects from the given transiting planets (positions from `sky`) to a natal chart"""
+        transit_lons = np.array([sky.longitudes[name] for name in transit_names], dtype=np.float64)
+        hits = self.aspect_kernel.match(transit_lons, natal_lons)
+        aspects: List[Aspect] = [
+            Aspect(
+                type=self.aspect_kernel.names[a],
+                transit_planet=transit_names[t],
+                natal_planet=natal_names[n],
+                orb=round(orb, 2),
+                transit_retrograde=sky.speeds[transit_names[t]] < 0
+            )
+            for t, n, a, orb in zip(
+                hits.transit.tolist(), hits.natal.tolist(), hits.aspect.tolist(), hits.orb.tolist()
+            )
+        ]
+
+        if resolve_exact_dates:
+            for aspect, n, a in zip(aspects, hits.natal.tolist(), hits.aspect.tolist()):
+                _, aspect_angle, orb = self.ASPECTS[a]
+                exact_jd = exact_time_solver.exact_jd(
+                    aspect.transit_planet,
+                    float(natal_lons[n]),
+                    aspect_angle,
+                    orb,
+                    sky.jd,
+                    sky.longitudes[aspect.transit_planet],
+                    sky.speeds[aspect.transit_planet]
+                )
+                if exact_jd is not None:
+                    aspect.exact_date = datetime_from_jd(exact_jd)
+
+        return aspects
+
+    def _transit_patterns(
+        self,
+        natal_names: List[str],
+        natal_lons: np.ndarray,
+        transit_names: List[str],
+        transit_lons: np.ndarray
+    ) -> List[AspectPattern]:
+        """
+        Aspect patterns formed jointly by transiting and natal planets.
+
+        Patterns within the natal chart alone are part of the natal
+        payload, and patterns within the sky alone are the same for every
+        user, so only mixed patterns are reported. Transiting planets are
+        named "transit_<planet>".
+        """
+        lons = np.concatenate([natal_lons, transit_lons])[np.newaxis]
+        names = natal_names + [f"transit_{name}" for name in transit_names]
+
+        hits = detect_patterns(lons, (lons // 30).astype(np.int8), self.ASPECTS)
+        natal_bits = (1 << len(natal_names)) - 1
+        mixed = (hits.members & natal_bits != 0) & (hits.members & ~natal_bits != 0)
+
+        return [
+            AspectPattern(**pattern)
+            for pattern in patterns_to_payload(PatternHits(*(column[mixed] for column in hits)), names)
+        ]
+
+    def detect_patterns_batch(self, natal_charts: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Detect aspect patterns for many natal chart payloads at once.
+
+        Intended for nightly batches over natal_charts; see detect_patterns.
+
+        Returns:
+            Pattern payload list per chart, in input order
+        """
+        planet_names = [name for _, name in self.PLANETS]
+        lons = stack_natal_longitudes(natal_charts, planet_names)
+        signs = np.where(np.isnan(lons), -1, lons // 30).astype(np.int8)
+
+        hits = detect_patterns(lons, signs, self.ASPECTS)
+        bounds = np.searchsorted(hits.chart, np.arange(len(natal_charts) + 1))
+        return [
+            patterns_to_payload(PatternHits(*(column[start:end] for column in hits)), planet_names, chart)
+            for chart, (start, end) in enumerate(zip(bounds[:-1], bounds[1:]))
+        ]
+
+    def calculate_transits_batch(
+        self,
+        natal_lons: np.ndarray,
+        transit_date: Optional[datetime] = None
+    ) -> AspectHits:
+        """
+        Match one sky against many natal charts at once.
+
+        Args:
+            natal_lons: Stacked natal longitudes, shape (C, len(PLANETS)),
+                columns in PLANETS order (see stack_natal_longitudes)
+            transit_date: Date for transits (defaults to now)
+
+        Returns:
+            AspectHits indexing charts, PLANETS (transit and natal) and ASPECTS
+        """
+        transiting_planets = sky_cache.get(transit_date).longitudes
+        transit_lons = np.fromiter(transiting_planets.values(), dtype=np.float64)
+
+        return self.aspect_kernel.match(transit_lons, natal_lons)
+
+    def transit_longitudes(self, jds: np.ndarray) -> np.ndarray:
+        """
+        Longitudes of all PLANETS at many Julian days.
+
+        Uses the Chebyshev ephemeris when configured and covering the
+        range, otherwise Swiss Ephemeris.
+
+        Returns:
+            Array of shape (len(jds), len(PLANETS))
+        """
+        jds = np.asarray(jds, dtype=np.float64)
+        if self._chebyshev is not None and self._chebyshev.covers(jds):
+            return self._chebyshev.longitudes(jds, [name for _, name in self.PLANETS])
+
+        longitudes = np.empty((len(jds), len(self.PLANETS)), dtype=np.float64)
+        for row, jd in enumerate(jds.tolist()):
+            for column, (planet_id, _) in enumerate(self.PLANETS):
+                longitudes[row, column] = swe.calc_ut(jd, planet_id)[0][0]
+        return longitudes
+
+    @property
+    def event_catalog(self) -> Optional[EventCatalog]:
+        """Loaded event catalog (None unless EVENT_CATALOG_PATH is set)"""
+        return self._event_catalog
+
+    def sky_events(
+        self,
+        start: datetime,
+        end: datetime,
+        kinds: Optional[List[str]] = None,
+        body: Optional[str] = None
+    ) -> List[SkyEvent]:
+        """
+        Stations, ingresses, lunations and eclipses in [start, end).
+
+        Read from the event catalog (binary search), no ephemeris calls.
+
+        Raises:
+            RuntimeError: If no event catalog is loaded
+        """
+        catalog = self._require_event_catalog()
+        start_jd, end_jd = to_julian_days([start, end]).tolist()
+        return [self._sky_event(event) for event in catalog.between(start_jd, end_jd, kinds, body)]
+
+    def next_sky_event(
+        self,
+        kind: str,
+        after: datetime,
+        body: Optional[str] = None
+    ) -> Optional[SkyEvent]:
+        """
+        First event of a kind (e.g. Mercury's next retrograde station) at or after a moment.
+
+        Returns:
+            SkyEvent, or None if there is none within the catalog range
+
+        Raises:
+            RuntimeError: If no event catalog is loaded
+        """
+        catalog = self._require_event_catalog()
+        event = catalog.next(kind, float(to_julian_days([after])[0]), body)
+        return self._sky_event(event) if event is not None else None
+
+    def _require_event_catalog(self) -> EventCatalog:
+        if self._event_catalog is None:
+            raise RuntimeError("Event catalog not configured")
+        return self._event_catalog
+
+    def _sky_event(self, event: CatalogEvent) -> SkyEvent:
+        """Catalog row to API model"""
+        eclipse = event.kind.endswith("_eclipse")
+        return SkyEvent(
+            kind=event.kind,
+            body=event.body,
+            date=datetime_from_jd(event.jd),
+            sign=None if eclipse else self.SIGNS[event.detail],
+            eclipse_type=ECLIPSE_TYPES[event.detail] or None if eclipse else None
+        )
+
+    def iter_transit_events(
+        self,
+        natal_chart: Dict[str, Any],
+        start: datetime,
+        end: datetime
+    ) -> Iterator[TransitEvent]:
+        """
+        Generate transit-to-natal aspect events over a date range.
+
+        Args:
+            natal_chart: Natal chart payload
+            start: Window start (UTC)
+            end: Window end (UTC)
+
+        Yields:
+            TransitEvent (orb start, exact, orb end) in chronological order
+        """
+        natal_names, natal_lons = natal_longitudes(natal_chart)
+        start_jd, end_jd = to_julian_days([start, end]).tolist()
+
+        return iter_transit_events(
+            natal_names,
+            natal_lons,
+            [name for _, name in self.PLANETS],
+            self.transit_longitudes,
+            self.ASPECTS,
+            start_jd,
+            end_jd
+        )
+
+    def calculate_astrocartography(self, birth_utc: datetime, lat_step: float = 0.5) -> List[Dict[str, Any]]:
+        """
+        Calculate astrocartography lines for a birth moment.
+
+        One equatorial position per planet and the sidereal time are all
+        the ephemeris work; the lines themselves are closed-form over a
+        latitude grid (see astrocartography.angular_lines).
+
+        Args:
+            birth_utc: Birth time (naive times are UTC)
+            lat_step: Latitude grid spacing in degrees
+
+        Returns:
+            List of {"planet", "angle", "segments"} with [lon, lat] polylines
+        """
+        jd = float(to_julian_days([birth_utc])[0])
+
+        ras, decs = [], []
+        for planet_id, _ in self.PLANETS:
+            result, _ = swe.calc_ut(jd, planet_id, swe.FLG_SWIEPH | swe.FLG_EQUATORIAL)
+            ras.append(result[0])
+            decs.append(result[1])
+
+        lines = angular_lines(np.array(ras), np.array(decs), swe.sidtime(jd) * 15.0, lat_step)
+        return lines_to_payload(lines, [name for _, name in self.PLANETS])
+
+    def calculate_synastry(
+        self,
+        chart_a: Dict[str, Any],
+        chart_b: Dict[str, Any]
+    ) -> List[SynastryAspect]:
+        """
+        Find all aspects between two natal charts.
+
+        Args:
+            chart_a: First natal chart payload
+            chart_b: Second natal chart payload
+
+        Returns:
+            List of aspects (planet_a from chart_a, planet_b from chart_b)
+        """
+        names_a, lons_a = natal_longitudes(chart_a)
+        names_b, lons_b = natal_longitudes(chart_b)
+
+        hits = self.aspect_kernel.match(lons_a, lons_b)
+        return [
+            SynastryAspect(
+                type=self.aspect_kernel.names[k],
+                planet_a=names_a[a],
+                planet_b=names_b[b],
+                orb=round(orb, 2)
+            )
+            for a, b, k, orb in zip(
+                hits.transit.tolist(), hits.natal.tolist(), hits.aspect.tolist(), hits.orb.tolist()
+            )
+        ]
+
+    def compatibility_scores(
+        self,
+        natal_chart: Dict[str, Any],
+        candidates: List[Dict[str, Any]]
+    ) -> np.ndarray:
+        """
+        Score one natal chart against many candidates (see SynastryKernel).
+
+        Args:
+            natal_chart: Natal chart payload
+            candidates: Candidate natal chart payloads
+
+        Returns:
+            Scores, shape (len(candidates),), higher is more compatible
+        """
+        planet_names = [name for _, name in self.PLANETS]
+        chart_lons = stack_natal_longitudes([natal_chart], planet_names)[0]
+        candidate_lons = stack_natal_longitudes(candidates, planet_names)
+
+        return self.synastry_kernel.score(chart_lons, candidate_lons)
+
+    def compatibility_matrix(self, natal_charts: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Score every pair in a cohort of natal charts.
+
+        Returns:
+            Symmetric (N, N) score matrix, NaN on the diagonal
+        """
+        planet_names = [name for _, name in self.PLANETS]
+        return self.synastry_kernel.matrix(stack_natal_longitudes(natal_charts, planet_names))
+
     def _to_zodiac(self, lon: float) -> tuple[str, float]:
         """Convert ecliptic longitude to zodiac sign + degree"""
         sign_index = int(lon / 30) % 12
@@ -201,22 +735,7 @@ class AstroService:
 
     def _find_house(self, planet_lon: float, houses_cusps: list) -> int:
         """Find which house a planet is in"""
-        for i in range(12):
-            cusp_current = houses_cusps[i]
-            cusp_next = houses_cusps[(i + 1) % 12]
-
-            # Handle zodiac wrap-around
-            if cusp_next < cusp_current:
-                cusp_next += 360
-
-            planet_lon_adjusted = planet_lon
-            if planet_lon < cusp_current:
-                planet_lon_adjusted += 360
-
-            if cusp_current <= planet_lon_adjusted < cusp_next:
-                return i + 1  # Houses are 1-indexed
-
-        return 1  # Default to 1st house
+        return find_house(planet_lon, unwrap_cusps(houses_cusps))
 
     def _calculate_angle_diff(self, lon1: float, lon2: float) -> float:
         """Calculate smallest angle difference between two longitudes"""
@@ -224,3 +743,18 @@ class AstroService:
         if diff > 180:
             diff = 360 - diff
         return diff
+
+
+# Process-wide "current sky" cache shared by all AstroService instances
+sky_cache = SkyCache(
+    AstroService.PLANETS,
+    bucket_seconds=settings.transit_cache_bucket_seconds,
+    max_entries=settings.transit_cache_max_entries
+)
+
+# Exact-time search with per-(chart, aspect) caching
+exact_time_solver = ExactTimeSolver(
+    {planet_name: planet_id for planet_id, planet_name in AstroService.PLANETS},
+    max_entries=settings.exact_time_cache_size,
+    ttl_seconds=settings.exact_time_cache_ttl_seconds
+)
@@ -0,0 +1,215 @@
+"""Batch natal chart calculation on a process pool"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Iterator, NamedTuple, Optional, Sequence, Union
+import os
+import numpy as np
+import swisseph as swe
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Julian day of the Unix epoch (1970-01-01T00:00:00 UT)
+UNIX_EPOCH_JD = 2440587.5
+
+
+class BirthBatch(NamedTuple):
+    """Columnar birth data"""
+    birth_utc: Union[Sequence[datetime], np.ndarray]  # datetimes or datetime64
+    lat: np.ndarray
+    lon: np.ndarray
+
+
+class NatalChartBatch(NamedTuple):
+    """
+    Columnar natal chart results for one chunk.
+
+    Row i corresponds to input row `offset + i`. Planet columns follow
+    AstroService.PLANETS, signs index AstroService.SIGNS and houses are
+    1-indexed like the single-chart payload.
+    """
+    offset: int
+    longitudes: np.ndarray  # (n, planets) float64
+    speeds: np.ndarray      # (n, planets) float64, degrees/day
+    signs: np.ndarray       # (n, planets) int8
+    houses: np.ndarray      # (n, planets) int8
+    cusps: np.ndarray       # (n, 12) float64
+    ascendant: np.ndarray   # (n,) float64
+    midheaven: np.ndarray   # (n,) float64
+
+    def __len__(self) -> int:
+        return self.longitudes.shape[0]
+
+
+def to_julian_days(birth_utc: Union[Sequence[datetime], np.ndarray]) -> np.ndarray:
+    """Convert datetimes (naive = UTC) or datetime64 values to Julian days (UT)"""
+    if isinstance(birth_utc, np.ndarray) and np.issubdtype(birth_utc.dtype, np.datetime64):
+        seconds = birth_utc.astype("datetime64[us]").astype(np.int64) / 1e6
+    else:
+        seconds = np.array([
+            (dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)).timestamp()
+            for dt in birth_utc
+        ], dtype=np.float64)
+
+    return seconds / 86400.0 + UNIX_EPOCH_JD
+
+
+def assign_houses(longitudes: np.ndarray, cusps: np.ndarray) -> np.ndarray:
+    """
+    Assign houses for many charts at once.
+
+    Cusps are unwrapped into a monotonic sequence starting at the first
+    cusp; a planet's house is the number of unwrapped cusps at or below
+    its (unwrapped) longitude.
+
+    Args:
+        longitudes: (n, planets) ecliptic longitudes
+        cusps: (n, 12) house cusps
+
+    Returns:
+        (n, planets) int8 house numbers (1-12)
+    """
+    wraps = np.concatenate(
+        [np.zeros((cusps.shape[0], 1)), np.cumsum(np.diff(cusps, axis=1) < 0, axis=1)],
+        axis=1
+    )
+    unwrapped = cusps + 360.0 * wraps
+
+    first = unwrapped[:, :1]
+    adjusted = np.where(longitudes < first, longitudes + 360.0, longitudes)
+
+    return (adjusted[:, :, np.newaxis] >= unwrapped[:, np.newaxis, :]).sum(axis=2).astype(np.int8)
+
+
+def _init_worker(ephe_path: Optional[str]) -> None:
+    """
+    Process pool initializer: set the ephemeris path and warm up once per
+    worker, as AstroService.init_worker does for the engine's pool, so no
+    chunk pays the cold ephemeris load.
+    """
+    # Imported here: app.services.astro imports this module
+    from app.services.astro import AstroService
+
+    AstroService.configure_ephemeris()
+    if ephe_path:
+        swe.set_ephe_path(ephe_path)
+    AstroService().warmup()
+
+
+def _compute_chunk(
+    offset: int,
+    jds: np.ndarray,
+    lats: np.ndarray,
+    lons: np.ndarray,
+    planet_ids: Sequence[int],
+    house_system: bytes
+) -> NatalChartBatch:
+    """Compute one chunk of natal charts (runs in a worker process)"""
+    n = len(jds)
+    longitudes = np.empty((n, len(planet_ids)), dtype=np.float64)
+    speeds = np.empty((n, len(planet_ids)), dtype=np.float64)
+    cusps = np.empty((n, 12), dtype=np.float64)
+    ascendant = np.empty(n, dtype=np.float64)
+    midheaven = np.empty(n, dtype=np.float64)
+
+    for row, (jd, lat, lon) in enumerate(zip(jds.tolist(), lats.tolist(), lons.tolist())):
+        for column, planet_id in enumerate(planet_ids):
+            result, _ = swe.calc_ut(jd, planet_id)
+            longitudes[row, column] = result[0]
+            speeds[row, column] = result[3]
+
+        houses_cusps, ascmc = swe.houses(jd, lat, lon, house_system)
+        cusps[row] = houses_cusps[:12]
+        ascendant[row] = ascmc[0]
+        midheaven[row] = ascmc[1]
+
+    return NatalChartBatch(
+        offset=offset,
+        longitudes=longitudes,
+        speeds=speeds,
+        signs=(longitudes // 30).astype(np.int8) % 12,
+        houses=assign_houses(longitudes, cusps),
+        cusps=cusps,
+        ascendant=ascendant,
+        midheaven=midheaven
+    )
+
+
+def batch_pool(workers: int, ephe_path: Optional[str] = None) -> ProcessPoolExecutor:
+    """
+    Process pool for iter_natal_chart_batches.
+
+    Long-running jobs create one pool and pass it to every batch, so
+    worker startup and ephemeris setup are paid once per run.
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(ephe_path,)
+    )
+
+
+def iter_natal_chart_batches(
+    births: BirthBatch,
+    planet_ids: Sequence[int],
+    house_system: str = "P",
+    chunk_size: int = 1000,
+    max_workers: Optional[int] = None,
+    ephe_path: Optional[str] = None,
+    executor: Optional[ProcessPoolExecutor] = None
+) -> Iterator[NatalChartBatch]:
+    """
+    Compute natal charts in chunks across a bounded process pool.
+
+    At most two chunks per worker are in flight at any time, so memory
+    stays bounded for arbitrarily large inputs. Chunks are yielded in
+    input order as soon as they (and all earlier chunks) are done.
+
+    Args:
+        births: Columnar birth times and coordinates
+        planet_ids: Swiss Ephemeris body ids (one column each)
+        house_system: House system code ('P' = Placidus, ...)
+        chunk_size: Charts per worker task
+        max_workers: Pool size (defaults to all cores)
+        ephe_path: Ephemeris path for the workers
+        executor: Pool from batch_pool() to reuse (left running); a
+            temporary pool of max_workers is created if None
+
+    Yields:
+        NatalChartBatch per chunk
+    """
+    jds = to_julian_days(births.birth_utc)
+    lats = np.asarray(births.lat, dtype=np.float64)
+    lons = np.asarray(births.lon, dtype=np.float64)
+
+    if not (len(jds) == len(lats) == len(lons)):
+        raise ValueError("birth_utc, lat and lon must have the same length")
+
+    workers = max_workers or os.cpu_count() or 1
+    max_in_flight = workers * 2
+    hsys = house_system.encode()
+
+    logger.info(f"Computing {len(jds)} natal charts on {workers} workers")
+
+    pool = executor if executor is not None else batch_pool(workers, ephe_path)
+    try:
+        pending = deque()
+
+        for start in range(0, len(jds), chunk_size):
+            end = start + chunk_size
+            pending.append(pool.submit(
+                _compute_chunk,
+                start, jds[start:end], lats[start:end], lons[start:end],
+                list(planet_ids), hsys
+            ))
+
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        if executor is None:
+            pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,321 @@
+"""Async Astro Engine (Swiss Ephemeris off the event loop)"""
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Literal, Mapping, Optional
+import asyncio
+import hashlib
+import time
+from fastapi import HTTPException, status
+from app.config import settings
+from app.models.astro import Aspect, Transit
+from app.services.astro import AstroService, sky_cache
+from app.services.astrocartography import AstrocartographyCache
+from app.services.chart_cache import NatalChartCache
+from app.services.transit_session import TransitSession, TransitSessionStore
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AstroTimeoutException(HTTPException):
+    """Exception raised when an astro calculation exceeds its timeout"""
+
+    def __init__(self, message: str = "Die astrologische Berechnung hat zu lange gedauert."):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"error": "astro_timeout", "message": message}
+        )
+
+
+class AstroEngine:
+    """
+    Awaitable facade over AstroService.
+
+    `swe.calc_ut` / `swe.houses` are blocking C calls, so every calculation
+    runs on a dedicated executor instead of the event loop.
+    """
+
+    def __init__(
+        self,
+        service: Optional[AstroService] = None,
+        pool_size: int = 4,
+        executor: Literal["thread", "process"] = "thread",
+        timeout: float = 5.0,
+        chart_cache: Optional[NatalChartCache] = None,
+        line_cache: Optional[AstrocartographyCache] = None
+    ):
+        self.service = service or AstroService()
+        self.chart_cache = chart_cache
+        self.line_cache = line_cache or AstrocartographyCache(settings.astrocartography_cache_size)
+        self.transit_sessions = TransitSessionStore(
+            max_sessions=settings.transit_session_max_entries,
+            ttl_seconds=settings.transit_session_ttl_seconds
+        )
+        self.pool_size = pool_size
+        self.timeout = timeout
+
+        self._executor: Executor
+        if executor == "process":
+            self._executor = ProcessPoolExecutor(
+                max_workers=pool_size,
+                initializer=AstroService.init_worker
+            )
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="astro")
+
+        self.ephemeris_mode: Optional[str] = None
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.timeouts = 0
+
+    async def start(self) -> None:
+        """
+        Check ephemeris files and warm up the executor.
+
+        Called from the application lifespan, so the worker only reports
+        ready once the first real calculation no longer pays the
+        ephemeris file open cost. Process workers warm up in their pool
+        initializer (every worker, whenever it starts); threads share the
+        process's ephemeris state, so one warmup covers them all. That
+        one call also reports the ephemeris mode.
+        """
+        missing = AstroService.missing_ephemeris_files()
+        if missing:
+            logger.warning(
+                f"!!! Swiss Ephemeris files {missing} not found in "
+                f"'{settings.swisseph_path}'. Falling back to the Moshier "
+                f"ephemeris: slower and less precise. Install the .se1 files "
+                f"or fix SWISSEPH_PATH. !!!"
+            )
+
+        loop = asyncio.get_running_loop()
+        self.ephemeris_mode = await loop.run_in_executor(self._executor, self.service.warmup)
+        if self.ephemeris_mode == "moshier" and not missing:
+            logger.warning("!!! Swiss Ephemeris is running in Moshier fallback mode !!!")
+
+        logger.info(
+            f"AstroEngine ready: {self.pool_size} workers, "
+            f"ephemeris mode {self.ephemeris_mode}"
+        )
+
+    async def natal_chart(
+        self,
+        birth_utc: datetime,
+        lat: float,
+        lon: float,
+        house_system: str = "P",
+        include_patterns: bool = False,
+        timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Calculate a natal chart on the executor (see AstroService.calculate_natal_chart).
+
+        Charts are memoized in the chart cache when one is configured. The
+        memory tier is checked inline; SQLite reads and writes of the disk
+        tier run on a worker thread, never on the event loop.
+        """
+        if self.chart_cache is None:
+            return await self._run(
+                self.service.calculate_natal_chart,
+                birth_utc, lat, lon, house_system, include_patterns,
+                timeout=timeout
+            )
+
+        key = self.chart_key(birth_utc, lat, lon, house_system, include_patterns)
+        cached = self.chart_cache.get_memory(key)
+        if cached is None and self.chart_cache.disk_tier:
+            cached = await asyncio.to_thread(self.chart_cache.get_disk, key)
+        if cached is not None:
+            return cached
+
+        payload = await self._run(
+            self.service.calculate_natal_chart,
+            birth_utc, lat, lon, house_system, include_patterns,
+            timeout=timeout
+        )
+        if self.chart_cache.disk_tier:
+            await asyncio.to_thread(self.chart_cache.put, key, payload)
+        else:
+            self.chart_cache.put(key, payload)
+        return payload
+
+    @staticmethod
+    def chart_key(
+        birth_utc: datetime,
+        lat: float,
+        lon: float,
+        house_system: str = "P",
+        include_patterns: bool = False
+    ) -> str:
+        """Content hash of a natal chart's inputs and the engine/payload version"""
+        return NatalChartCache.key(
+            birth_utc, lat, lon, house_system,
+            f"{AstroService.ENGINE_VERSION}+payload.{AstroService.PAYLOAD_VERSION}"
+            + ("+patterns" if include_patterns else "")
+        )
+
+    async def astrocartography(
+        self,
+        birth_utc: datetime,
+        lat_step: Optional[float] = None,
+        timeout: Optional[float] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Astrocartography lines on the executor (see AstroService.calculate_astrocartography).
+
+        Lines are cached per birth moment. Computations slower than
+        ASTROCARTOGRAPHY_TARGET_MS are logged and counted, since maps
+        request them interactively.
+        """
+        lat_step = lat_step or settings.astrocartography_lat_step
+        key = self.line_key(birth_utc, lat_step)
+        cached = self.line_cache.get(key)
+        if cached is not None:
+            return cached
+
+        started = time.perf_counter()
+        lines = await self._run(self.service.calculate_astrocartography, birth_utc, lat_step, timeout=timeout)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        if elapsed_ms > settings.astrocartography_target_ms:
+            self.line_cache.slow += 1
+            logger.warning(
+                f"Astrocartography took {elapsed_ms:.1f} ms "
+                f"(target {settings.astrocartography_target_ms:.0f} ms, queue depth {self.queue_depth})"
+            )
+
+        self.line_cache.put(key, lines)
+        return lines
+
+    @staticmethod
+    def line_key(birth_utc: datetime, lat_step: float) -> str:
+        """Cache key (and ETag) of a birth moment's astrocartography lines"""
+        if birth_utc.tzinfo is None:
+            birth_utc = birth_utc.replace(tzinfo=timezone.utc)
+        canonical = f"{birth_utc.astimezone(timezone.utc):%Y-%m-%dT%H:%M:%S}|{lat_step:g}|{AstroService.ENGINE_VERSION}"
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    async def transits(
+        self,
+        natal_chart: Dict[str, Any],
+        transit_date: Optional[datetime] = None,
+        resolve_exact_dates: bool = False,
+        include_patterns: bool = False,
+        timeout: Optional[float] = None
+    ) -> Transit:
+        """Calculate transits on the executor (see AstroService.calculate_transits)"""
+        return await self._run(
+            self.service.calculate_transits,
+            natal_chart, transit_date, resolve_exact_dates, include_patterns,
+            timeout=timeout
+        )
+
+    def transit_session(
+        self,
+        session_id: str,
+        load_natal_chart: Callable[[], Optional[Mapping[str, Any]]]
+    ) -> Optional[TransitSession]:
+        """
+        Per-conversation transit state; the natal chart is loaded once per session.
+
+        Returns:
+            TransitSession, or None if the user has no natal chart
+        """
+        return self.transit_sessions.get_or_create(
+            session_id, load_natal_chart, [name for _, name in AstroService.PLANETS]
+        )
+
+    async def session_transits(
+        self,
+        session: TransitSession,
+        resolve_exact_dates: bool = False,
+        timeout: Optional[float] = None
+    ) -> List[Aspect]:
+        """
+        Current transits of a conversation, re-checking only planets that may have changed.
+
+        The stale planets are evaluated on the executor; the session itself
+        stays in this process (a process worker would only update a copy).
+        """
+        transit_date = datetime.now(timezone.utc)
+        jd = sky_cache.bucket_jd(sky_cache.bucket_for(transit_date))
+        max_age_days = settings.transit_session_max_age_seconds / 86400
+
+        with session.lock:
+            rows = session.stale_rows(jd, max_age_days, resolve_exact_dates)
+            planets = [session.planets[row] for row in rows]
+
+        if rows:
+            update = await self._run(
+                self.service.evaluate_transit_planets,
+                planets, session.natal_names, session.natal_lons, transit_date, resolve_exact_dates,
+                timeout=timeout
+            )
+            with session.lock:
+                session.apply(rows, update, resolve_exact_dates)
+
+        self.transit_sessions.record(len(rows), len(session.planets))
+        with session.lock:
+            return session.current_aspects()
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls waiting for a free worker"""
+        return max(0, self.in_flight - self.pool_size)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get executor statistics"""
+        return {
+            "ephemeris_mode": self.ephemeris_mode,
+            "pool_size": self.pool_size,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "chart_cache": self.chart_cache.stats() if self.chart_cache else None,
+            "astrocartography_cache": self.line_cache.stats(),
+            "transit_sessions": self.transit_sessions.stats()
+        }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut down the executor and close the chart cache"""
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        if self.chart_cache is not None:
+            self.chart_cache.close()
+        logger.info("AstroEngine shut down")
+
+    async def _run(self, func: Callable, *args, timeout: Optional[float] = None) -> Any:
+        """
+        Run a blocking calculation on the executor with a timeout.
+
+        Raises:
+            AstroTimeoutException: If the call does not finish in time. A call
+                still waiting in the queue is cancelled; one already running
+                finishes in the background and its result is discarded.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, func, *args)
+
+        self.in_flight += 1
+        try:
+            result = await asyncio.wait_for(future, timeout=timeout or self.timeout)
+            self.completed += 1
+            return result
+
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            logger.warning(
+                f"Astro calculation {func.__name__} timed out "
+                f"(queue depth {self.queue_depth})"
+            )
+            raise AstroTimeoutException()
+
+        except Exception:
+            self.failed += 1
+            raise
+
+        finally:
+            self.in_flight -= 1
@@ -0,0 +1,188 @@
+"""Astrocartography (relocation) lines"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, List, NamedTuple, Optional
+import numpy as np
+
+LINE_ANGLES = ["asc", "dsc", "mc", "ic"]
+
+# Web Mercator stops at ~85.05°; rising/setting lines diverge at the poles
+MAX_LATITUDE = 85.0
+
+# Coordinates are rounded to 1e-3° (~100 m)
+COORDINATE_DECIMALS = 3
+
+
+class AngularLines(NamedTuple):
+    """
+    Angular lines of P bodies sampled on a latitude grid.
+
+    Longitudes are in [-180, 180); NaN marks latitudes where the body
+    never rises or sets (circumpolar or never above the horizon).
+    """
+    lats: np.ndarray  # (L,) latitude grid
+    asc: np.ndarray   # (P, L) longitude where the body rises
+    dsc: np.ndarray   # (P, L) longitude where the body sets
+    mc: np.ndarray    # (P,) longitude where the body culminates
+    ic: np.ndarray    # (P,) longitude of lower culmination
+
+
+def angular_lines(
+    ras: np.ndarray,
+    decs: np.ndarray,
+    sidereal_time: float,
+    lat_step: float = 0.5
+) -> AngularLines:
+    """
+    Compute where bodies are on the four angles, for all bodies at once.
+
+    A body culminates where the local sidereal time equals its right
+    ascension, so MC/IC lines are meridians at `ra - GAST` (+180°). It
+    rises or sets where its hour angle is ∓H0 with
+    `cos H0 = -tan(lat) tan(dec)`, which is closed-form per latitude;
+    no house calculation per map point is needed.
+
+    Args:
+        ras: Right ascensions in degrees, shape (P,)
+        decs: Declinations in degrees, shape (P,)
+        sidereal_time: Greenwich apparent sidereal time in degrees
+        lat_step: Latitude grid spacing in degrees
+
+    Returns:
+        AngularLines
+    """
+    ras = np.asarray(ras, dtype=np.float64)
+    decs = np.asarray(decs, dtype=np.float64)
+    lats = np.arange(-MAX_LATITUDE, MAX_LATITUDE + lat_step / 2, lat_step)
+
+    culmination = ras - sidereal_time
+    cos_h0 = -np.tan(np.radians(lats)) * np.tan(np.radians(decs))[:, np.newaxis]
+    with np.errstate(invalid="ignore"):
+        h0 = np.degrees(np.arccos(np.where(np.abs(cos_h0) <= 1, cos_h0, np.nan)))
+
+    return AngularLines(
+        lats=lats,
+        asc=_wrap180(culmination[:, np.newaxis] - h0),
+        dsc=_wrap180(culmination[:, np.newaxis] + h0),
+        mc=_wrap180(culmination),
+        ic=_wrap180(culmination + 180)
+    )
+
+
+def lines_to_payload(lines: AngularLines, planet_names: List[str]) -> List[Dict[str, Any]]:
+    """
+    Convert angular lines to polylines.
+
+    Rising/setting curves are split where the body stops rising and at
+    the antimeridian, with the crossing point added to both pieces.
+
+    Returns:
+        List of {"planet", "angle", "segments"}; segments are lists of
+        [lon, lat] points (GeoJSON MultiLineString order)
+    """
+    result = []
+    for p, name in enumerate(planet_names):
+        for angle in LINE_ANGLES:
+            if angle in ("mc", "ic"):
+                lon = float(getattr(lines, angle)[p])
+                segments = [[[lon, -MAX_LATITUDE], [lon, MAX_LATITUDE]]]
+            else:
+                segments = _polylines(getattr(lines, angle)[p], lines.lats)
+            result.append({
+                "planet": name,
+                "angle": angle,
+                "segments": [
+                    [[round(lon, COORDINATE_DECIMALS), round(lat, COORDINATE_DECIMALS)] for lon, lat in segment]
+                    for segment in segments
+                ]
+            })
+    return result
+
+
+def _polylines(lons: np.ndarray, lats: np.ndarray) -> List[List[List[float]]]:
+    """Split one sampled curve into continuous [lon, lat] pieces"""
+    segments: List[List[List[float]]] = []
+    valid = ~np.isnan(lons)
+
+    # Runs of valid samples
+    edges = np.diff(np.concatenate([[0], valid.astype(np.int8), [0]]))
+    for start, end in zip(np.nonzero(edges == 1)[0].tolist(), np.nonzero(edges == -1)[0].tolist()):
+        run_lons = lons[start:end]
+        run_lats = lats[start:end]
+
+        # Antimeridian crossings: consecutive samples more than 180° apart
+        jumps = np.nonzero(np.abs(np.diff(run_lons)) > 180)[0].tolist()
+        piece = 0
+        carry: Optional[List[float]] = None
+        for jump in jumps + [len(run_lons) - 1]:
+            points = np.column_stack([run_lons[piece:jump + 1], run_lats[piece:jump + 1]]).tolist()
+            if carry is not None:
+                points.insert(0, carry)
+
+            if jump < len(run_lons) - 1:
+                a, b = float(run_lons[jump]), float(run_lons[jump + 1])
+                edge = 180.0 if a > 0 else -180.0
+                b_unwrapped = b + 360.0 if a > 0 else b - 360.0
+                t = (edge - a) / (b_unwrapped - a)
+                lat = float(run_lats[jump] + t * (run_lats[jump + 1] - run_lats[jump]))
+                points.append([edge, lat])
+                carry = [-edge, lat]
+
+            segments.append(points)
+            piece = jump + 1
+    return segments
+
+
+def _wrap180(degrees):
+    """Wrap longitudes into [-180, 180)"""
+    return (degrees + 180) % 360 - 180
+
+
+class AstrocartographyCache:
+    """
+    LRU of computed line payloads per birth moment.
+
+    Lines depend only on the birth time (not the birth place), the grid
+    and the engine version, which make up the key. Cached lists are
+    shared between callers and must not be mutated.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.slow = 0  # Computations over the latency target
+
+        self._entries: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Look up the lines for a key"""
+        with self._lock:
+            lines = self._entries.get(key)
+            if lines is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return lines
+
+    def put(self, key: str, lines: List[Dict[str, Any]]) -> None:
+        """Store lines, evicting least recently used entries"""
+        with self._lock:
+            self._entries[key] = lines
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "slow": self.slow,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
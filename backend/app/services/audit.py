@@ -1,9 +1,11 @@
 """Audit Logging Service (DSGVO Art. 5(2))"""
 
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Union
 from supabase import Client
 from uuid import uuid4
+from app.repositories.base import Repositories
+from app.repositories.supabase import as_repositories
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,8 +14,12 @@ logger = logging.getLogger(__name__)
 class AuditService:
     """Service for DSGVO-compliant audit logging"""
 
-    def __init__(self, supabase: Client):
-        self.supabase = supabase
+    def __init__(self, db: Union[Client, Repositories]):
+        """
+        Args:
+            db: Repositories (see get_repositories) or a Supabase client
+        """
+        self.audit_logs = as_repositories(db).audit_logs
 
     async def log_event(
         self,
@@ -43,22 +49,18 @@ class AuditService:
         try:
             log_id = str(uuid4())
 
-            log_entry = {
-                "id": log_id,
-                "event_type": event_type,
-                "user_id": user_id,
-                "session_id": session_id,
-                "conversation_id": conversation_id,
-                "data_accessed": data_accessed,
-                "ip_address": ip_address,
-                "user_agent": user_agent,
-                "created_at": datetime.utcnow().isoformat()
-            }
-
             # Insert into database
-            self.supabase.table("voice_audit_logs") \
-                .insert(log_entry) \
-                .execute()
+            await self.audit_logs.insert(
+                log_id=log_id,
+                event_type=event_type,
+                created_at=datetime.utcnow(),
+                user_id=user_id,
+                session_id=session_id,
+                conversation_id=conversation_id,
+                data_accessed=data_accessed,
+                ip_address=ip_address,
+                user_agent=user_agent
+            )
 
             logger.info(f"Audit log created: {event_type} for user {user_id}")
             return log_id
@@ -162,14 +164,7 @@ class AuditService:
     ) -> list[Dict[str, Any]]:
         """Get audit logs for a user"""
         try:
-            response = self.supabase.table("voice_audit_logs") \
-                .select("*") \
-                .eq("user_id", user_id) \
-                .order("created_at", desc=True) \
-                .limit(limit) \
-                .execute()
-
-            return response.data
+            return await self.audit_logs.list_for_user(user_id, limit)
 
         except Exception as e:
             logger.error(f"Error fetching audit logs: {e}")
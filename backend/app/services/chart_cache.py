@@ -0,0 +1,200 @@
+"""Content-addressed natal chart memoization"""
+
+from collections import OrderedDict
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Any, Dict, Optional
+import hashlib
+import json
+import sqlite3
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class NatalChartCache:
+    """
+    Two-tier cache for natal chart payloads.
+
+    Charts are keyed by a hash of the canonical birth data plus the engine
+    version, so identical inputs (reimports, recomputes, duplicate users)
+    are computed once. Tier one is an in-process LRU, tier two an optional
+    SQLite file that survives restarts. The disk tier holds at most
+    disk_max_rows charts; the oldest are dropped first.
+
+    Payloads are stored as JSON text; every lookup returns a fresh dict,
+    so callers may mutate the result.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 4096,
+        disk_path: Optional[str] = None,
+        disk_max_rows: int = 100_000
+    ):
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self.disk_max_rows = disk_max_rows
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+        self._disk_rows = 0
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = Lock()  # memory tier only: never held during SQLite calls
+        self._disk_lock = Lock()
+        self._db: Optional[sqlite3.Connection] = None
+
+        if disk_path:
+            self._db = sqlite3.connect(disk_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS natal_charts ("
+                "key TEXT PRIMARY KEY, payload TEXT NOT NULL, created_at TEXT NOT NULL)"
+            )
+            self._db.commit()
+            self._disk_rows = self._db.execute("SELECT COUNT(*) FROM natal_charts").fetchone()[0]
+            logger.info(f"Natal chart disk cache opened at {disk_path}")
+
+    @staticmethod
+    def key(
+        birth_utc: datetime,
+        lat: float,
+        lon: float,
+        house_system: str,
+        engine_version: str
+    ) -> str:
+        """
+        Build the canonical cache key for a chart.
+
+        Naive datetimes are treated as UTC; sub-second precision and the
+        sign of zero coordinates don't affect the chart and are dropped.
+        """
+        if birth_utc.tzinfo is None:
+            birth_utc = birth_utc.replace(tzinfo=timezone.utc)
+
+        canonical = "|".join([
+            birth_utc.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S"),
+            f"{float(lat) + 0.0:.9f}",
+            f"{float(lon) + 0.0:.9f}",
+            house_system.upper(),
+            engine_version
+        ])
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    @property
+    def disk_tier(self) -> bool:
+        """Whether lookups may fall through to SQLite"""
+        return self._db is not None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a chart in memory, then on disk"""
+        cached = self.get_memory(key)
+        if cached is None and self._db is not None:
+            cached = self.get_disk(key)
+        return cached
+
+    def get_memory(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a chart in the memory tier only.
+
+        Never touches SQLite, so it is safe to call on the event loop. A
+        miss is only counted when there is no disk tier to fall back to.
+        """
+        with self._lock:
+            raw = self._entries.get(key)
+            if raw is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return json.loads(raw)
+
+            if self._db is None:
+                self.misses += 1
+            return None
+
+    def get_disk(self, key: str) -> Optional[Dict[str, Any]]:
+        """Look up a chart in the disk tier, promoting hits to memory (blocking)"""
+        with self._disk_lock:
+            if self._db is None:
+                return None
+
+            row = self._db.execute(
+                "SELECT payload FROM natal_charts WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+
+        with self._lock:
+            self._remember(key, row[0])
+        return json.loads(row[0])
+
+    def put(self, key: str, payload: Dict[str, Any]) -> None:
+        """Store a chart in both tiers (blocking when there is a disk tier)"""
+        raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+        with self._lock:
+            self._remember(key, raw)
+
+        with self._disk_lock:
+            if self._db is not None:
+                # Keys are content hashes, so an existing row already holds this payload
+                inserted = self._db.execute(
+                    "INSERT OR IGNORE INTO natal_charts (key, payload, created_at) VALUES (?, ?, ?)",
+                    (key, raw, datetime.now(timezone.utc).isoformat())
+                ).rowcount
+                self._disk_rows += inserted
+                self._prune_disk()
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "disk_rows": self._disk_rows,
+            "disk_max_rows": self.disk_max_rows,
+            "disk_evictions": self.disk_evictions,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "disk_tier": self._db is not None
+        }
+
+    def close(self) -> None:
+        """Close the disk tier"""
+        with self._disk_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def _remember(self, key: str, raw: str) -> None:
+        """Insert into the memory tier, evicting least recently used entries (call with _lock held)"""
+        self._entries[key] = raw
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _prune_disk(self) -> None:
+        """Delete the oldest disk rows beyond disk_max_rows (call with _disk_lock held; rowids grow with inserts)"""
+        excess = self._disk_rows - self.disk_max_rows
+        if excess <= 0:
+            return
+
+        deleted = self._db.execute(
+            "DELETE FROM natal_charts WHERE rowid IN "
+            "(SELECT rowid FROM natal_charts ORDER BY rowid LIMIT ?)",
+            (excess,)
+        ).rowcount
+        self._disk_rows -= deleted
+        self.disk_evictions += deleted
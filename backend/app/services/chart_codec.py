@@ -0,0 +1,288 @@
+"""
+Compact binary natal chart payload (format v2).
+
+Layout (little-endian):
+
+    header   magic "NCHT", version u8, planet count u8, flags u8, pad, extras length u32
+    planets  code u8[P], lon u32[P] (1e-6°), degree u16[P] (1e-2°), sign i8[P], house i8[P]
+    angles   per present angle: lon u32, degree u16, sign i8  (ascendant, midheaven)
+    cusps    u16[12] (1e-2°)                                    if FLAG_CUSPS
+    speeds   i32[P] (1e-6°/day)                                 if FLAG_SPEEDS
+    extras   UTF-8 JSON of keys outside the fixed layout        if extras length > 0
+
+The JSON payload stores longitudes and speeds rounded to 6 decimals and
+degrees and cusps to 2, so fixed-point integers reproduce it exactly at a fraction
+of the size. encode_payload() checks this and refuses payloads it cannot
+round-trip, which then simply stay in JSON.
+"""
+
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+import json
+import struct
+import numpy as np
+from app.services.chart_record import ANGLES, SIGNS, ChartRecord
+
+MAGIC = b"NCHT"
+VERSION = 2
+
+HEADER = struct.Struct("<4sBBBxI")
+ANGLE = struct.Struct("<IHb")
+
+FLAG_ASCENDANT = 1
+FLAG_MIDHEAVEN = 2
+FLAG_CUSPS = 4
+FLAG_SPEEDS = 8
+
+# Planet name codes; append only, codes are stored in existing rows
+PLANET_CODES = [
+    "sun", "moon", "mercury", "venus", "mars",
+    "jupiter", "saturn", "uranus", "neptune", "pluto",
+]
+
+LON_SCALE = 1_000_000
+DEGREE_SCALE = 100
+
+
+def encode_payload(payload: Dict[str, Any]) -> bytes:
+    """
+    Encode a natal chart payload into format v2.
+
+    Raises:
+        ValueError: If the payload can't be represented losslessly
+            (unknown planet or sign, or values with more precision than
+            the payload rounding)
+    """
+    try:
+        record = ChartRecord.from_payload(payload)
+        codes = [PLANET_CODES.index(name) for name in record.planets]
+    except (KeyError, ValueError, TypeError) as e:
+        raise ValueError(f"Payload not encodable: {e}") from e
+
+    flags = 0
+    angles = b""
+    for i, flag in enumerate((FLAG_ASCENDANT, FLAG_MIDHEAVEN)):
+        if record.angle_signs[i] >= 0:
+            flags |= flag
+            lon, degree = record.angles[i].tolist()
+            angles += ANGLE.pack(round(lon * LON_SCALE), round(degree * DEGREE_SCALE), int(record.angle_signs[i]))
+
+    cusps = b""
+    if record.cusps is not None:
+        flags |= FLAG_CUSPS
+        cusps = np.round(record.cusps * DEGREE_SCALE).astype("<u2").tobytes()
+
+    # Speeds are all-or-nothing; a partial set fails the round-trip check
+    speeds = b""
+    if len(record) and not np.isnan(record.speeds).any():
+        flags |= FLAG_SPEEDS
+        speeds = np.round(record.speeds * LON_SCALE).astype("<i4").tobytes()
+
+    extras = b""
+    if record.extras or record.planet_extras:
+        extras = json.dumps(
+            {"payload": record.extras, "planets": record.planet_extras},
+            separators=(",", ":"),
+            ensure_ascii=False
+        ).encode()
+
+    data = b"".join([
+        HEADER.pack(MAGIC, VERSION, len(codes), flags, len(extras)),
+        np.array(codes, dtype=np.uint8).tobytes(),
+        np.round(record.lons * LON_SCALE).astype("<u4").tobytes(),
+        np.round(record.degrees * DEGREE_SCALE).astype("<u2").tobytes(),
+        record.signs.astype(np.int8).tobytes(),
+        record.houses.astype(np.int8).tobytes(),
+        angles,
+        cusps,
+        speeds,
+        extras
+    ])
+
+    if decode_payload(data).to_dict() != payload:
+        raise ValueError("Payload not encodable: values exceed the stored precision")
+    return data
+
+
+def decode_payload(data: Union[bytes, memoryview, str]) -> "LazyChartPayload":
+    """
+    Decode a format v2 payload lazily.
+
+    Accepts raw bytes or PostgREST's bytea text form ("\\x" + hex).
+    """
+    if isinstance(data, str):
+        data = bytes.fromhex(data[2:] if data.startswith("\\x") else data)
+    return LazyChartPayload(bytes(data))
+
+
+def is_encoded(data: Any) -> bool:
+    """Check whether a column value holds a format v2 payload"""
+    if isinstance(data, str):
+        return data.startswith("\\x" + MAGIC.hex())
+    if isinstance(data, (bytes, memoryview)):
+        return bytes(data[:4]) == MAGIC
+    return False
+
+
+class LazyChartPayload(Mapping):
+    """
+    Read-only view of a v2 payload with the `payload` dict interface.
+
+    Only the header is parsed up front. Planets, angles and cusps are
+    decoded when first accessed, one planet dict at a time, so a caller
+    that only needs longitudes (see longitudes()) never builds the nested
+    dicts at all.
+    """
+
+    def __init__(self, data: bytes):
+        magic, version, count, flags, extras_length = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a v{VERSION} natal chart payload")
+
+        self._data = data
+        self._count = count
+        self._flags = flags
+        self._cache: Dict[str, Any] = {}
+
+        offset = HEADER.size
+        self._codes = offset
+        self._lons = self._codes + count
+        self._degrees = self._lons + 4 * count
+        self._signs = self._degrees + 2 * count
+        self._houses = self._signs + count
+        self._angles = self._houses + count
+
+        angle_count = bool(flags & FLAG_ASCENDANT) + bool(flags & FLAG_MIDHEAVEN)
+        self._cusps = self._angles + ANGLE.size * angle_count
+        self._speeds = self._cusps + (24 if flags & FLAG_CUSPS else 0)
+        self._extras = self._speeds + (4 * count if flags & FLAG_SPEEDS else 0)
+        self._extras_length = extras_length
+
+        self._names: Optional[List[str]] = None
+        self._extra_keys: Optional[Dict[str, Any]] = None
+        self._planet_extras: Optional[Dict[str, Dict[str, Any]]] = None
+
+    def __reduce__(self):
+        return (LazyChartPayload, (self._data,))
+
+    @property
+    def planet_names(self) -> List[str]:
+        """Planet names in payload order"""
+        if self._names is None:
+            codes = np.frombuffer(self._data, dtype=np.uint8, count=self._count, offset=self._codes)
+            self._names = [PLANET_CODES[code] for code in codes.tolist()]
+        return self._names
+
+    def longitudes(self) -> Tuple[List[str], np.ndarray]:
+        """Planet names and longitudes without building planet dicts"""
+        lons = np.frombuffer(self._data, dtype="<u4", count=self._count, offset=self._lons)
+        return self.planet_names, lons / LON_SCALE
+
+    def record(self) -> ChartRecord:
+        """Decode everything into a ChartRecord"""
+        return ChartRecord.from_payload(self.to_dict())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize the full payload dict"""
+        return {key: _plain(self[key]) for key in self}
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._cache:
+            return self._cache[key]
+
+        if key == "planets":
+            value: Any = _LazyPlanets(self)
+        elif key in ANGLES and self._flags & (FLAG_ASCENDANT if key == "ascendant" else FLAG_MIDHEAVEN):
+            value = self._angle(key)
+        elif key == "houses" and self._flags & FLAG_CUSPS:
+            cusps = np.frombuffer(self._data, dtype="<u2", count=12, offset=self._cusps)
+            value = [cusp / DEGREE_SCALE for cusp in cusps.tolist()]
+        elif key in self._extra_payload():
+            value = self._extra_payload()[key]
+        else:
+            raise KeyError(key)
+
+        self._cache[key] = value
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        yield "planets"
+        if self._flags & FLAG_ASCENDANT:
+            yield "ascendant"
+        if self._flags & FLAG_MIDHEAVEN:
+            yield "midheaven"
+        if self._flags & FLAG_CUSPS:
+            yield "houses"
+        yield from self._extra_payload()
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def _angle(self, key: str) -> Dict[str, Any]:
+        """Decode the ascendant or midheaven"""
+        offset = self._angles
+        if key == "midheaven" and self._flags & FLAG_ASCENDANT:
+            offset += ANGLE.size
+        lon, degree, sign = ANGLE.unpack_from(self._data, offset)
+        return {"sign": SIGNS[sign], "degree": degree / DEGREE_SCALE, "lon_absolute": lon / LON_SCALE}
+
+    def _planet(self, index: int) -> Dict[str, Any]:
+        """Decode one planet dict"""
+        lon = int.from_bytes(self._data[self._lons + 4 * index:self._lons + 4 * index + 4], "little")
+        degree = int.from_bytes(self._data[self._degrees + 2 * index:self._degrees + 2 * index + 2], "little")
+        sign = self._data[self._signs + index]
+        house = int.from_bytes(self._data[self._houses + index:self._houses + index + 1], "little", signed=True)
+
+        planet: Dict[str, Any] = {
+            "sign": SIGNS[sign],
+            "degree": degree / DEGREE_SCALE,
+            "lon_absolute": lon / LON_SCALE
+        }
+        if self._flags & FLAG_SPEEDS:
+            offset = self._speeds + 4 * index
+            planet["speed"] = int.from_bytes(self._data[offset:offset + 4], "little", signed=True) / LON_SCALE
+        if house:
+            planet["house"] = house
+        self._extra_payload()
+        planet.update(self._planet_extras.get(self.planet_names[index], {}))
+        return planet
+
+    def _extra_payload(self) -> Dict[str, Any]:
+        """Decode the JSON extras block (empty for engine-built charts)"""
+        if self._extra_keys is None:
+            extras = {"payload": {}, "planets": {}}
+            if self._extras_length:
+                raw = self._data[self._extras:self._extras + self._extras_length]
+                extras = json.loads(raw.decode())
+            self._extra_keys = extras["payload"]
+            self._planet_extras = extras["planets"]
+        return self._extra_keys
+
+
+class _LazyPlanets(Mapping):
+    """Planet name -> planet dict, decoded per planet on access"""
+
+    def __init__(self, payload: LazyChartPayload):
+        self._payload = payload
+        self._index = {name: i for i, name in enumerate(payload.planet_names)}
+        self._cache: Dict[str, Dict[str, Any]] = {}
+
+    def __getitem__(self, name: str) -> Dict[str, Any]:
+        planet = self._cache.get(name)
+        if planet is None:
+            planet = self._payload._planet(self._index[name])
+            self._cache[name] = planet
+        return planet
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+
+def _plain(value: Any) -> Any:
+    """Turn lazy mappings into plain dicts"""
+    if isinstance(value, Mapping):
+        return {key: _plain(item) for key, item in value.items()}
+    return value
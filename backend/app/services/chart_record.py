@@ -0,0 +1,255 @@
+"""Compact array-backed natal chart record"""
+
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+
+# Zodiac signs (German), indexed by int(longitude / 30)
+SIGNS = [
+    "Widder", "Stier", "Zwillinge", "Krebs",
+    "Löwe", "Jungfrau", "Waage", "Skorpion",
+    "Schütze", "Steinbock", "Wassermann", "Fische"
+]
+
+# Keys of the payload layout held in arrays; anything else is passed through
+PLANET_KEYS = {"sign", "degree", "lon_absolute", "speed", "house"}
+ANGLE_KEYS = {"sign", "degree", "lon_absolute"}
+ANGLES = ("ascendant", "midheaven")
+
+
+def unwrap_cusps(cusps: Sequence[float]) -> List[float]:
+    """
+    Unwrap 12 house cusps into a monotonic sequence starting at the first cusp.
+
+    Cusps after the 360°/0° crossing are shifted up by 360°.
+    """
+    unwrapped = [float(cusps[0])]
+    offset = 0.0
+    for previous, cusp in zip(cusps, cusps[1:]):
+        if cusp < previous:
+            offset += 360.0
+        unwrapped.append(float(cusp) + offset)
+    return unwrapped
+
+
+def find_house(lon: float, unwrapped_cusps: Sequence[float]) -> int:
+    """
+    Find the house (1-12) of a longitude by binary search over unwrapped cusps.
+
+    The house is the number of cusps at or below the longitude, taken
+    on the same turn as the first cusp.
+    """
+    if lon < unwrapped_cusps[0]:
+        lon += 360.0
+    return max(1, bisect_right(unwrapped_cusps, lon))
+
+
+class ChartRecord:
+    """
+    Natal chart as parallel arrays instead of nested dicts.
+
+    Holds exactly what the `natal_charts.payload` JSON holds (rounded
+    values, sign and house per planet, angles, cusps), so
+    `ChartRecord.from_payload(p).to_payload() == p`. Keys outside the
+    known layout are kept verbatim in `planet_extras` / `extras`.
+
+    Speeds are NaN for payloads written before speeds were stored
+    (payload version < 3) and are then omitted again on the way out.
+    """
+
+    __slots__ = (
+        "planets", "lons", "degrees", "signs", "houses", "speeds",
+        "cusps", "angles", "angle_signs", "planet_extras", "extras"
+    )
+
+    def __init__(
+        self,
+        planets: Sequence[str],
+        lons: np.ndarray,
+        degrees: np.ndarray,
+        signs: np.ndarray,
+        houses: np.ndarray,
+        speeds: Optional[np.ndarray] = None,
+        cusps: Optional[np.ndarray] = None,
+        angles: Optional[np.ndarray] = None,
+        angle_signs: Optional[np.ndarray] = None,
+        planet_extras: Optional[Dict[str, Dict[str, Any]]] = None,
+        extras: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Args:
+            planets: Planet names in payload order
+            lons: Ecliptic longitudes (P,)
+            degrees: Degree within sign (P,)
+            signs: Sign index into SIGNS (P,) int8
+            houses: House number (P,) int8, 0 when absent
+            speeds: Longitude speeds (P,), NaN when unknown
+            cusps: 12 house cusps, None when absent
+            angles: (2, 2) [ascendant, midheaven] x [lon, degree], NaN when absent
+            angle_signs: (2,) sign index per angle, -1 when absent
+            planet_extras: Extra keys per planet
+            extras: Extra top-level payload keys
+        """
+        self.planets: Tuple[str, ...] = tuple(planets)
+        self.lons = lons
+        self.degrees = degrees
+        self.signs = signs
+        self.houses = houses
+        self.speeds = speeds if speeds is not None else np.full(len(self.planets), np.nan)
+        self.cusps = cusps
+        self.angles = angles if angles is not None else np.full((2, 2), np.nan)
+        self.angle_signs = angle_signs if angle_signs is not None else np.full(2, -1, dtype=np.int8)
+        self.planet_extras = planet_extras or {}
+        self.extras = extras or {}
+
+    @classmethod
+    def from_calculation(
+        cls,
+        planets: Sequence[str],
+        lons: Sequence[float],
+        speeds: Sequence[float],
+        cusps: Sequence[float],
+        ascendant: float,
+        midheaven: float
+    ) -> "ChartRecord":
+        """
+        Build a record from raw Swiss Ephemeris output.
+
+        Applies the payload rounding: longitudes and speeds to 6 decimals,
+        degrees and cusps to 2. Houses are assigned from the rounded longitudes
+        against the unrounded cusps.
+        """
+        raw = np.asarray(lons, dtype=np.float64)
+        unwrapped = unwrap_cusps(cusps)
+
+        rounded = [round(lon, 6) for lon in raw.tolist()]
+        houses = [find_house(lon, unwrapped) for lon in rounded]
+
+        angles = np.array([
+            [round(ascendant, 6), round(ascendant % 30, 2)],
+            [round(midheaven, 6), round(midheaven % 30, 2)]
+        ])
+
+        return cls(
+            planets,
+            lons=np.array(rounded),
+            degrees=np.array([round(lon % 30, 2) for lon in raw.tolist()]),
+            signs=(raw // 30 % 12).astype(np.int8),
+            houses=np.array(houses, dtype=np.int8),
+            speeds=np.array([round(speed, 6) for speed in speeds]),
+            cusps=np.array([round(cusp, 2) for cusp in cusps]),
+            angles=angles,
+            angle_signs=np.array([int(ascendant / 30) % 12, int(midheaven / 30) % 12], dtype=np.int8)
+        )
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> "ChartRecord":
+        """Build a record from a `natal_charts.payload` dict"""
+        extras = {key: value for key, value in payload.items() if key not in ("planets", "houses") + ANGLES}
+
+        planets = payload.get("planets", {})
+        names = list(planets)
+        lons = np.empty(len(names))
+        speeds = np.full(len(names), np.nan)
+        degrees = np.empty(len(names))
+        signs = np.empty(len(names), dtype=np.int8)
+        houses = np.zeros(len(names), dtype=np.int8)
+        planet_extras: Dict[str, Dict[str, Any]] = {}
+
+        for i, name in enumerate(names):
+            data = planets[name]
+            lons[i] = data["lon_absolute"]
+            degrees[i] = data["degree"]
+            signs[i] = SIGNS.index(data["sign"])
+            if data.get("speed") is not None:
+                speeds[i] = data["speed"]
+            if data.get("house") is not None:
+                houses[i] = data["house"]
+
+            unknown = {key: value for key, value in data.items() if key not in PLANET_KEYS}
+            for key in ("speed", "house"):
+                if key in data and data[key] is None:
+                    unknown[key] = None
+            if unknown:
+                planet_extras[name] = unknown
+
+        angles = np.full((2, 2), np.nan)
+        angle_signs = np.full(2, -1, dtype=np.int8)
+        for i, key in enumerate(ANGLES):
+            angle = payload.get(key)
+            if angle is None:
+                if key in payload:
+                    extras[key] = angle
+                continue
+            if set(angle) != ANGLE_KEYS or angle["sign"] not in SIGNS:
+                # Unexpected layout, keep as-is
+                extras[key] = angle
+                continue
+            angles[i] = (angle["lon_absolute"], angle["degree"])
+            angle_signs[i] = SIGNS.index(angle["sign"])
+
+        cusps = None
+        if "houses" in payload:
+            if isinstance(payload["houses"], list) and len(payload["houses"]) == 12:
+                cusps = np.array(payload["houses"], dtype=np.float64)
+            else:
+                extras["houses"] = payload["houses"]
+
+        return cls(
+            names, lons, degrees, signs, houses,
+            speeds=speeds,
+            cusps=cusps,
+            angles=angles,
+            angle_signs=angle_signs,
+            planet_extras=planet_extras,
+            extras=extras
+        )
+
+    def to_payload(self) -> Dict[str, Any]:
+        """Convert back to the `natal_charts.payload` dict layout"""
+        planets: Dict[str, Dict[str, Any]] = {}
+        lons = self.lons.tolist()
+        degrees = self.degrees.tolist()
+        signs = self.signs.tolist()
+        houses = self.houses.tolist()
+        speeds = self.speeds.tolist()
+
+        for i, name in enumerate(self.planets):
+            data: Dict[str, Any] = {
+                "sign": SIGNS[signs[i]],
+                "degree": degrees[i],
+                "lon_absolute": lons[i]
+            }
+            if speeds[i] == speeds[i]:  # not NaN
+                data["speed"] = speeds[i]
+            if houses[i]:
+                data["house"] = houses[i]
+            data.update(self.planet_extras.get(name, {}))
+            planets[name] = data
+
+        payload: Dict[str, Any] = {"planets": planets}
+        for i, key in enumerate(ANGLES):
+            if self.angle_signs[i] >= 0:
+                payload[key] = {
+                    "sign": SIGNS[int(self.angle_signs[i])],
+                    "degree": float(self.angles[i, 1]),
+                    "lon_absolute": float(self.angles[i, 0])
+                }
+        if self.cusps is not None:
+            payload["houses"] = self.cusps.tolist()
+
+        payload.update(self.extras)
+        return payload
+
+    def house_of(self, lon: float) -> int:
+        """House (1-12) of an arbitrary longitude in this chart"""
+        if self.cusps is None:
+            raise ValueError("Chart has no house cusps")
+        return find_house(lon, unwrap_cusps(self.cusps.tolist()))
+
+    def longitude(self, planet: str) -> float:
+        """Longitude of a planet"""
+        return float(self.lons[self.planets.index(planet)])
+
+    def __len__(self) -> int:
+        return len(self.planets)
@@ -0,0 +1,255 @@
+"""
+Compact Chebyshev ephemeris for fast arbitrary-time planet positions.
+
+A build step fits piecewise Chebyshev polynomials to the ecliptic
+longitude of every body in AstroService.PLANETS over a date range and
+stores the coefficients as memory-mapped .npy files. Evaluation is
+vectorized over arrays of Julian days, so thousands of positions cost a
+few array operations instead of thousands of `swe.calc_ut` calls.
+
+Build:
+    python -m app.services.chebyshev --start 1900 --end 2100 --out /var/lib/astromirror/chebyshev
+"""
+
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+import argparse
+import json
+import numpy as np
+from numpy.polynomial import chebyshev
+import swisseph as swe
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Polynomial degree per segment
+DEGREE = 12
+
+# Segment length in days per body (shorter for fast movers)
+SEGMENT_DAYS = {
+    "sun": 32,
+    "moon": 8,
+    "mercury": 16,
+    "venus": 32,
+    "mars": 32,
+    "jupiter": 64,
+    "saturn": 64,
+    "uranus": 128,
+    "neptune": 128,
+    "pluto": 128,
+}
+
+# Documented worst-case longitude error against swisseph (arcseconds).
+# The build measures the actual error per body and refuses to write a
+# file that exceeds it.
+ERROR_BOUND_ARCSEC = 5.0
+
+# Documented worst-case speed error (degrees/day), enforced the same way
+SPEED_ERROR_BOUND = 0.005
+
+META_FILE = "meta.json"
+
+
+class ChebyshevEphemeris:
+    """Memory-mapped piecewise Chebyshev ephemeris"""
+
+    def __init__(self, path: str):
+        """
+        Load a built ephemeris directory.
+
+        Args:
+            path: Directory written by ChebyshevEphemeris.build()
+        """
+        directory = Path(path)
+        self.path = str(directory)
+        self.meta = json.loads((directory / META_FILE).read_text())
+
+        self.start_jd: float = self.meta["start_jd"]
+        self.end_jd: float = self.meta["end_jd"]
+        self.bodies: List[str] = [body["name"] for body in self.meta["bodies"]]
+        self.segment_days: List[float] = [body["segment_days"] for body in self.meta["bodies"]]
+        self.coefficients: List[np.ndarray] = [
+            np.load(directory / f"{name}.npy", mmap_mode="r")
+            for name in self.bodies
+        ]
+
+    @classmethod
+    def build(
+        cls,
+        path: str,
+        start_jd: float,
+        end_jd: float,
+        planets: Sequence[Tuple[int, str]],
+        degree: int = DEGREE
+    ) -> "ChebyshevEphemeris":
+        """
+        Fit and write an ephemeris for [start_jd, end_jd).
+
+        Args:
+            path: Output directory (created if missing)
+            start_jd: First Julian day (UT) covered
+            end_jd: End of the covered range (UT)
+            planets: (swisseph id, name) pairs, e.g. AstroService.PLANETS
+            degree: Polynomial degree per segment
+
+        Raises:
+            ValueError: If a fitted body exceeds ERROR_BOUND_ARCSEC or
+                SPEED_ERROR_BOUND
+        """
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        nodes = np.cos(np.pi * (np.arange(degree + 1) + 0.5) / (degree + 1))
+        # Check points between the fit nodes
+        checks = np.linspace(-1, 1, 2 * degree + 3)
+
+        bodies = []
+        for planet_id, name in planets:
+            length = SEGMENT_DAYS.get(name, 16)
+            segments = int(np.ceil((end_jd - start_jd) / length))
+            coefficients = np.empty((segments, degree + 1), dtype=np.float64)
+            max_error = 0.0
+            max_speed_error = 0.0
+
+            for segment in range(segments):
+                segment_start = start_jd + segment * length
+
+                lons = _longitudes(planet_id, segment_start + (nodes + 1) / 2 * length)
+                coefficients[segment] = chebyshev.chebfit(nodes, np.unwrap(lons, period=360), degree)
+
+                expected, expected_speeds = _motion(planet_id, segment_start + (checks + 1) / 2 * length)
+                fitted = chebyshev.chebval(checks, coefficients[segment])
+                fitted_speeds = chebyshev.chebval(checks, chebyshev.chebder(coefficients[segment])) * (2 / length)
+                max_error = max(max_error, float(np.abs(_wrap180(fitted - expected)).max()))
+                max_speed_error = max(max_speed_error, float(np.abs(fitted_speeds - expected_speeds).max()))
+
+            max_error_arcsec = max_error * 3600
+            if max_error_arcsec > ERROR_BOUND_ARCSEC:
+                raise ValueError(
+                    f"{name}: fit error {max_error_arcsec:.3f}\" exceeds {ERROR_BOUND_ARCSEC}\""
+                )
+            if max_speed_error > SPEED_ERROR_BOUND:
+                raise ValueError(
+                    f"{name}: speed error {max_speed_error:.6f}°/day exceeds {SPEED_ERROR_BOUND}°/day"
+                )
+
+            np.save(directory / f"{name}.npy", coefficients)
+            bodies.append({
+                "name": name,
+                "segment_days": length,
+                "segments": segments,
+                "max_error_arcsec": round(max_error_arcsec, 4),
+                "max_speed_error": round(max_speed_error, 8)
+            })
+            logger.info(
+                f"Chebyshev fit for {name}: {segments} segments, max error {max_error_arcsec:.4f}\", "
+                f"max speed error {max_speed_error:.6f}°/day"
+            )
+
+        meta = {
+            "start_jd": start_jd,
+            "end_jd": end_jd,
+            "degree": degree,
+            "bodies": bodies
+        }
+        (directory / META_FILE).write_text(json.dumps(meta, indent=2))
+
+        return cls(path)
+
+    def longitudes(self, jd: np.ndarray, bodies: Optional[Sequence[str]] = None) -> np.ndarray:
+        """
+        Evaluate ecliptic longitudes.
+
+        Args:
+            jd: Julian days (UT), any shape
+            bodies: Body names (defaults to all, in build order)
+
+        Returns:
+            Array of shape jd.shape + (len(bodies),), degrees in [0, 360)
+        """
+        return self._evaluate(jd, bodies, derivative=False) % 360
+
+    def speeds(self, jd: np.ndarray, bodies: Optional[Sequence[str]] = None) -> np.ndarray:
+        """
+        Evaluate longitude speeds (degrees/day, negative when retrograde).
+
+        Returns:
+            Array of shape jd.shape + (len(bodies),)
+        """
+        return self._evaluate(jd, bodies, derivative=True)
+
+    def covers(self, jd: np.ndarray) -> bool:
+        """Check whether all Julian days fall inside the built range"""
+        jd = np.asarray(jd, dtype=np.float64)
+        return bool(np.all((jd >= self.start_jd) & (jd < self.end_jd)))
+
+    def _evaluate(self, jd, bodies: Optional[Sequence[str]], derivative: bool) -> np.ndarray:
+        """Evaluate each body's polynomial (or its time derivative) at jd"""
+        jd = np.asarray(jd, dtype=np.float64)
+        if not self.covers(jd):
+            raise ValueError(
+                f"Julian day outside ephemeris range [{self.start_jd}, {self.end_jd})"
+            )
+
+        indices = range(len(self.bodies)) if bodies is None else [self.bodies.index(b) for b in bodies]
+        flat = jd.ravel()
+        columns = []
+
+        for index in indices:
+            length = self.segment_days[index]
+            coefficients = self.coefficients[index]
+
+            offset = flat - self.start_jd
+            segment = np.minimum((offset // length).astype(np.intp), coefficients.shape[0] - 1)
+            x = 2 * (offset - segment * length) / length - 1
+
+            # (degree + 1, n) coefficient columns, evaluated pointwise
+            selected = coefficients[segment].T
+            if derivative:
+                selected = chebyshev.chebder(selected) * (2 / length)
+            columns.append(chebyshev.chebval(x, selected, tensor=False))
+
+        return np.stack(columns, axis=-1).reshape(jd.shape + (len(columns),))
+
+
+def _longitudes(planet_id: int, jds: np.ndarray) -> np.ndarray:
+    """Reference longitudes from swisseph"""
+    return np.array([swe.calc_ut(jd, planet_id)[0][0] for jd in jds.tolist()])
+
+
+def _motion(planet_id: int, jds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Reference longitudes and speeds (degrees/day) from swisseph"""
+    results = np.array([swe.calc_ut(jd, planet_id)[0][:4:3] for jd in jds.tolist()])
+    return results[:, 0], results[:, 1]
+
+
+def _wrap180(degrees: np.ndarray) -> np.ndarray:
+    """Wrap angle differences into [-180, 180)"""
+    return (degrees + 180) % 360 - 180
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Build an ephemeris from the command line"""
+    from app.services.astro import AstroService
+
+    parser = argparse.ArgumentParser(description="Build a Chebyshev ephemeris")
+    parser.add_argument("--start", type=int, default=1900, help="First year (inclusive)")
+    parser.add_argument("--end", type=int, default=2100, help="Last year (exclusive)")
+    parser.add_argument("--out", required=True, help="Output directory")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    AstroService.configure_ephemeris()
+
+    ephemeris = ChebyshevEphemeris.build(
+        args.out,
+        swe.julday(args.start, 1, 1, 0.0),
+        swe.julday(args.end, 1, 1, 0.0),
+        AstroService.PLANETS
+    )
+    for body in ephemeris.meta["bodies"]:
+        print(f"{body['name']:>8}: {body['segments']:>6} segments, max error {body['max_error_arcsec']}\"")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,13 @@
 """Consent Management Service (DSGVO Compliance)"""
 
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Union
 from fastapi import HTTPException, status
 from supabase import Client
 from app.config import settings
 from app.models.voice import VoiceConsent
+from app.repositories.base import Repositories
+from app.repositories.supabase import as_repositories
 import logging
 
 logger = logging.getLogger(__name__)
@@ -34,8 +36,12 @@ class ConsentOutdatedException(HTTPException):
 class ConsentService:
     """Service for managing user consents"""
 
-    def __init__(self, supabase: Client):
-        self.supabase = supabase
+    def __init__(self, db: Union[Client, Repositories]):
+        """
+        Args:
+            db: Repositories (see get_repositories) or a Supabase client
+        """
+        self.consents = as_repositories(db).voice_consents
 
     async def check_voice_consent(self, user_id: str) -> bool:
         """
@@ -53,18 +59,12 @@ class ConsentService:
         """
         try:
             # Query consent
-            response = self.supabase.table("voice_consents") \
-                .select("*") \
-                .eq("user_id", user_id) \
-                .is_("withdrawn_at", "null") \
-                .execute()
+            consent = await self.consents.get_active(user_id)
 
-            if not response.data:
+            if not consent:
                 logger.info(f"No active consent for user {user_id}")
                 raise ConsentRequiredException()
 
-            consent = response.data[0]
-
             # Check version
             if consent["consent_version"] != settings.current_consent_version:
                 logger.info(f"Outdated consent version for user {user_id}: {consent['consent_version']}")
@@ -103,17 +103,9 @@ class ConsentService:
             now = datetime.utcnow()
 
             # Upsert consent
-            response = self.supabase.table("voice_consents") \
-                .upsert({
-                    "user_id": user_id,
-                    "consent_version": consent_version,
-                    "consent_text": consent_text,
-                    "consent_at": now.isoformat(),
-                    "withdrawn_at": None
-                }) \
-                .execute()
-
-            if not response.data:
+            consent = await self.consents.upsert(user_id, consent_version, consent_text, now)
+
+            if not consent:
                 raise HTTPException(
                     status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                     detail="Fehler beim Speichern des Consents"
@@ -121,7 +113,7 @@ class ConsentService:
 
             logger.info(f"Consent granted for user {user_id}, version {consent_version}")
 
-            return VoiceConsent(**response.data[0])
+            return VoiceConsent(**consent)
 
         except Exception as e:
             logger.error(f"Error granting consent: {e}")
@@ -143,10 +135,7 @@ class ConsentService:
         try:
             now = datetime.utcnow()
 
-            response = self.supabase.table("voice_consents") \
-                .update({"withdrawn_at": now.isoformat()}) \
-                .eq("user_id", user_id) \
-                .execute()
+            await self.consents.withdraw(user_id, now)
 
             logger.info(f"Consent withdrawn for user {user_id}")
             return True
@@ -161,15 +150,12 @@ class ConsentService:
     async def get_consent(self, user_id: str) -> Optional[VoiceConsent]:
         """Get current consent for user"""
         try:
-            response = self.supabase.table("voice_consents") \
-                .select("*") \
-                .eq("user_id", user_id) \
-                .execute()
+            consent = await self.consents.get(user_id)
 
-            if not response.data:
+            if not consent:
                 return None
 
-            return VoiceConsent(**response.data[0])
+            return VoiceConsent(**consent)
 
         except Exception as e:
             logger.error(f"Error getting consent: {e}")
@@ -18,6 +18,9 @@ class ElevenLabsService:
 
     BASE_URL = "https://api.elevenlabs.io/v1"
 
+    # Lifetime of a conversation's signed URL
+    SIGNED_URL_TTL = timedelta(hours=1)
+
     # Agent prompts
     AGENT_PROMPTS = {
         "analytical": """Du bist AstroMirror, ein präziser astrologischer Spiegel.
@@ -104,7 +107,7 @@ BEISPIEL:
             # Mock signed URL (in production, this comes from ElevenLabs)
             signed_url = f"https://elevenlabs.io/convai/{conversation_id}?signature={secrets.token_urlsafe(32)}"
 
-            expires_at = datetime.utcnow() + timedelta(hours=1)
+            expires_at = datetime.utcnow() + self.SIGNED_URL_TTL
 
             logger.info(f"Created ElevenLabs session for user {user_id}, mode: {voice_mode}")
 
@@ -0,0 +1,341 @@
+"""
+Precomputed sky event catalog.
+
+A build step scans a date range once for retrograde/direct stations,
+sign ingresses, lunations and eclipses, refines every event to about a
+minute and writes the result as sorted, memory-mapped .npy arrays.
+Lookups ("next Mercury retrograde", "events around a date") are then
+binary searches instead of ephemeris searches per request.
+
+Build:
+    python -m app.services.event_catalog --start 1900 --end 2100 --out /var/lib/astromirror/events
+"""
+
+from pathlib import Path
+from typing import Callable, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+import argparse
+import json
+import numpy as np
+import swisseph as swe
+import logging
+
+logger = logging.getLogger(__name__)
+
+EVENT_KINDS = [
+    "station_retrograde",
+    "station_direct",
+    "ingress",
+    "new_moon",
+    "full_moon",
+    "solar_eclipse",
+    "lunar_eclipse",
+]
+
+# Eclipse `detail` codes
+ECLIPSE_TYPES = ["", "total", "annular", "partial", "hybrid", "penumbral"]
+
+# Scan step (days); short enough that no body crosses two sign
+# boundaries, or changes direction twice, between samples
+SCAN_STEP_DAYS = 0.25
+
+# Refinement stops once the bracket is shorter than this (days)
+TOLERANCE_DAYS = 1 / 1440
+
+# Bodies that never station
+NO_STATIONS = {"sun", "moon"}
+
+META_FILE = "meta.json"
+COLUMNS = ["jd", "kind", "body", "detail"]
+
+
+class CatalogEvent(NamedTuple):
+    """One catalog event"""
+    jd: float              # Julian day (UT)
+    kind: str              # One of EVENT_KINDS
+    body: Optional[str]    # Planet name (None for eclipses)
+    detail: int            # Sign index (ingress, lunation) or ECLIPSE_TYPES index
+
+
+class EventCatalog:
+    """Memory-mapped, time-sorted sky event table"""
+
+    def __init__(self, path: str):
+        """
+        Load a built catalog directory.
+
+        Args:
+            path: Directory written by EventCatalog.build()
+        """
+        directory = Path(path)
+        self.path = str(directory)
+        self.meta = json.loads((directory / META_FILE).read_text())
+
+        self.start_jd: float = self.meta["start_jd"]
+        self.end_jd: float = self.meta["end_jd"]
+        self.bodies: List[str] = self.meta["bodies"]
+
+        # Columns sorted by time
+        self.jd = np.load(directory / "jd.npy", mmap_mode="r")
+        self.kind = np.load(directory / "kind.npy", mmap_mode="r")
+        self.body = np.load(directory / "body.npy", mmap_mode="r")
+        self.detail = np.load(directory / "detail.npy", mmap_mode="r")
+
+        # Row indices grouped by (kind, body), time-sorted within a group
+        self.by_key = np.load(directory / "by_key.npy", mmap_mode="r")
+        self._key_jd = self.jd[self.by_key]
+        keys = self._keys(self.kind[self.by_key], self.body[self.by_key])
+        self._key_bounds = {
+            int(key): (int(start), int(end))
+            for key, start, end in zip(*self._segments(keys))
+        }
+
+    def __len__(self) -> int:
+        return len(self.jd)
+
+    @classmethod
+    def build(
+        cls,
+        path: str,
+        start_jd: float,
+        end_jd: float,
+        planets: Sequence[Tuple[int, str]]
+    ) -> "EventCatalog":
+        """
+        Scan [start_jd, end_jd) and write the catalog.
+
+        Args:
+            path: Output directory (created if missing)
+            start_jd: First Julian day (UT) covered
+            end_jd: End of the covered range (UT)
+            planets: (swisseph id, name) pairs, e.g. AstroService.PLANETS
+        """
+        directory = Path(path)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        names = [name for _, name in planets]
+        ids = dict((name, planet_id) for planet_id, name in planets)
+        jds = np.arange(start_jd, end_jd + SCAN_STEP_DAYS, SCAN_STEP_DAYS)
+
+        # (T, P) longitudes and speeds on the scan grid
+        positions = np.array([
+            [swe.calc_ut(jd, planet_id)[0][:4:3] for planet_id, _ in planets]
+            for jd in jds.tolist()
+        ])
+        lons, speeds = positions[..., 0], positions[..., 1]
+
+        events: List[Tuple[float, int, int, int]] = []
+
+        for column, name in enumerate(names):
+            planet_id = ids[name]
+            lon = lambda jd, pid=planet_id: swe.calc_ut(jd, pid)[0][0]
+            speed = lambda jd, pid=planet_id: swe.calc_ut(jd, pid)[0][3]
+
+            # Sign ingresses: the sign index changes between samples
+            signs = (lons[:, column] // 30).astype(np.int64)
+            for step in np.nonzero(signs[1:] != signs[:-1])[0].tolist():
+                sign = int(signs[step + 1])
+                # Retrograde ingress re-enters the previous sign's boundary
+                boundary = 30.0 * (sign if speeds[step, column] >= 0 else (sign + 1) % 12)
+                jd = _refine(lambda t: _wrap180(lon(t) - boundary), jds[step], jds[step + 1])
+                events.append((jd, EVENT_KINDS.index("ingress"), column, sign))
+
+            # Stations: the speed changes sign
+            if name not in NO_STATIONS:
+                s = speeds[:, column]
+                for step in np.nonzero(np.sign(s[1:]) != np.sign(s[:-1]))[0].tolist():
+                    kind = "station_retrograde" if s[step] > 0 else "station_direct"
+                    jd = _refine(speed, jds[step], jds[step + 1])
+                    sign = int(lon(jd) // 30)
+                    events.append((jd, EVENT_KINDS.index(kind), column, sign))
+
+        # Lunations: moon-sun elongation crosses 0° (new) or 180° (full)
+        sun, moon = names.index("sun"), names.index("moon")
+        elongation = lambda jd: swe.calc_ut(jd, ids["moon"])[0][0] - swe.calc_ut(jd, ids["sun"])[0][0]
+        for kind, target in (("new_moon", 0.0), ("full_moon", 180.0)):
+            d = _wrap180(lons[:, moon] - lons[:, sun] - target)
+            crossings = np.nonzero((d[:-1] < 0) & (d[1:] >= 0))[0]
+            for step in crossings.tolist():
+                jd = _refine(lambda t: _wrap180(elongation(t) - target), jds[step], jds[step + 1])
+                events.append((jd, EVENT_KINDS.index(kind), moon, int(swe.calc_ut(jd, ids["moon"])[0][0] // 30)))
+
+        events.extend(_eclipses(start_jd, end_jd))
+        events = [event for event in events if start_jd <= event[0] < end_jd]
+
+        table = np.array(events, dtype=[("jd", "f8"), ("kind", "i1"), ("body", "i1"), ("detail", "i1")])
+        table.sort(order="jd")
+        for column in COLUMNS:
+            np.save(directory / f"{column}.npy", np.ascontiguousarray(table[column]))
+
+        keys = cls._keys(table["kind"], table["body"])
+        np.save(directory / "by_key.npy", np.lexsort((table["jd"], keys)).astype(np.int32))
+
+        meta = {
+            "start_jd": start_jd,
+            "end_jd": end_jd,
+            "bodies": names,
+            "kinds": EVENT_KINDS,
+            "events": len(table)
+        }
+        (directory / META_FILE).write_text(json.dumps(meta, indent=2))
+        logger.info(f"Event catalog built: {len(table)} events")
+
+        return cls(path)
+
+    def covers(self, jd: float) -> bool:
+        """Check whether a Julian day falls inside the built range"""
+        return self.start_jd <= jd < self.end_jd
+
+    def between(
+        self,
+        start_jd: float,
+        end_jd: float,
+        kinds: Optional[Iterable[str]] = None,
+        body: Optional[str] = None
+    ) -> List[CatalogEvent]:
+        """
+        Events in [start_jd, end_jd), optionally filtered by kind and body.
+
+        O(log n + k) for k events in the window.
+        """
+        lo = int(np.searchsorted(self.jd, start_jd, "left"))
+        hi = int(np.searchsorted(self.jd, end_jd, "left"))
+        rows = np.arange(lo, hi)
+
+        if kinds is not None:
+            codes = [EVENT_KINDS.index(kind) for kind in kinds]
+            rows = rows[np.isin(self.kind[lo:hi], codes)]
+        if body is not None:
+            rows = rows[self.body[rows] == self.bodies.index(body)]
+
+        return [self._event(row) for row in rows.tolist()]
+
+    def next(self, kind: str, jd: float, body: Optional[str] = None) -> Optional[CatalogEvent]:
+        """First event of a kind (and body, any body if None) at or after jd, or None"""
+        rows = []
+        for start, end in self._groups(kind, body):
+            position = start + int(np.searchsorted(self._key_jd[start:end], jd, "left"))
+            if position < end:
+                rows.append(int(self.by_key[position]))
+        return self._event(min(rows, key=lambda row: self.jd[row])) if rows else None
+
+    def previous(self, kind: str, jd: float, body: Optional[str] = None) -> Optional[CatalogEvent]:
+        """Last event of a kind (and body, any body if None) before jd, or None"""
+        rows = []
+        for start, end in self._groups(kind, body):
+            position = start + int(np.searchsorted(self._key_jd[start:end], jd, "left")) - 1
+            if position >= start:
+                rows.append(int(self.by_key[position]))
+        return self._event(max(rows, key=lambda row: self.jd[row])) if rows else None
+
+    def _groups(self, kind: str, body: Optional[str]) -> List[Tuple[int, int]]:
+        """by_key slices for a kind and one body (all bodies if None)"""
+        kind_code = EVENT_KINDS.index(kind)
+        if body is not None:
+            bounds = self._key_bounds.get(int(self._keys(kind_code, self.bodies.index(body))))
+            return [bounds] if bounds is not None else []
+        return [
+            bounds for key, bounds in self._key_bounds.items()
+            if key // 256 == kind_code
+        ]
+
+    def _event(self, row: int) -> CatalogEvent:
+        body = int(self.body[row])
+        return CatalogEvent(
+            jd=float(self.jd[row]),
+            kind=EVENT_KINDS[int(self.kind[row])],
+            body=self.bodies[body] if body >= 0 else None,
+            detail=int(self.detail[row])
+        )
+
+    @staticmethod
+    def _keys(kinds, bodies):
+        """Group key per (kind, body); body -1 means none"""
+        return np.asarray(kinds, dtype=np.int64) * 256 + np.asarray(bodies, dtype=np.int64) + 1
+
+    @staticmethod
+    def _segments(sorted_keys: np.ndarray):
+        """(key, start, end) of each run in a sorted key array"""
+        if len(sorted_keys) == 0:
+            return [], [], []
+        starts = np.concatenate([[0], np.nonzero(np.diff(sorted_keys))[0] + 1])
+        ends = np.concatenate([starts[1:], [len(sorted_keys)]])
+        return sorted_keys[starts].tolist(), starts.tolist(), ends.tolist()
+
+
+def _eclipses(start_jd: float, end_jd: float) -> List[Tuple[float, int, int, int]]:
+    """Solar and lunar eclipses (time of maximum) in the range"""
+    events = []
+    searches: List[Tuple[str, Callable]] = [
+        ("solar_eclipse", swe.sol_eclipse_when_glob),
+        ("lunar_eclipse", swe.lun_eclipse_when)
+    ]
+    for kind, search in searches:
+        jd = start_jd
+        while True:
+            flags, times = search(jd)
+            if times[0] >= end_jd:
+                break
+            events.append((times[0], EVENT_KINDS.index(kind), -1, _eclipse_type(flags)))
+            jd = times[0] + 1
+    return events
+
+
+def _eclipse_type(flags: int) -> int:
+    """ECLIPSE_TYPES index from swisseph result flags"""
+    if flags & swe.ECL_ANNULAR_TOTAL:
+        return ECLIPSE_TYPES.index("hybrid")
+    if flags & swe.ECL_TOTAL:
+        return ECLIPSE_TYPES.index("total")
+    if flags & swe.ECL_ANNULAR:
+        return ECLIPSE_TYPES.index("annular")
+    if flags & swe.ECL_PARTIAL:
+        return ECLIPSE_TYPES.index("partial")
+    if flags & swe.ECL_PENUMBRAL:
+        return ECLIPSE_TYPES.index("penumbral")
+    return 0
+
+
+def _refine(f: Callable[[float], float], a: float, b: float) -> float:
+    """Bisect a sign change of f in [a, b]"""
+    fa = f(a)
+    while b - a > TOLERANCE_DAYS:
+        mid = (a + b) / 2
+        f_mid = f(mid)
+        if (f_mid < 0) == (fa < 0):
+            a, fa = mid, f_mid
+        else:
+            b = mid
+    return (a + b) / 2
+
+
+def _wrap180(degrees):
+    """Wrap angle differences into [-180, 180)"""
+    return (degrees + 180) % 360 - 180
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Build a catalog from the command line"""
+    from app.services.astro import AstroService
+
+    parser = argparse.ArgumentParser(description="Build the sky event catalog")
+    parser.add_argument("--start", type=int, default=1900, help="First year (inclusive)")
+    parser.add_argument("--end", type=int, default=2100, help="Last year (exclusive)")
+    parser.add_argument("--out", required=True, help="Output directory")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    AstroService.configure_ephemeris()
+
+    catalog = EventCatalog.build(
+        args.out,
+        swe.julday(args.start, 1, 1, 0.0),
+        swe.julday(args.end, 1, 1, 0.0),
+        AstroService.PLANETS
+    )
+    kinds = np.bincount(np.asarray(catalog.kind), minlength=len(EVENT_KINDS))
+    for kind, count in zip(EVENT_KINDS, kinds.tolist()):
+        print(f"{kind:>18}: {count:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""Exact-time solver for transit aspects"""
+
+from collections import OrderedDict
+from datetime import datetime, timezone, timedelta
+from threading import Lock
+from typing import Callable, Dict, Optional, Tuple
+import time
+import swisseph as swe
+from app.services.astro_batch import UNIX_EPOCH_JD
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Upper bound of |longitude speed| per body (degrees/day)
+MAX_SPEED = {
+    "sun": 1.02,
+    "moon": 15.4,
+    "mercury": 2.2,
+    "venus": 1.27,
+    "mars": 0.8,
+    "jupiter": 0.25,
+    "saturn": 0.14,
+    "uranus": 0.07,
+    "neptune": 0.04,
+    "pluto": 0.04,
+}
+
+# Mean longitude speed per body (degrees/day), sizes the search window
+MEAN_SPEED = {
+    "sun": 0.9856,
+    "moon": 13.176,
+    "mercury": 0.9856,
+    "venus": 0.9856,
+    "mars": 0.524,
+    "jupiter": 0.0831,
+    "saturn": 0.0335,
+    "uranus": 0.0117,
+    "neptune": 0.006,
+    "pluto": 0.004,
+}
+
+# Longitude a body may move per scan step (degrees)
+STEP_DEGREES = 2.0
+
+# Longest search in either direction (days). Slow outer planets can stay
+# within orb for years; aspects without a crossing in the window get None.
+MAX_WINDOW_DAYS = 3 * 365.25
+
+# Bisection stops once the bracket is shorter than this (days)
+TOLERANCE_DAYS = 1 / 1440
+
+
+def datetime_from_jd(jd: float) -> datetime:
+    """Convert a Julian day (UT) to an aware UTC datetime (second precision)"""
+    seconds = round((jd - UNIX_EPOCH_JD) * 86400)
+    return datetime(1970, 1, 1, tzinfo=timezone.utc) + timedelta(seconds=seconds)
+
+
+def _wrap180(degrees: float) -> float:
+    """Wrap an angle difference into [-180, 180)"""
+    return (degrees + 180) % 360 - 180
+
+
+class ExactTimeSolver:
+    """
+    Find when a transit aspect is (or was) exact.
+
+    The signed distance between the transiting planet and the aspect point
+    is bracketed by scanning outward from a Newton estimate (current
+    distance divided by the planet's speed), then refined by bisection.
+    Results are cached per (natal position, transit planet, aspect,
+    reference time), so repeated tool calls within one sky bucket (see
+    SkyCache; callers pass the bucket's jd) don't redo the search. The
+    nearest exact time depends on the reference time, so a root found for
+    another time is never reused.
+    """
+
+    def __init__(
+        self,
+        planet_ids: Dict[str, int],
+        max_entries: int = 4096,
+        ttl_seconds: float = 3600
+    ):
+        self.planet_ids = planet_ids
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[Tuple, Tuple[Optional[float], float]]" = OrderedDict()
+        self._lock = Lock()
+
+    def exact_jd(
+        self,
+        transit_planet: str,
+        natal_lon: float,
+        aspect_angle: float,
+        orb: float,
+        jd: float,
+        transit_lon: float,
+        transit_speed: float
+    ) -> Optional[float]:
+        """
+        Find the Julian day nearest to `jd` when the aspect is exact.
+
+        Args:
+            transit_planet: Transiting planet name (key of planet_ids)
+            natal_lon: Natal longitude the aspect is made to
+            aspect_angle: Aspect angle in degrees (0, 60, 90, ...)
+            orb: Allowed orb for the aspect
+            jd: Reference Julian day (UT)
+            transit_lon: Transiting longitude at jd
+            transit_speed: Transiting speed at jd (degrees/day)
+
+        Returns:
+            Julian day of exactness, or None if no crossing within the window
+        """
+        key = (transit_planet, round(natal_lon, 6), aspect_angle, round(jd, 8))
+        now = time.monotonic()
+
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None and cached[1] > now:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return cached[0]
+
+            self.misses += 1
+
+        result = self._solve(transit_planet, natal_lon, aspect_angle, orb, jd, transit_lon, transit_speed)
+
+        with self._lock:
+            self._entries[key] = (result, now + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        return result
+
+    def stats(self) -> Dict[str, float]:
+        """Get cache statistics"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+
+    def _solve(
+        self,
+        transit_planet: str,
+        natal_lon: float,
+        aspect_angle: float,
+        orb: float,
+        jd: float,
+        transit_lon: float,
+        transit_speed: float
+    ) -> Optional[float]:
+        """Bracket and bisect the signed distance to the nearest aspect point"""
+        planet_id = self.planet_ids[transit_planet]
+
+        # Aspect points on either side of the natal position; use the closer one
+        targets = [(natal_lon + aspect_angle) % 360, (natal_lon - aspect_angle) % 360]
+        target = min(targets, key=lambda t: abs(_wrap180(transit_lon - t)))
+
+        def distance(t: float) -> float:
+            result, _ = swe.calc_ut(t, planet_id)
+            return _wrap180(result[0] - target)
+
+        delta = _wrap180(transit_lon - target)
+        if delta == 0:
+            return jd
+
+        window = min(MAX_WINDOW_DAYS, 3 * (orb + 1) / MEAN_SPEED[transit_planet])
+        step = STEP_DEGREES / MAX_SPEED[transit_planet]
+
+        # Newton estimate from the current speed, clamped to the window
+        center = jd
+        if abs(transit_speed) > 1e-9:
+            center = jd - max(-window, min(window, delta / transit_speed))
+
+        bracket = self._bracket(distance, center, step, jd - window, jd + window)
+        if bracket is None:
+            return None
+
+        return self._bisect(distance, *bracket)
+
+    def _bracket(
+        self,
+        distance: Callable[[float], float],
+        center: float,
+        step: float,
+        lower: float,
+        upper: float
+    ) -> Optional[Tuple[float, float, float, float]]:
+        """Scan outward from center until the distance changes sign"""
+        f_center = distance(center)
+        if f_center == 0:
+            return center, f_center, center, f_center
+
+        edges = {1: (center, f_center), -1: (center, f_center)}
+        k = 1
+        while center - k * step >= lower or center + k * step <= upper:
+            for direction in (1, -1):
+                t = center + direction * k * step
+                if not lower <= t <= upper:
+                    continue
+
+                f = distance(t)
+                t_prev, f_prev = edges[direction]
+                edges[direction] = (t, f)
+
+                # Sign change away from the ±180° wrap
+                if f == 0 or (f * f_prev < 0 and abs(f) < 90 and abs(f_prev) < 90):
+                    if direction == 1:
+                        return t_prev, f_prev, t, f
+                    return t, f, t_prev, f_prev
+            k += 1
+
+        return None
+
+    def _bisect(
+        self,
+        distance: Callable[[float], float],
+        a: float,
+        fa: float,
+        b: float,
+        fb: float
+    ) -> float:
+        """Refine a sign-change bracket [a, b]"""
+        if fa == 0:
+            return a
+        if fb == 0:
+            return b
+
+        while b - a > TOLERANCE_DAYS:
+            mid = (a + b) / 2
+            f_mid = distance(mid)
+            if f_mid == 0:
+                return mid
+            if (f_mid < 0) == (fa < 0):
+                a, fa = mid, f_mid
+            else:
+                b, fb = mid, f_mid
+
+        return (a + b) / 2
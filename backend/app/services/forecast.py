@@ -0,0 +1,132 @@
+"""Sweep-line transit forecast"""
+
+from typing import Callable, Iterator, Sequence, Tuple
+import numpy as np
+from app.models.astro import TransitEvent
+from app.services.exact_time import datetime_from_jd
+
+# Event kinds in the order they are emitted for simultaneous events
+EVENT_KINDS = ["active", "orb_start", "exact", "orb_end"]
+
+
+def _wrap180(degrees: np.ndarray) -> np.ndarray:
+    """Wrap angle differences into [-180, 180)"""
+    return (degrees + 180) % 360 - 180
+
+
+def iter_transit_events(
+    natal_names: Sequence[str],
+    natal_lons: np.ndarray,
+    transit_names: Sequence[str],
+    positions: Callable[[np.ndarray], np.ndarray],
+    aspects: Sequence[Tuple[str, float, float]],
+    start_jd: float,
+    end_jd: float,
+    step_days: float = 0.25,
+    chunk_steps: int = 120
+) -> Iterator[TransitEvent]:
+    """
+    Sweep a time window and yield transit-to-natal aspect events.
+
+    The window is sampled every `step_days`; between consecutive samples
+    every (transit planet, natal planet, aspect) is checked for crossing
+    the orb boundary or the exact aspect point, and the event time is
+    interpolated linearly. Samples are processed `chunk_steps` at a time
+    and events are yielded in chronological order as each chunk finishes,
+    so memory does not grow with the window length.
+
+    Aspects already within orb at `start_jd` are reported as "active".
+
+    Args:
+        natal_names: Natal planet names
+        natal_lons: Natal longitudes, shape (N,)
+        transit_names: Transiting planet names (columns of `positions`)
+        positions: Maps Julian days (m,) to transit longitudes (m, T)
+        aspects: Aspect table as (name, angle, orb) tuples
+        start_jd: Window start (Julian day, UT)
+        end_jd: Window end (Julian day, UT)
+        step_days: Sampling interval
+        chunk_steps: Samples per vectorized chunk
+
+    Yields:
+        TransitEvent
+    """
+    natal_lons = np.asarray(natal_lons, dtype=np.float64)
+    angles = np.array([angle for _, angle, _ in aspects], dtype=np.float64)
+    orbs = np.array([orb for _, _, orb in aspects], dtype=np.float64)
+    aspect_names = [name for name, _, _ in aspects]
+
+    # Conjunction and opposition have a single aspect point
+    two_sided = (angles > 0) & (angles < 180)
+
+    def make_event(kind: int, jd: float, t: int, n: int, k: int, orb: float) -> TransitEvent:
+        return TransitEvent(
+            event=EVENT_KINDS[kind],
+            type=aspect_names[k],
+            transit_planet=transit_names[t],
+            natal_planet=natal_names[n],
+            date=datetime_from_jd(jd),
+            orb=round(orb, 2)
+        )
+
+    total_steps = int(np.ceil((end_jd - start_jd) / step_days))
+    previous = None
+
+    for first in range(0, total_steps + 1, chunk_steps):
+        steps = np.arange(first, min(first + chunk_steps, total_steps + 1))
+        jds = np.minimum(start_jd + steps * step_days, end_jd)
+
+        # (m, T, N) signed difference, (m, T, N, K) deviation and aspect distances
+        diff = positions(jds)[:, :, np.newaxis] - natal_lons[np.newaxis, np.newaxis, :]
+        separation = np.abs(_wrap180(diff))
+        deviation = np.abs(separation[..., np.newaxis] - angles)
+        distance_plus = _wrap180(diff[..., np.newaxis] - angles)
+        distance_minus = _wrap180(diff[..., np.newaxis] + angles)
+
+        if previous is None:
+            for t, n, k in zip(*np.nonzero(deviation[0] <= orbs)):
+                yield make_event(0, jds[0], t, n, k, deviation[0, t, n, k])
+        else:
+            # Prepend the last sample of the previous chunk
+            jds = np.concatenate([previous[0], jds])
+            deviation = np.concatenate([previous[1], deviation])
+            distance_plus = np.concatenate([previous[2], distance_plus])
+            distance_minus = np.concatenate([previous[3], distance_minus])
+
+        previous = (jds[-1:], deviation[-1:], distance_plus[-1:], distance_minus[-1:])
+        if len(jds) < 2:
+            continue
+
+        events = []
+        t0 = jds[:-1, np.newaxis, np.newaxis, np.newaxis]
+        dt = np.diff(jds)[:, np.newaxis, np.newaxis, np.newaxis]
+
+        # Orb boundary crossings
+        g = deviation - orbs
+        g0, g1 = g[:-1], g[1:]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            when = t0 + dt * g0 / (g0 - g1)
+        for kind, mask in ((1, (g0 > 0) & (g1 <= 0)), (3, (g0 <= 0) & (g1 > 0))):
+            idx = np.nonzero(mask)
+            events.extend(
+                (jd, kind, t, n, k, orbs[k])
+                for jd, (_, t, n, k) in zip(when[idx].tolist(), zip(*(i.tolist() for i in idx)))
+            )
+
+        # Exact aspect point crossings (sign change away from the ±180° wrap)
+        for distance, sides in ((distance_plus, None), (distance_minus, two_sided)):
+            d0, d1 = distance[:-1], distance[1:]
+            mask = (np.sign(d0) != np.sign(d1)) & (np.abs(d0) < 90) & (np.abs(d1) < 90) & (d0 != 0)
+            if sides is not None:
+                mask &= sides
+            with np.errstate(divide="ignore", invalid="ignore"):
+                when = t0 + dt * d0 / (d0 - d1)
+            idx = np.nonzero(mask)
+            events.extend(
+                (jd, 2, t, n, k, 0.0)
+                for jd, (_, t, n, k) in zip(when[idx].tolist(), zip(*(i.tolist() for i in idx)))
+            )
+
+        events.sort(key=lambda event: (event[0], event[1]))
+        for jd, kind, t, n, k, orb in events:
+            yield make_event(kind, jd, t, n, k, orb)
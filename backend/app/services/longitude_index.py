@@ -0,0 +1,241 @@
+"""Inverted longitude index over all users' natal charts"""
+
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Snapshot layout version, bump when the .npz keys change
+SNAPSHOT_VERSION = 1
+
+# Pending updates merged into the sorted arrays by compact()
+DEFAULT_COMPACT_THRESHOLD = 1024
+
+
+class LongitudeIndex:
+    """
+    Find every user whose natal planet lies near a given longitude.
+
+    Each natal planet has a sorted longitude array with a parallel user id
+    array, so a (wrap-around) range query is two binary searches plus the
+    k hits: O(log n + k) instead of a scan over every chart.
+
+    Updates don't re-sort the arrays. New or changed charts go to a small
+    delta buffer and replaced or removed users are tombstoned; queries
+    consult both, and compact() merges them back once the buffer reaches
+    `compact_threshold`.
+    """
+
+    def __init__(
+        self,
+        planets: Sequence[str],
+        compact_threshold: int = DEFAULT_COMPACT_THRESHOLD
+    ):
+        """
+        Args:
+            planets: Natal planet names to index (e.g. names from AstroService.PLANETS)
+            compact_threshold: Pending updates that trigger compact()
+        """
+        self.planets = list(planets)
+        self.compact_threshold = compact_threshold
+
+        # Sorted base arrays per planet
+        self._lons: Dict[str, np.ndarray] = {p: np.empty(0, dtype=np.float64) for p in self.planets}
+        self._ids: Dict[str, np.ndarray] = {p: np.empty(0, dtype=str) for p in self.planets}
+        self._base_users: Set[str] = set()
+
+        # Delta buffer (user id -> {planet: longitude}) and tombstoned base users
+        self._delta: Dict[str, Dict[str, float]] = {}
+        self._tombstones: Set[str] = set()
+        self._lock = Lock()
+
+    @classmethod
+    def from_rows(
+        cls,
+        planets: Sequence[str],
+        rows: Iterable[Dict[str, Any]],
+        compact_threshold: int = DEFAULT_COMPACT_THRESHOLD
+    ) -> "LongitudeIndex":
+        """
+        Build an index from `natal_charts` rows.
+
+        Rows need `user_id` and `payload`; when a user has several charts
+        the one with the latest `computed_at` wins.
+        """
+        latest: Dict[str, Dict[str, Any]] = {}
+        for row in rows:
+            user_id = str(row["user_id"])
+            current = latest.get(user_id)
+            if current is None or (row.get("computed_at") or "") >= (current.get("computed_at") or ""):
+                latest[user_id] = row
+
+        index = cls(planets, compact_threshold)
+        for user_id, row in latest.items():
+            index._delta[user_id] = index._extract(row["payload"])
+        index.compact()
+
+        logger.info(f"Longitude index built for {len(index)} users")
+        return index
+
+    def __len__(self) -> int:
+        """Number of indexed users"""
+        return len((self._base_users - self._tombstones) | set(self._delta))
+
+    def upsert(self, user_id: str, natal_chart: Dict[str, Any]) -> None:
+        """Add or replace a user's natal chart"""
+        user_id = str(user_id)
+        with self._lock:
+            if user_id in self._base_users:
+                self._tombstones.add(user_id)
+            self._delta[user_id] = self._extract(natal_chart)
+            pending = len(self._delta) + len(self._tombstones)
+
+        if pending >= self.compact_threshold:
+            self.compact()
+
+    def remove(self, user_id: str) -> None:
+        """Drop a user from the index"""
+        user_id = str(user_id)
+        with self._lock:
+            self._delta.pop(user_id, None)
+            if user_id in self._base_users:
+                self._tombstones.add(user_id)
+
+    def compact(self) -> None:
+        """Merge the delta buffer and tombstones into the sorted arrays"""
+        with self._lock:
+            if not self._delta and not self._tombstones:
+                return
+
+            tombstones = np.array(sorted(self._tombstones), dtype=str)
+            for planet in self.planets:
+                lons, ids = self._lons[planet], self._ids[planet]
+                if len(tombstones):
+                    keep = ~np.isin(ids, tombstones)
+                    lons, ids = lons[keep], ids[keep]
+
+                added = [(lon_by_planet[planet], user_id)
+                         for user_id, lon_by_planet in self._delta.items()
+                         if planet in lon_by_planet]
+                if added:
+                    lons = np.concatenate([lons, np.array([lon for lon, _ in added], dtype=np.float64)])
+                    ids = np.concatenate([ids, np.array([user_id for _, user_id in added], dtype=str)])
+
+                order = np.argsort(lons, kind="stable")
+                self._lons[planet], self._ids[planet] = lons[order], ids[order]
+
+            self._base_users = (self._base_users - self._tombstones) | set(self._delta)
+            self._delta = {}
+            self._tombstones = set()
+
+    def query(self, planet: str, lon: float, orb: float) -> Set[str]:
+        """
+        Users whose natal `planet` lies within `orb` of `lon` (wrapping at 0°/360°).
+        """
+        with self._lock:
+            lons, ids = self._lons[planet], self._ids[planet]
+            tombstones = set(self._tombstones)
+            delta = [(user_id, lon_by_planet[planet])
+                     for user_id, lon_by_planet in self._delta.items()
+                     if planet in lon_by_planet]
+
+        users: Set[str] = set()
+        for start, end in self._ranges(lons, lon, orb):
+            users.update(ids[start:end].tolist())
+        users -= tombstones
+
+        users.update(
+            user_id for user_id, natal_lon in delta
+            if abs((natal_lon - lon + 180) % 360 - 180) <= orb
+        )
+        return users
+
+    def match(
+        self,
+        transit_lon: float,
+        aspects: Sequence[Tuple[str, float, float]],
+        planets: Optional[Sequence[str]] = None
+    ) -> Dict[str, List[Tuple[str, str]]]:
+        """
+        Find all users aspected by a transiting longitude.
+
+        Args:
+            transit_lon: Transiting longitude
+            aspects: Aspect table as (name, angle, orb) tuples
+            planets: Natal planets to check (defaults to all indexed)
+
+        Returns:
+            Dict user id -> list of (natal planet, aspect name)
+        """
+        hits: Dict[str, List[Tuple[str, str]]] = {}
+        for planet in planets or self.planets:
+            for name, angle, orb in aspects:
+                # Conjunction and opposition have a single aspect point
+                targets = {(transit_lon + angle) % 360, (transit_lon - angle) % 360}
+                users: Set[str] = set()
+                for target in targets:
+                    users |= self.query(planet, target, orb)
+                for user_id in users:
+                    hits.setdefault(user_id, []).append((planet, name))
+        return hits
+
+    def save(self, path: str) -> None:
+        """Compact and write a snapshot (.npz) for fast cold start"""
+        self.compact()
+        with self._lock:
+            arrays = {"version": np.array(SNAPSHOT_VERSION), "planets": np.array(self.planets, dtype=str)}
+            for planet in self.planets:
+                arrays[f"{planet}_lons"] = self._lons[planet]
+                arrays[f"{planet}_ids"] = self._ids[planet]
+
+        with open(path, "wb") as f:
+            np.savez(f, **arrays)
+        logger.info(f"Longitude index snapshot written to {path} ({len(self)} users)")
+
+    @classmethod
+    def load(cls, path: str, compact_threshold: int = DEFAULT_COMPACT_THRESHOLD) -> "LongitudeIndex":
+        """
+        Load a snapshot written by save().
+
+        Raises:
+            ValueError: If the snapshot has an unknown layout version
+        """
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data["version"])
+            if version != SNAPSHOT_VERSION:
+                raise ValueError(f"Unsupported longitude index snapshot version {version}")
+
+            index = cls(data["planets"].tolist(), compact_threshold)
+            for planet in index.planets:
+                index._lons[planet] = data[f"{planet}_lons"]
+                index._ids[planet] = data[f"{planet}_ids"]
+                index._base_users.update(index._ids[planet].tolist())
+
+        logger.info(f"Longitude index snapshot loaded from {path} ({len(index)} users)")
+        return index
+
+    def _extract(self, natal_chart: Dict[str, Any]) -> Dict[str, float]:
+        """Indexed planet longitudes from a natal chart payload"""
+        planets = natal_chart.get("planets", {})
+        return {
+            planet: float(planets[planet]["lon_absolute"])
+            for planet in self.planets
+            if planet in planets
+        }
+
+    @staticmethod
+    def _ranges(lons: np.ndarray, lon: float, orb: float) -> List[Tuple[int, int]]:
+        """Index ranges of `lons` within [lon - orb, lon + orb], split at 360°"""
+        if orb >= 180:
+            return [(0, len(lons))]
+
+        low, high = (lon - orb) % 360, (lon + orb) % 360
+        if low <= high:
+            return [(int(np.searchsorted(lons, low, "left")), int(np.searchsorted(lons, high, "right")))]
+
+        return [
+            (int(np.searchsorted(lons, low, "left")), len(lons)),
+            (0, int(np.searchsorted(lons, high, "right")))
+        ]
@@ -0,0 +1,58 @@
+"""Natal chart payload reads (JSON and binary format v2)"""
+
+from typing import Any, Mapping, Optional
+from supabase import Client
+from app.config import settings
+from app.services.chart_codec import decode_payload, is_encoded
+import logging
+
+logger = logging.getLogger(__name__)
+
+# natal_charts.payload_format values
+PAYLOAD_FORMAT_JSON = 1
+PAYLOAD_FORMAT_V2 = 2
+
+
+def load_latest_natal_payload(
+    supabase: Client,
+    user_id: str,
+    chart_id: Optional[str] = None
+) -> Optional[Mapping[str, Any]]:
+    """
+    Load the user's most recent natal chart payload.
+
+    Reads the compact `payload_v2` column when it is filled and falls
+    back to the JSON `payload` for rows not backfilled yet (dual read,
+    one request: both columns are selected). With NATAL_PAYLOAD_V2_READS
+    off, only the JSON column is read.
+
+    Args:
+        supabase: Supabase client
+        user_id: Owner of the chart
+        chart_id: Load this chart (must belong to the user) instead of
+            the most recent one
+
+    Returns:
+        Payload mapping (LazyChartPayload for v2 rows), or None if the
+        user has no natal chart
+    """
+    columns = "payload_v2, payload" if settings.natal_payload_v2_reads else "payload"
+    query = supabase.table("natal_charts") \
+        .select(columns) \
+        .eq("user_id", user_id)
+    if chart_id is not None:
+        query = query.eq("id", chart_id)
+    response = query \
+        .order("computed_at", desc=True) \
+        .limit(1) \
+        .execute()
+
+    if not response.data:
+        return None
+
+    row = response.data[0]
+    if settings.natal_payload_v2_reads and is_encoded(row.get("payload_v2")):
+        return decode_payload(row["payload_v2"])
+
+    # JSON reads, or not backfilled yet
+    return row["payload"]
@@ -0,0 +1,190 @@
+"""Aspect-pattern detection on per-planet aspect bitmasks"""
+
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+
+# Minor aspect only used as a pattern edge (yod), not reported as a transit
+QUINCUNX = ("quincunx", 150, 3)
+
+# Planets in one sign that make a stellium
+STELLIUM_MIN_PLANETS = 3
+
+PATTERN_TYPES = ["grand_trine", "t_square", "yod", "stellium"]
+
+
+class PatternHits(NamedTuple):
+    """
+    Detected patterns as parallel arrays.
+
+    `members` is a bitmask over the planet columns (bit i = column i);
+    `apex` is the focal planet column (T-square, yod) or -1.
+    """
+    chart: np.ndarray    # Index into the stacked charts
+    kind: np.ndarray     # Index into PATTERN_TYPES
+    members: np.ndarray  # int64 planet bitmask
+    apex: np.ndarray     # Planet column or -1
+
+
+def aspect_bitmasks(
+    lons: np.ndarray,
+    aspects: Sequence[Tuple[str, float, float]]
+) -> np.ndarray:
+    """
+    Build the aspect graph of each chart as per-planet bitmasks.
+
+    Args:
+        lons: Longitudes, shape (C, P) with P <= 63. NaN marks a missing
+            planet and has no edges.
+        aspects: Aspect table as (name, angle, orb) tuples
+
+    Returns:
+        int64 array (C, K, P): bit j of [c, k, i] is set when planets i
+        and j of chart c form aspect k
+    """
+    lons = np.asarray(lons, dtype=np.float64)
+    angles = np.array([angle for _, angle, _ in aspects], dtype=np.float64)
+    orbs = np.array([orb for _, _, orb in aspects], dtype=np.float64)
+
+    # (C, P, P) smallest separation, (C, K, P, P) adjacency
+    separation = np.abs(lons[:, :, np.newaxis] - lons[:, np.newaxis, :])
+    separation = np.where(separation > 180, 360 - separation, separation)
+    adjacent = np.abs(separation[:, np.newaxis] - angles[:, np.newaxis, np.newaxis]) <= orbs[:, np.newaxis, np.newaxis]
+
+    # A planet never aspects itself
+    planets = lons.shape[1]
+    adjacent &= ~np.eye(planets, dtype=bool)
+
+    bits = np.left_shift(np.int64(1), np.arange(planets, dtype=np.int64))
+    return (adjacent * bits).sum(axis=-1, dtype=np.int64)
+
+
+def detect_patterns(
+    lons: np.ndarray,
+    signs: np.ndarray,
+    aspects: Sequence[Tuple[str, float, float]],
+    chunk_size: int = 4096
+) -> PatternHits:
+    """
+    Find grand trines, T-squares, yods and stelliums in many charts at once.
+
+    Every test is a bitwise AND over all charts per planet pair, e.g. a
+    grand trine on (i, j) is `trine[i] & trine[j]` restricted to planets
+    after j, instead of a loop over planet triples per chart.
+
+    Args:
+        lons: Longitudes, shape (C, P); NaN marks a missing planet
+        signs: Sign indices (0-11), shape (C, P); -1 marks a missing planet
+        aspects: Aspect table with at least trine, square, opposition and
+            sextile (quincunx is added for yods)
+        chunk_size: Charts per block (bounds the (C, K, P, P) adjacency)
+
+    Returns:
+        PatternHits ordered by chart
+    """
+    lons = np.asarray(lons, dtype=np.float64)
+    signs = np.asarray(signs)
+
+    parts = []
+    for start in range(0, lons.shape[0], chunk_size):
+        hits = _detect_chunk(lons[start:start + chunk_size], signs[start:start + chunk_size], aspects)
+        parts.append(hits._replace(chart=hits.chart + start))
+
+    if not parts:
+        empty = np.empty(0, dtype=np.intp)
+        return PatternHits(empty, empty, np.empty(0, dtype=np.int64), empty)
+
+    return PatternHits(*(np.concatenate(column) for column in zip(*parts)))
+
+
+def _detect_chunk(
+    lons: np.ndarray,
+    signs: np.ndarray,
+    aspects: Sequence[Tuple[str, float, float]]
+) -> PatternHits:
+    """Pattern search for one block of charts"""
+    names = [name for name, _, _ in aspects]
+    table = list(aspects) + ([QUINCUNX] if QUINCUNX[0] not in names else [])
+    names = [name for name, _, _ in table]
+
+    masks = aspect_bitmasks(lons, table)
+    trine, square, opposition, sextile, quincunx = (
+        masks[:, names.index(name)]
+        for name in ("trine", "square", "opposition", "sextile", "quincunx")
+    )
+
+    charts, planets = lons.shape
+    one = np.int64(1)
+    parts: List[Tuple[np.ndarray, int, np.ndarray, np.ndarray]] = []
+
+    def collect(kind: int, found: np.ndarray, base: np.ndarray, apex_bits: bool) -> None:
+        """Record one hit per set bit of `found` (per chart)"""
+        if not found.any():
+            return
+        for k in range(planets):
+            hit = np.nonzero((found >> k) & one)[0]
+            if len(hit):
+                apex = np.full(len(hit), k if apex_bits else -1)
+                parts.append((hit, kind, base[hit] | (one << k), apex))
+
+    for i in range(planets):
+        for j in range(i + 1, planets):
+            pair = (one << i) | (one << j)
+            base = np.full(charts, pair, dtype=np.int64)
+            later = ~((one << (j + 1)) - 1)
+
+            # Grand trine: i-j, i-k, j-k trines (k > j so each is found once)
+            linked = ((trine[:, i] >> j) & one).astype(bool)
+            collect(0, np.where(linked, trine[:, i] & trine[:, j] & later, 0), base, False)
+
+            # T-square: i-j opposition, apex k square to both
+            linked = ((opposition[:, i] >> j) & one).astype(bool)
+            collect(1, np.where(linked, square[:, i] & square[:, j], 0), base, True)
+
+            # Yod: i-j sextile, apex k quincunx to both
+            linked = ((sextile[:, i] >> j) & one).astype(bool)
+            collect(2, np.where(linked, quincunx[:, i] & quincunx[:, j], 0), base, True)
+
+    # Stellium: STELLIUM_MIN_PLANETS or more planets in one sign
+    bits = np.left_shift(one, np.arange(planets, dtype=np.int64))
+    in_sign = signs[:, :, np.newaxis] == np.arange(12)
+    counts = in_sign.sum(axis=1)
+    members = (in_sign * bits[:, np.newaxis]).sum(axis=1, dtype=np.int64)
+    chart, sign = np.nonzero(counts >= STELLIUM_MIN_PLANETS)
+    if len(chart):
+        parts.append((chart, 3, members[chart, sign], np.full(len(chart), -1)))
+
+    if not parts:
+        empty = np.empty(0, dtype=np.intp)
+        return PatternHits(empty, empty, np.empty(0, dtype=np.int64), empty)
+
+    chart = np.concatenate([part[0] for part in parts])
+    kind = np.concatenate([np.full(len(part[0]), part[1]) for part in parts])
+    members = np.concatenate([part[2] for part in parts])
+    apex = np.concatenate([part[3] for part in parts])
+
+    order = np.lexsort((apex, members, kind, chart))
+    return PatternHits(chart[order], kind[order], members[order], apex[order])
+
+
+def patterns_to_payload(
+    hits: PatternHits,
+    planet_names: Sequence[str],
+    chart: int = 0
+) -> List[Dict[str, Optional[object]]]:
+    """
+    Convert one chart's hits to payload dicts.
+
+    Returns:
+        List of {"type", "planets", "apex"}
+    """
+    selected = np.nonzero(hits.chart == chart)[0]
+    return [
+        {
+            "type": PATTERN_TYPES[kind],
+            "planets": [name for bit, name in enumerate(planet_names) if (members >> bit) & 1],
+            "apex": planet_names[apex] if apex >= 0 else None
+        }
+        for kind, members, apex in zip(
+            hits.kind[selected].tolist(), hits.members[selected].tolist(), hits.apex[selected].tolist()
+        )
+    ]
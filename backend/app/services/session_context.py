@@ -0,0 +1,107 @@
+"""Per voice session context for the get_context tool callback"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Any, Dict, Mapping, Optional
+import time
+from app.config import settings
+
+DEFAULT_DISPLAY_NAME = "Sternenwanderer"
+
+
+@dataclass
+class SessionContext:
+    """
+    What the agent's tool calls need from the database, loaded once.
+
+    Filled by create_voice_session (which reads all of it anyway), so a
+    tool call for a cached session does not read voice_sessions,
+    profiles or natal_charts.
+    """
+    user_id: str
+    display_name: str
+    locale: str
+    natal_chart: Optional[Mapping[str, Any]]  # latest natal chart payload, None if the user has none
+    conversation_id: Optional[str] = None  # set on the first tool call
+    has_profile: bool = True  # False: no profiles row, the profile is left out of tool results
+
+    def profile(self) -> Dict[str, str]:
+        """Projected profile for the agent (data minimization)"""
+        return {"display_name": self.display_name, "locale": self.locale}
+
+
+class SessionContextCache:
+    """
+    LRU of SessionContext per voice session id.
+
+    Entries expire with the session's signed URL (no conversation can
+    start after that) and are invalidated by the post-call webhook. Only
+    active sessions are cached: a session ended through another worker
+    stays cached here until its signed URL expires at the latest.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple[float, SessionContext]]" = OrderedDict()
+        self._lock = Lock()
+
+    def put(self, session_id: str, context: SessionContext, expires_at: datetime) -> None:
+        """
+        Cache a session's context until `expires_at` (naive times are UTC).
+        """
+        if expires_at.tzinfo is None:
+            expires_at = expires_at.replace(tzinfo=timezone.utc)
+        ttl = (expires_at - datetime.now(timezone.utc)).total_seconds()
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            self._entries[session_id] = (time.monotonic() + ttl, context)
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, session_id: str) -> Optional[SessionContext]:
+        """Get a session's context, or None if not cached or expired"""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(session_id)
+                self.hits += 1
+                return entry[1]
+
+            if entry is not None:
+                del self._entries[session_id]
+            self.misses += 1
+            return None
+
+    def invalidate(self, session_id: str) -> None:
+        """Drop a session's context (conversation ended)"""
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+# Process-wide cache shared by the voice and ElevenLabs routers
+session_context_cache = SessionContextCache(max_entries=settings.session_context_cache_size)
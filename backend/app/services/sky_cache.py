@@ -0,0 +1,191 @@
+"""Shared "current sky" cache for transit calculations"""
+
+from collections import OrderedDict
+from datetime import datetime, timezone
+from threading import Lock, Thread
+from typing import Dict, List, NamedTuple, Optional, Tuple
+import swisseph as swe
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SkyPositions(NamedTuple):
+    """Transiting planet positions for one time bucket"""
+    bucket: int
+    computed_at: datetime
+    jd: float
+    longitudes: Dict[str, float]
+    speeds: Dict[str, float]
+
+
+class SkyCache:
+    """
+    Process-wide cache of transiting planet positions.
+
+    Positions are identical for every user at a given moment, so they are
+    computed once per time bucket (e.g. one minute) and shared. While the
+    current bucket is served, the next one is precomputed on a background
+    thread, so bucket rollovers don't stall a request. Explicit past or
+    future moments are computed on demand only.
+
+    The lock only guards the entries; positions are never computed while
+    holding it, so hits are not blocked behind a computation.
+    """
+
+    def __init__(
+        self,
+        planets: List[Tuple[int, str]],
+        bucket_seconds: int = 60,
+        max_entries: int = 128
+    ):
+        if bucket_seconds <= 0:
+            raise ValueError("bucket_seconds must be positive")
+
+        self.planets = planets
+        self.bucket_seconds = bucket_seconds
+        self.max_entries = max(max_entries, 2)
+        self.hits = 0
+        self.misses = 0
+        self.precomputed = 0
+
+        self._entries: "OrderedDict[int, SkyPositions]" = OrderedDict()
+        self._lock = Lock()
+        self._precomputing: Optional[Thread] = None
+
+    def bucket_for(self, moment: datetime) -> int:
+        """Get the bucket index for a moment (naive datetimes are UTC)"""
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=timezone.utc)
+        return int(moment.timestamp() // self.bucket_seconds)
+
+    def bucket_start(self, bucket: int) -> datetime:
+        """Get the UTC start time of a bucket"""
+        return datetime.fromtimestamp(bucket * self.bucket_seconds, tz=timezone.utc)
+
+    def bucket_jd(self, bucket: int) -> float:
+        """Get the Julian day (UT) of a bucket's start"""
+        start = self.bucket_start(bucket)
+        return swe.julday(
+            start.year,
+            start.month,
+            start.day,
+            start.hour + start.minute / 60.0 + start.second / 3600.0
+        )
+
+    def get(self, moment: Optional[datetime] = None) -> SkyPositions:
+        """
+        Get transiting positions for the bucket containing `moment`.
+
+        Args:
+            moment: Point in time (defaults to now)
+
+        Returns:
+            SkyPositions computed at the start of the bucket
+        """
+        current = self.bucket_for(datetime.now(timezone.utc))
+        bucket = current if moment is None else self.bucket_for(moment)
+
+        with self._lock:
+            positions = self._entries.get(bucket)
+            if positions is not None:
+                self.hits += 1
+                self._entries.move_to_end(bucket)
+            else:
+                self.misses += 1
+
+        if positions is None:
+            # Concurrent misses may compute the same bucket; the results are identical
+            positions = self._compute(bucket)
+            with self._lock:
+                self._insert(positions)
+
+        # Precompute the next bucket so the rollover is a hit
+        if bucket == current:
+            self._precompute(bucket + 1)
+
+        return positions
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        """Wait for a running background precomputation to finish"""
+        thread = self._precomputing
+        if thread is not None:
+            thread.join(timeout)
+
+    def clear(self) -> None:
+        """Drop all cached buckets and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.precomputed = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Get cache statistics"""
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "precomputed": self.precomputed,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0
+        }
+
+    def _insert(self, positions: SkyPositions) -> None:
+        """Insert a bucket, evicting the oldest entries (call with the lock held)"""
+        self._entries[positions.bucket] = positions
+        self._entries.move_to_end(positions.bucket)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _precompute(self, bucket: int) -> None:
+        """Compute a bucket on a background thread unless cached or already running"""
+        with self._lock:
+            running = self._precomputing is not None and self._precomputing.is_alive()
+            if bucket in self._entries or running:
+                return
+
+            self._precomputing = Thread(
+                target=self._precompute_bucket,
+                args=(bucket,),
+                name="sky-cache-precompute",
+                daemon=True
+            )
+            self._precomputing.start()
+
+    def _precompute_bucket(self, bucket: int) -> None:
+        """Background thread body of _precompute"""
+        try:
+            positions = self._compute(bucket)
+        except Exception as e:
+            logger.warning(f"Sky positions for bucket {bucket} not precomputed: {e}")
+            return
+
+        with self._lock:
+            if bucket not in self._entries:
+                self._insert(positions)
+                self.precomputed += 1
+
+    def _compute(self, bucket: int) -> SkyPositions:
+        """Compute transiting positions at the start of a bucket"""
+        computed_at = self.bucket_start(bucket)
+        jd = self.bucket_jd(bucket)
+
+        longitudes = {}
+        speeds = {}
+        for planet_id, planet_name in self.planets:
+            result, _ = swe.calc_ut(jd, planet_id)
+            longitudes[planet_name] = result[0]
+            speeds[planet_name] = result[3]
+
+        logger.debug(f"Sky positions computed for bucket starting {computed_at}")
+
+        return SkyPositions(
+            bucket=bucket,
+            computed_at=computed_at,
+            jd=jd,
+            longitudes=longitudes,
+            speeds=speeds
+        )
+
@@ -0,0 +1,119 @@
+"""Vectorized synastry (chart-to-chart compatibility) scoring"""
+
+from typing import Dict, Optional, Sequence, Tuple
+import numpy as np
+
+# Score contribution of an exact aspect between two charts; harmonious
+# aspects add, hard aspects subtract. Scaled down linearly to 0 at the orb.
+ASPECT_WEIGHTS = {
+    "conjunction": 1.0,
+    "sextile": 0.8,
+    "square": -0.6,
+    "trine": 1.0,
+    "opposition": -0.4,
+}
+
+
+class SynastryKernel:
+    """
+    Cross-chart aspect scoring over stacked natal longitudes.
+
+    A pair score is the sum over every (planet of A, planet of B, aspect)
+    of weight * (1 - deviation / orb) for aspects within orb. Since the
+    separation is symmetric, so is the score matrix.
+
+    Candidates are processed in tiles, so the (tile, P, tile, P) working
+    set stays bounded regardless of the pool size.
+    """
+
+    def __init__(
+        self,
+        aspects: Sequence[Tuple[str, float, float]],
+        weights: Optional[Dict[str, float]] = None
+    ):
+        """
+        Args:
+            aspects: Aspect table as (name, angle, orb) tuples
+            weights: Score per aspect name (defaults to ASPECT_WEIGHTS)
+        """
+        weights = weights or ASPECT_WEIGHTS
+        self.names = [name for name, _, _ in aspects]
+        self.angles = np.array([angle for _, angle, _ in aspects], dtype=np.float64)
+        self.orbs = np.array([orb for _, _, orb in aspects], dtype=np.float64)
+        self.weights = np.array([weights.get(name, 0.0) for name in self.names], dtype=np.float64)
+
+    def score(self, chart_lons: np.ndarray, candidate_lons: np.ndarray, tile_size: int = 1024) -> np.ndarray:
+        """
+        Score one chart against N candidates.
+
+        Args:
+            chart_lons: Longitudes of one chart, shape (P,)
+            candidate_lons: Stacked candidate longitudes, shape (N, P).
+                NaN marks a missing planet and never scores.
+            tile_size: Candidates per block
+
+        Returns:
+            Scores, shape (N,)
+        """
+        chart_lons = np.asarray(chart_lons, dtype=np.float64)[np.newaxis, :]
+        candidate_lons = np.asarray(candidate_lons, dtype=np.float64)
+
+        scores = np.empty(candidate_lons.shape[0], dtype=np.float64)
+        for start in range(0, candidate_lons.shape[0], tile_size):
+            block = candidate_lons[start:start + tile_size]
+            scores[start:start + len(block)] = self._block(chart_lons, block)[0]
+        return scores
+
+    def matrix(self, lons: np.ndarray, tile_size: int = 128) -> np.ndarray:
+        """
+        Score every pair in a cohort.
+
+        Only upper-triangle tiles are computed; the lower triangle is
+        mirrored. The diagonal (a chart against itself) is set to NaN.
+
+        Args:
+            lons: Stacked longitudes, shape (N, P)
+            tile_size: Charts per tile side
+
+        Returns:
+            Symmetric score matrix, shape (N, N), float32
+        """
+        lons = np.asarray(lons, dtype=np.float64)
+        n = lons.shape[0]
+        result = np.empty((n, n), dtype=np.float32)
+
+        for row in range(0, n, tile_size):
+            a = lons[row:row + tile_size]
+            for column in range(row, n, tile_size):
+                b = lons[column:column + tile_size]
+                block = self._block(a, b)
+                result[row:row + len(a), column:column + len(b)] = block
+                result[column:column + len(b), row:row + len(a)] = block.T
+
+        np.fill_diagonal(result, np.nan)
+        return result
+
+    def _block(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """Scores for an (A, P) by (B, Q) block of charts, shape (A, B)"""
+        a = a.astype(np.float32)
+        b = b.astype(np.float32)
+
+        # (A, B, P, Q) smallest angular separation; float32 halves memory
+        # traffic and the planet axes stay contiguous for the reduction
+        separation = np.abs(a[:, np.newaxis, :, np.newaxis] - b[np.newaxis, :, np.newaxis, :])
+        separation = np.minimum(separation, 360 - separation)
+
+        pair_scores = np.zeros_like(separation)
+        closeness = np.empty_like(separation)
+        for angle, orb, weight in zip(self.angles, self.orbs, self.weights):
+            # weight * max(0, 1 - |separation - angle| / orb), in place;
+            # fmax turns NaN (missing planet) into 0
+            np.subtract(separation, np.float32(angle), out=closeness)
+            np.abs(closeness, out=closeness)
+            closeness *= np.float32(-1 / orb)
+            closeness += 1
+            np.fmax(closeness, 0, out=closeness)
+            closeness *= np.float32(weight)
+            pair_scores += closeness
+
+        return pair_scores.sum(axis=(2, 3), dtype=np.float64)
@@ -0,0 +1,171 @@
+"""Incremental transit state per voice conversation"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional
+import time
+import numpy as np
+from app.models.astro import Aspect
+from app.services.aspects import natal_longitudes
+
+# Planet speeds barely change within a conversation; the margin covers
+# acceleration (and the moon's daily speed swing) between evaluations
+SPEED_SAFETY = 1.25
+
+
+class TransitPlanetUpdate(NamedTuple):
+    """Fresh evaluation of some transiting planets (see TransitSession.apply)"""
+    jd: float
+    aspects: List[List[Aspect]]  # Per planet, in the order requested
+    margins: np.ndarray
+    speeds: np.ndarray
+
+
+class TransitSession:
+    """
+    Transits of one conversation, kept between tool calls.
+
+    Holds the natal chart (fetched once per conversation) and, per
+    transiting planet, the position, speed and distance to the nearest
+    orb boundary at its last evaluation. A planet is only re-checked once
+    it could have moved that far (|speed| x elapsed time); until then its
+    aspects are returned from memory, with orbs as of that evaluation.
+    """
+
+    def __init__(self, natal_chart: Mapping[str, Any], planets: List[str]):
+        """
+        Args:
+            natal_chart: Natal chart payload
+            planets: Transiting planet names (AstroService.PLANETS order)
+        """
+        self.natal_chart = natal_chart
+        self.natal_names, self.natal_lons = natal_longitudes(natal_chart)
+        self.planets = planets
+
+        count = len(planets)
+        self.jds = np.full(count, np.nan)        # Julian day of the last check
+        self.speeds = np.zeros(count)            # Degrees/day at the last check
+        self.margins = np.zeros(count)           # Degrees to the nearest orb boundary
+        self.aspects: List[List[Aspect]] = [[] for _ in range(count)]
+        self.exact_dates_resolved = False
+
+        self.last_used = time.monotonic()
+        self.lock = Lock()
+
+    def stale(self, jd: float, max_age_days: float) -> np.ndarray:
+        """
+        Planets that must be re-checked at `jd`.
+
+        True where the planet was never evaluated, its evaluation is older
+        than `max_age_days`, or it may have crossed an orb boundary since.
+        """
+        elapsed = np.abs(jd - self.jds)
+        with np.errstate(invalid="ignore"):
+            moved = np.abs(self.speeds) * SPEED_SAFETY * elapsed
+            return np.isnan(self.jds) | (elapsed > max_age_days) | (moved >= self.margins)
+
+    def stale_rows(self, jd: float, max_age_days: float, resolve_exact_dates: bool = False) -> List[int]:
+        """
+        Indices of the planets to re-check at `jd` (see stale).
+
+        All of them the first time exact dates are requested.
+        """
+        if resolve_exact_dates and not self.exact_dates_resolved:
+            return list(range(len(self.planets)))
+        return np.nonzero(self.stale(jd, max_age_days))[0].tolist()
+
+    def apply(self, rows: List[int], update: TransitPlanetUpdate, resolve_exact_dates: bool = False) -> None:
+        """Store the evaluation of the planets at `rows`"""
+        for row, planet_aspects in zip(rows, update.aspects):
+            self.aspects[row] = planet_aspects
+
+        self.margins[rows] = update.margins
+        self.speeds[rows] = update.speeds
+        self.jds[rows] = update.jd
+        if len(rows) == len(self.planets):
+            self.exact_dates_resolved = resolve_exact_dates
+        elif not resolve_exact_dates:
+            self.exact_dates_resolved = False
+
+    def current_aspects(self) -> List[Aspect]:
+        """All aspects in transit planet order (same order as a full calculation)"""
+        return [aspect for planet_aspects in self.aspects for aspect in planet_aspects]
+
+
+class TransitSessionStore:
+    """
+    LRU of TransitSession per voice session, with idle expiry.
+
+    Sessions are dropped by the post-call webhook; the TTL only cleans up
+    conversations that never reported their end.
+    """
+
+    def __init__(self, max_sessions: int = 1024, ttl_seconds: float = 3600):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+
+        # Evaluations by how many planets were re-checked
+        self.unchanged = 0
+        self.partial = 0
+        self.full = 0
+
+        self._sessions: "OrderedDict[str, TransitSession]" = OrderedDict()
+        self._lock = Lock()
+
+    def get_or_create(
+        self,
+        session_id: str,
+        load_natal_chart: Callable[[], Optional[Mapping[str, Any]]],
+        planets: List[str]
+    ) -> Optional[TransitSession]:
+        """
+        Get the state of a session, loading the natal chart on first use.
+
+        Returns:
+            TransitSession, or None if the user has no natal chart
+        """
+        now = time.monotonic()
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None and now - session.last_used <= self.ttl_seconds:
+                session.last_used = now
+                self._sessions.move_to_end(session_id)
+                return session
+
+        natal_chart = load_natal_chart()
+        if not natal_chart:
+            return None
+
+        session = TransitSession(natal_chart, planets)
+        with self._lock:
+            self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    def record(self, rechecked: int, planets: int) -> None:
+        """Count one evaluation"""
+        with self._lock:
+            if rechecked == 0:
+                self.unchanged += 1
+            elif rechecked == planets:
+                self.full += 1
+            else:
+                self.partial += 1
+
+    def discard(self, session_id: str) -> None:
+        """Drop a session's state (conversation ended)"""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get store statistics"""
+        evaluations = self.unchanged + self.partial + self.full
+        return {
+            "sessions": len(self._sessions),
+            "unchanged": self.unchanged,
+            "partial": self.partial,
+            "full": self.full,
+            "unchanged_rate": round(self.unchanged / evaluations, 4) if evaluations else 0.0
+        }
@@ -0,0 +1,62 @@
+"""
+Benchmark: per-chart cost of the vectorized aspect kernel.
+
+Usage:
+    python -m benchmarks.aspect_kernel
+"""
+
+from time import perf_counter
+import numpy as np
+from app.services.astro import AstroService
+
+
+def legacy_match(transit_lons, natal_lons):
+    """Original triple loop (one chart)"""
+    hits = 0
+    for transit_lon in transit_lons:
+        for natal_lon in natal_lons:
+            for _, aspect_angle, orb in AstroService.ASPECTS:
+                diff = abs(transit_lon - natal_lon)
+                if diff > 180:
+                    diff = 360 - diff
+                if abs(diff - aspect_angle) <= orb:
+                    hits += 1
+    return hits
+
+
+def time_per_chart(func, charts: int, repeat: int) -> float:
+    """Best-of-N wall time divided by chart count (microseconds)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        best = min(best, perf_counter() - start)
+    return best / charts * 1e6
+
+
+def main():
+    rng = np.random.default_rng(0)
+    kernel = AstroService.aspect_kernel
+    transit_lons = rng.uniform(0, 360, len(AstroService.PLANETS))
+
+    print(f"{'charts':>8} {'legacy us/chart':>16} {'kernel us/chart':>16}")
+    for charts in (1, 100, 100_000):
+        natal_lons = rng.uniform(0, 360, (charts, len(AstroService.PLANETS)))
+        repeat = 3 if charts > 1000 else 20
+
+        legacy_sample = natal_lons[:min(charts, 1000)]
+        legacy = time_per_chart(
+            lambda: [legacy_match(transit_lons.tolist(), row) for row in legacy_sample.tolist()],
+            len(legacy_sample),
+            repeat
+        )
+        vectorized = time_per_chart(
+            lambda: kernel.match(transit_lons, natal_lons),
+            charts,
+            repeat
+        )
+        print(f"{charts:>8} {legacy:>16.2f} {vectorized:>16.2f}")
+
+
+if __name__ == "__main__":
+    main()
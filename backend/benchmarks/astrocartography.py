@@ -0,0 +1,38 @@
+"""
+Benchmark: uncached astrocartography latency against the interactive target.
+
+Usage:
+    python -m benchmarks.astrocartography
+"""
+
+from datetime import datetime, timezone
+from time import perf_counter
+from app.config import settings
+from app.services.astro import AstroService
+
+BIRTH = datetime(1990, 6, 15, 14, 30, tzinfo=timezone.utc)
+
+
+def time_ms(func, repeat: int) -> float:
+    """Best-of-N wall time (milliseconds)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        best = min(best, perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    service = AstroService()
+    service.calculate_astrocartography(BIRTH)
+
+    print(f"target {settings.astrocartography_target_ms:.0f} ms")
+    print(f"{'lat step':>8} {'best ms':>10}")
+    for lat_step in (1.0, 0.5, 0.25):
+        elapsed = time_ms(lambda: service.calculate_astrocartography(BIRTH, lat_step=lat_step), 20)
+        print(f"{lat_step:>8} {elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
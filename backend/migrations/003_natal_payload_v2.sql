@@ -0,0 +1,35 @@
+-- Natal Chart Payload Format v2
+-- Run this after 002_voice_chat_schema.sql in Supabase SQL Editor
+--
+-- Adds a compact binary copy of natal_charts.payload (see
+-- app/services/chart_codec.py). The JSON payload stays authoritative;
+-- payload_v2 is filled by `python -m app.jobs.backfill_payload_v2` and
+-- read by the backend when present.
+
+ALTER TABLE natal_charts ADD COLUMN IF NOT EXISTS payload_v2 BYTEA;
+ALTER TABLE natal_charts ADD COLUMN IF NOT EXISTS payload_format SMALLINT DEFAULT 1 NOT NULL
+  CHECK (payload_format IN (1, 2));
+
+-- Backfill scans rows without a v2 payload in id order
+CREATE INDEX IF NOT EXISTS idx_natal_charts_payload_v2_pending
+  ON natal_charts(id) WHERE payload_v2 IS NULL;
+
+-- Function: Drop the binary copy when the JSON payload changes
+-- (other apps write natal_charts.payload only), so it is re-encoded
+-- by the next backfill run instead of going stale
+CREATE OR REPLACE FUNCTION invalidate_natal_payload_v2()
+RETURNS TRIGGER AS $$
+BEGIN
+  IF NEW.payload IS DISTINCT FROM OLD.payload
+     AND NEW.payload_v2 IS NOT DISTINCT FROM OLD.payload_v2 THEN
+    NEW.payload_v2 = NULL;
+    NEW.payload_format = 1;
+  END IF;
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS invalidate_natal_charts_payload_v2 ON natal_charts;
+CREATE TRIGGER invalidate_natal_charts_payload_v2
+  BEFORE UPDATE ON natal_charts
+  FOR EACH ROW EXECUTE FUNCTION invalidate_natal_payload_v2();
@@ -0,0 +1,40 @@
+-- Daily Transit Digests
+-- Run this after 003_natal_payload_v2.sql in Supabase SQL Editor
+--
+-- Filled nightly by `python -m app.jobs.daily_digest`: one compact row
+-- per user and day with the day's tightest transit aspects.
+
+CREATE TABLE IF NOT EXISTS daily_transit_digests (
+  user_id UUID REFERENCES profiles(id) ON DELETE CASCADE NOT NULL,
+  digest_date DATE NOT NULL,
+  natal_chart_id UUID REFERENCES natal_charts(id) ON DELETE CASCADE NOT NULL,
+  engine_version TEXT NOT NULL,
+  aspects JSONB NOT NULL,  -- [[transit_planet, type, natal_planet, orb], ...] tightest first
+  computed_at TIMESTAMPTZ DEFAULT now() NOT NULL,
+  PRIMARY KEY (user_id, digest_date)
+);
+
+-- Checkpoints of resumable batch jobs (one row per job and run)
+CREATE TABLE IF NOT EXISTS batch_job_checkpoints (
+  job TEXT NOT NULL,
+  run_key TEXT NOT NULL,  -- e.g. the digest date
+  cursor TEXT,            -- last key processed (keyset pagination)
+  processed INTEGER DEFAULT 0 NOT NULL,
+  finished_at TIMESTAMPTZ,
+  updated_at TIMESTAMPTZ DEFAULT now() NOT NULL,
+  PRIMARY KEY (job, run_key)
+);
+
+-- The digest job walks users in order, latest chart first
+CREATE INDEX IF NOT EXISTS idx_natal_charts_user_id_computed_at
+  ON natal_charts(user_id, computed_at DESC);
+
+-- Row Level Security
+ALTER TABLE daily_transit_digests ENABLE ROW LEVEL SECURITY;
+ALTER TABLE batch_job_checkpoints ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view own digests" ON daily_transit_digests;
+CREATE POLICY "Users can view own digests" ON daily_transit_digests
+  FOR SELECT USING (auth.uid() = user_id);
+
+-- batch_job_checkpoints has no policies: service role only
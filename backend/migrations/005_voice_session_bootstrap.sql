@@ -0,0 +1,107 @@
+-- Voice Session Bootstrap
+-- Run this after 004_daily_transit_digests.sql in Supabase SQL Editor
+--
+-- Starts a voice session in one round trip: consent, entitlement and
+-- natal chart checks, profile lookup, session insert and audit entry.
+-- Called by the backend (`POST /v1/voice/session`) through the direct
+-- Postgres connection, or via RPC with VOICE_SESSION_BOOTSTRAP_RPC=true.
+--
+-- Returns JSONB:
+--   {"error": "<code>"} when a check fails (nothing is written), where
+--   code is consent_required, consent_outdated, no_entitlements,
+--   premium_required, minutes_exhausted or no_natal_chart
+--   {"error": null, "entitlements": {...}, "natal_chart": {...},
+--    "display_name": ..., "locale": ...} when the session was created
+
+CREATE OR REPLACE FUNCTION bootstrap_voice_session(
+  p_session_id TEXT,
+  p_user_id UUID,
+  p_voice_mode TEXT,
+  p_consent_version TEXT,
+  p_ip_address TEXT DEFAULT NULL,
+  p_user_agent TEXT DEFAULT NULL
+)
+RETURNS JSONB AS $$
+DECLARE
+  v_consent_version TEXT;
+  v_entitlements entitlements%ROWTYPE;
+  v_payload JSONB;
+  v_display_name TEXT;
+  v_locale TEXT;
+BEGIN
+  -- 1. Consent (active and current version)
+  SELECT consent_version INTO v_consent_version
+    FROM voice_consents
+   WHERE user_id = p_user_id AND withdrawn_at IS NULL;
+
+  IF NOT FOUND THEN
+    RETURN jsonb_build_object('error', 'consent_required');
+  END IF;
+  IF v_consent_version IS DISTINCT FROM p_consent_version THEN
+    RETURN jsonb_build_object('error', 'consent_outdated');
+  END IF;
+
+  -- 2. Plan and remaining minutes
+  SELECT * INTO v_entitlements
+    FROM entitlements
+   WHERE user_id = p_user_id;
+
+  IF NOT FOUND THEN
+    RETURN jsonb_build_object('error', 'no_entitlements');
+  END IF;
+  IF v_entitlements.plan <> 'premium' THEN
+    RETURN jsonb_build_object('error', 'premium_required');
+  END IF;
+  IF v_entitlements.voice_minutes_monthly - v_entitlements.voice_minutes_used <= 0 THEN
+    RETURN jsonb_build_object('error', 'minutes_exhausted');
+  END IF;
+
+  -- 3. Latest natal chart
+  SELECT payload INTO v_payload
+    FROM natal_charts
+   WHERE user_id = p_user_id
+   ORDER BY computed_at DESC
+   LIMIT 1;
+
+  IF NOT FOUND THEN
+    RETURN jsonb_build_object('error', 'no_natal_chart');
+  END IF;
+
+  -- 4. Profile (optional)
+  SELECT display_name, locale INTO v_display_name, v_locale
+    FROM profiles
+   WHERE id = p_user_id;
+
+  -- 5. Session and audit entry (elevenlabs_session_id is set once
+  -- ElevenLabs has created the conversation)
+  INSERT INTO voice_sessions (id, user_id, status, voice_mode)
+  VALUES (p_session_id, p_user_id, 'active', p_voice_mode);
+
+  INSERT INTO voice_audit_logs (user_id, session_id, event_type, data_accessed, ip_address, user_agent)
+  VALUES (
+    p_user_id,
+    p_session_id,
+    'session_created',
+    jsonb_build_object('voice_mode', p_voice_mode),
+    p_ip_address::inet,
+    p_user_agent
+  );
+
+  RETURN jsonb_build_object(
+    'error', NULL,
+    'entitlements', jsonb_build_object(
+      'plan', v_entitlements.plan,
+      'voice_minutes_monthly', v_entitlements.voice_minutes_monthly,
+      'voice_minutes_used', v_entitlements.voice_minutes_used
+    ),
+    'natal_chart', v_payload,
+    'display_name', v_display_name,
+    'locale', v_locale
+  );
+END;
+$$ LANGUAGE plpgsql;
+
+-- Takes the user id as a parameter: backend (service role) only
+REVOKE ALL ON FUNCTION bootstrap_voice_session(TEXT, UUID, TEXT, TEXT, TEXT, TEXT) FROM PUBLIC;
+REVOKE ALL ON FUNCTION bootstrap_voice_session(TEXT, UUID, TEXT, TEXT, TEXT, TEXT) FROM anon, authenticated;
+GRANT EXECUTE ON FUNCTION bootstrap_voice_session(TEXT, UUID, TEXT, TEXT, TEXT, TEXT) TO service_role;
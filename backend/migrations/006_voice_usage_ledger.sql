@@ -0,0 +1,74 @@
+-- Voice Usage Ledger
+-- Run this after 005_voice_session_bootstrap.sql in Supabase SQL Editor
+--
+-- Append-only ledger of the minutes used per ended voice session.
+-- entitlements.voice_minutes_used stays the maintained aggregate that
+-- `GET /v1/voice/usage` reads. record_voice_usage() is called once by
+-- the post-call webhook. In one statement it books the minutes,
+-- increments the aggregate in place and completes the session.
+
+CREATE TABLE IF NOT EXISTS voice_usage_events (
+  id BIGSERIAL PRIMARY KEY,
+  user_id UUID REFERENCES profiles(id) ON DELETE CASCADE NOT NULL,
+  session_id TEXT NOT NULL UNIQUE,  -- one event per session: repeated webhooks are no-ops
+  conversation_id TEXT,
+  duration_seconds INTEGER NOT NULL,
+  minutes INTEGER NOT NULL CHECK (minutes >= 0),
+  created_at TIMESTAMPTZ DEFAULT now() NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_voice_usage_events_user_id_created_at
+  ON voice_usage_events(user_id, created_at DESC);
+
+-- Row Level Security
+ALTER TABLE voice_usage_events ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view own usage events" ON voice_usage_events;
+CREATE POLICY "Users can view own usage events" ON voice_usage_events
+  FOR SELECT USING (auth.uid() = user_id);
+
+-- Returns TRUE when the usage was booked, FALSE when the session's usage
+-- had already been recorded (nothing is changed then).
+--
+-- The increment is relative (voice_minutes_used + n), so concurrent
+-- session endings never lose minutes; each holds the user's entitlements
+-- row lock only for the rest of this one statement's transaction.
+CREATE OR REPLACE FUNCTION record_voice_usage(
+  p_session_id TEXT,
+  p_user_id UUID,
+  p_conversation_id TEXT,
+  p_duration_seconds INTEGER,
+  p_minutes INTEGER,
+  p_ended_at TIMESTAMPTZ
+)
+RETURNS BOOLEAN AS $$
+BEGIN
+  INSERT INTO voice_usage_events (user_id, session_id, conversation_id, duration_seconds, minutes)
+  VALUES (p_user_id, p_session_id, p_conversation_id, p_duration_seconds, p_minutes)
+  ON CONFLICT (session_id) DO NOTHING;
+
+  IF NOT FOUND THEN
+    RETURN FALSE;
+  END IF;
+
+  UPDATE entitlements
+     SET voice_minutes_used = voice_minutes_used + p_minutes,
+         updated_at = now()
+   WHERE user_id = p_user_id;
+
+  UPDATE voice_sessions
+     SET status = 'completed',
+         ended_at = p_ended_at,
+         duration_seconds = p_duration_seconds,
+         elevenlabs_conversation_id = p_conversation_id,
+         updated_at = now()
+   WHERE id = p_session_id;
+
+  RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Takes the user id as a parameter: backend (service role) only
+REVOKE ALL ON FUNCTION record_voice_usage(TEXT, UUID, TEXT, INTEGER, INTEGER, TIMESTAMPTZ) FROM PUBLIC;
+REVOKE ALL ON FUNCTION record_voice_usage(TEXT, UUID, TEXT, INTEGER, INTEGER, TIMESTAMPTZ) FROM anon, authenticated;
+GRANT EXECUTE ON FUNCTION record_voice_usage(TEXT, UUID, TEXT, INTEGER, INTEGER, TIMESTAMPTZ) TO service_role;
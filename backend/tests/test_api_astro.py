@@ -0,0 +1,105 @@
+"""Tests for Astro API endpoints"""
+
+from datetime import datetime, timezone
+from unittest.mock import Mock
+from app.services.astro import AstroService, exact_time_solver
+
+NATAL_PARAMS = {"birth_utc": "1990-06-15T14:30:00Z", "lat": 52.52, "lon": 13.40}
+
+
+def test_natal_chart(client):
+    """Natal chart with strong ETag and private cache headers"""
+    response = client.get("/v1/astro/natal", params=NATAL_PARAMS)
+
+    assert response.status_code == 200
+    data = response.json()
+    assert set(data["planets"]) >= {"sun", "moon"}
+    assert len(data["houses"]) == 12
+    assert data["engine_version"].startswith("swisseph-")
+
+    etag = response.headers["etag"]
+    assert etag.startswith('"') and not etag.startswith("W/")
+    assert response.headers["cache-control"] == "private, max-age=86400"
+
+    # Same input, same ETag; different input, different ETag
+    assert client.get("/v1/astro/natal", params=NATAL_PARAMS).headers["etag"] == etag
+    other = client.get("/v1/astro/natal", params={**NATAL_PARAMS, "house_system": "koch"})
+    assert other.headers["etag"] != etag
+
+
+def test_natal_chart_not_modified(client):
+    """If-None-Match with the current ETag returns 304 without a body"""
+    etag = client.get("/v1/astro/natal", params=NATAL_PARAMS).headers["etag"]
+
+    response = client.get("/v1/astro/natal", params=NATAL_PARAMS, headers={"If-None-Match": f'"other", {etag}'})
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_natal_chart_unknown_house_system(client):
+    """Unknown house systems are rejected"""
+    response = client.get("/v1/astro/natal", params={**NATAL_PARAMS, "house_system": "foo"})
+
+    assert response.status_code == 422
+
+
+def test_transits(client, mock_supabase, sample_natal_chart):
+    """Transits are cached privately until the time bucket ends"""
+    mock_supabase.execute.return_value = Mock(data=[sample_natal_chart])
+
+    response = client.get("/v1/astro/transits")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert "aspects" in data
+    for aspect in data["aspects"]:
+        assert {"type", "transit_planet", "natal_planet", "orb", "exact_date"} <= set(aspect)
+
+    cache_control = response.headers["cache-control"]
+    assert cache_control.startswith("private, max-age=")
+    assert 0 <= int(cache_control.split("=")[1]) <= 60
+
+    revalidated = client.get("/v1/astro/transits", headers={"If-None-Match": response.headers["etag"]})
+    assert revalidated.status_code in (200, 304)  # 200 only if the bucket rolled over
+
+
+def test_transits_for_fixed_date(client, mock_supabase, sample_natal_chart):
+    """A fixed transit date gives a stable ETag within its bucket"""
+    mock_supabase.execute.return_value = Mock(data=[sample_natal_chart])
+
+    first = client.get("/v1/astro/transits", params={"transit_date": "2025-03-01T12:00:10Z"})
+    second = client.get("/v1/astro/transits", params={"transit_date": "2025-03-01T12:00:50Z"})
+
+    assert first.status_code == 200
+    assert first.json()["computed_at"].startswith("2025-03-01T12:00:00")
+    assert first.headers["etag"] == second.headers["etag"]
+    assert first.headers["cache-control"] == "private, max-age=86400"
+
+
+def test_fixed_date_transits_are_reproducible(client, mock_supabase):
+    """A date always yields the same body and ETag, whatever was solved before"""
+    natal_chart = AstroService().calculate_natal_chart(datetime(1990, 6, 15, 14, 30, tzinfo=timezone.utc), 52.52, 13.40)
+    mock_supabase.execute.return_value = Mock(data=[{"payload_v2": None, "payload": natal_chart}])
+    params = {"transit_date": "2020-01-20T00:00:00Z"}
+
+    exact_time_solver._entries.clear()
+    client.get("/v1/astro/transits", params={"transit_date": "2020-01-01T00:00:00Z"})
+    warm = client.get("/v1/astro/transits", params=params)
+
+    exact_time_solver._entries.clear()
+    fresh = client.get("/v1/astro/transits", params=params)
+
+    assert any(aspect["exact_date"] for aspect in fresh.json()["aspects"])
+    assert warm.json() == fresh.json()
+    assert warm.headers["etag"] == fresh.headers["etag"]
+
+
+def test_transits_no_natal_chart(client, mock_supabase):
+    """No natal chart yields 404"""
+    mock_supabase.execute.return_value = Mock(data=[])
+
+    response = client.get("/v1/astro/transits")
+
+    assert response.status_code == 404
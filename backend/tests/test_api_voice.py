@@ -138,6 +138,58 @@ def test_create_voice_session_quota_exceeded(client, mock_supabase, sample_voice
     assert response.status_code == 429
 
 
+def test_create_voice_session_elevenlabs_failure_marks_session_failed(client, mock_supabase, sample_voice_consent, sample_entitlements, sample_natal_chart):
+    """Test that a bootstrapped session is marked failed when ElevenLabs errors"""
+    def mock_execute():
+        call_args = str(mock_supabase.table.call_args)
+
+        if "voice_consents" in call_args:
+            return Mock(data=[sample_voice_consent])
+        elif "entitlements" in call_args:
+            return Mock(data=[sample_entitlements])
+        elif "natal_charts" in call_args:
+            return Mock(data=[sample_natal_chart])
+        return Mock(data=[])
+
+    mock_supabase.execute.side_effect = mock_execute
+
+    with patch("app.routers.voice.ElevenLabsService.create_session", side_effect=RuntimeError("upstream down")):
+        response = client.post(
+            "/v1/voice/session",
+            json={"voice_mode": "analytical"}
+        )
+
+    assert response.status_code == 500
+    mock_supabase.update.assert_called_once_with({"status": "failed", "error_message": "upstream down"})
+
+
+def test_create_voice_session_keeps_elevenlabs_error(client, mock_supabase, sample_voice_consent, sample_entitlements, sample_natal_chart, caplog):
+    """A failing status update doesn't replace the ElevenLabs error"""
+    def mock_execute():
+        call_args = str(mock_supabase.table.call_args)
+
+        if "voice_consents" in call_args:
+            return Mock(data=[sample_voice_consent])
+        elif "entitlements" in call_args:
+            return Mock(data=[sample_entitlements])
+        elif "natal_charts" in call_args:
+            return Mock(data=[sample_natal_chart])
+        return Mock(data=[])
+
+    mock_supabase.execute.side_effect = mock_execute
+    mock_supabase.update.side_effect = RuntimeError("database down")
+
+    with patch("app.routers.voice.ElevenLabsService.create_session", side_effect=RuntimeError("upstream down")):
+        response = client.post(
+            "/v1/voice/session",
+            json={"voice_mode": "analytical"}
+        )
+
+    assert response.status_code == 500
+    assert "Could not mark voice session" in caplog.text
+    assert "Error creating voice session: upstream down" in caplog.text
+
+
 def test_get_voice_usage_success(client, mock_supabase, sample_entitlements):
     """Test getting voice usage statistics"""
     # Setup mocks
@@ -0,0 +1,87 @@
+"""Tests for the vectorized aspect kernel"""
+
+import numpy as np
+from app.services.astro import AstroService, sky_cache
+from app.services.aspects import AspectKernel, stack_natal_longitudes
+from datetime import datetime, timezone, timedelta
+
+
+def reference_aspects(transiting_planets, natal_planets):
+    """Original triple-loop aspect search"""
+    service = AstroService()
+    found = []
+    for transit_name, transit_lon in transiting_planets.items():
+        for natal_name, natal_data in natal_planets.items():
+            natal_lon = natal_data["lon_absolute"]
+            for aspect_name, aspect_angle, orb in AstroService.ASPECTS:
+                angle_diff = service._calculate_angle_diff(transit_lon, natal_lon)
+                aspect_orb = abs(angle_diff - aspect_angle)
+                if aspect_orb <= orb:
+                    found.append((aspect_name, transit_name, natal_name, round(aspect_orb, 2)))
+    return found
+
+
+def test_calculate_transits_matches_reference():
+    """Vectorized transits equal the nested-loop result exactly"""
+    service = AstroService()
+    birth = datetime(1990, 6, 15, 14, 30, tzinfo=timezone.utc)
+    natal_chart = service.calculate_natal_chart(birth, 52.52, 13.40)
+
+    for days in range(0, 3650, 97):
+        transit_date = datetime(2020, 1, 1, tzinfo=timezone.utc) + timedelta(days=days)
+        transits = service.calculate_transits(natal_chart, transit_date)
+
+        expected = reference_aspects(
+            sky_cache.get(transit_date).longitudes,
+            natal_chart["planets"]
+        )
+        actual = [
+            (a.type, a.transit_planet, a.natal_planet, a.orb)
+            for a in transits.aspects
+        ]
+        assert actual == expected
+
+
+def test_orb_boundary_is_inclusive():
+    """An aspect exactly at the orb limit matches"""
+    kernel = AspectKernel(AstroService.ASPECTS)
+
+    hits = kernel.match(np.array([98.0]), np.array([0.0]))
+
+    assert hits.aspect.tolist() == [2]  # square at exactly 8°
+    assert hits.orb.tolist() == [8.0]
+
+
+def test_stacked_charts():
+    """Stacked charts give the same hits as one call per chart"""
+    kernel = AspectKernel(AstroService.ASPECTS)
+    rng = np.random.default_rng(42)
+    transit_lons = rng.uniform(0, 360, 10)
+    natal_lons = rng.uniform(0, 360, (50, 10))
+
+    batch = kernel.match(transit_lons, natal_lons, chunk_size=7)
+
+    for chart in range(50):
+        single = kernel.match(transit_lons, natal_lons[chart])
+        mask = batch.chart == chart
+        assert batch.transit[mask].tolist() == single.transit.tolist()
+        assert batch.natal[mask].tolist() == single.natal.tolist()
+        assert batch.aspect[mask].tolist() == single.aspect.tolist()
+        assert batch.orb[mask].tolist() == single.orb.tolist()
+
+
+def test_stack_natal_longitudes_missing_planets():
+    """Missing planets become NaN and never match"""
+    payloads = [
+        {"planets": {"sun": {"lon_absolute": 10.0}}},
+        {"planets": {"sun": {"lon_absolute": 20.0}, "moon": {"lon_absolute": 30.0}}}
+    ]
+
+    stacked = stack_natal_longitudes(payloads, ["sun", "moon"])
+
+    assert stacked.shape == (2, 2)
+    assert np.isnan(stacked[0, 1])
+
+    kernel = AspectKernel(AstroService.ASPECTS)
+    hits = kernel.match(np.array([10.0]), stacked)
+    assert 1 not in hits.natal[hits.chart == 0].tolist()
@@ -0,0 +1,103 @@
+"""Tests for batch natal chart calculation"""
+
+import numpy as np
+import pytest
+from app.services.astro import AstroService
+from app.services.astro_batch import BirthBatch, _init_worker, assign_houses, to_julian_days
+from datetime import datetime, timezone
+import swisseph as swe
+
+
+BIRTHS = BirthBatch(
+    birth_utc=[
+        datetime(1990, 6, 15, 14, 30, tzinfo=timezone.utc),
+        datetime(1985, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        datetime(2001, 9, 30, 23, 59, tzinfo=timezone.utc),
+        datetime(1972, 12, 24, 6, 0, tzinfo=timezone.utc),
+        datetime(2010, 3, 20, 17, 45, tzinfo=timezone.utc),
+    ],
+    lat=np.array([52.52, 48.14, -33.87, 40.71, 64.13]),
+    lon=np.array([13.40, 11.58, 151.21, -74.01, -21.90])
+)
+
+
+def test_to_julian_days():
+    """Vectorized Julian days match swe.julday"""
+    jds = to_julian_days(BIRTHS.birth_utc)
+    dt = BIRTHS.birth_utc[1]
+    expected = swe.julday(dt.year, dt.month, dt.day, dt.hour + dt.minute / 60.0 + dt.second / 3600.0)
+    assert jds[1] == pytest.approx(expected, abs=1e-8)
+
+    datetime64 = np.array(["1985-01-02T03:04:05"], dtype="datetime64[s]")
+    assert to_julian_days(datetime64)[0] == pytest.approx(expected, abs=1e-8)
+
+
+def test_assign_houses_matches_find_house():
+    """Vectorized house assignment equals _find_house"""
+    service = AstroService()
+    rng = np.random.default_rng(7)
+    cusps = np.array([(np.arange(12) * 30 + offset) % 360 for offset in rng.uniform(0, 360, 20)])
+    longitudes = rng.uniform(0, 360, (20, 10))
+
+    houses = assign_houses(longitudes, cusps)
+
+    for row in range(20):
+        for column in range(10):
+            assert houses[row, column] == service._find_house(longitudes[row, column], cusps[row].tolist())
+
+
+def test_batch_matches_single_chart():
+    """Batch results agree with calculate_natal_chart"""
+    service = AstroService()
+
+    batches = list(service.calculate_natal_charts_batch(BIRTHS, chunk_size=2, max_workers=2))
+
+    # Streamed in input order, in chunks
+    assert [batch.offset for batch in batches] == [0, 2, 4]
+    assert sum(len(batch) for batch in batches) == 5
+
+    for batch in batches:
+        for i in range(len(batch)):
+            row = batch.offset + i
+            chart = service.calculate_natal_chart(BIRTHS.birth_utc[row], BIRTHS.lat[row], BIRTHS.lon[row])
+
+            for column, (_, planet_name) in enumerate(AstroService.PLANETS):
+                planet = chart["planets"][planet_name]
+                assert batch.longitudes[i, column] == pytest.approx(planet["lon_absolute"], abs=1e-5)
+                assert AstroService.SIGNS[batch.signs[i, column]] == planet["sign"]
+                assert batch.houses[i, column] == planet["house"]
+
+            assert batch.cusps[i] == pytest.approx(chart["houses"], abs=0.01)
+            assert batch.ascendant[i] == pytest.approx(chart["ascendant"]["lon_absolute"], abs=1e-5)
+
+
+def test_batches_share_a_pool():
+    """A shared pool serves several batches and is left running"""
+    service = AstroService()
+
+    with service.natal_batch_pool(2) as pool:
+        first = list(service.calculate_natal_charts_batch(BIRTHS, chunk_size=3, max_workers=2, executor=pool))
+        second = list(service.calculate_natal_charts_batch(BIRTHS, chunk_size=5, max_workers=2, executor=pool))
+
+        assert pool.submit(sum, [1, 2]).result() == 3
+
+    assert np.concatenate([batch.longitudes for batch in first]) == pytest.approx(second[0].longitudes)
+
+
+def test_worker_initializer_warms_up(monkeypatch):
+    """Batch workers warm up before their first chunk, like the engine's workers"""
+    calls = []
+    monkeypatch.setattr(AstroService, "warmup", lambda self: calls.append(self) or "swisseph")
+
+    _init_worker(None)
+
+    assert len(calls) == 1
+
+
+def test_batch_length_mismatch():
+    """Mismatched column lengths are rejected"""
+    service = AstroService()
+    births = BirthBatch(birth_utc=BIRTHS.birth_utc, lat=np.zeros(2), lon=np.zeros(5))
+
+    with pytest.raises(ValueError):
+        list(service.calculate_natal_charts_batch(births, max_workers=1))
@@ -0,0 +1,147 @@
+"""Tests for the async astro engine"""
+
+import asyncio
+import time
+import pytest
+from app.services.astro import AstroService
+from app.services.astro_engine import AstroEngine, AstroTimeoutException
+from datetime import datetime, timezone
+
+
+NATAL_CHART = {
+    "planets": {
+        "sun": {"sign": "Zwillinge", "degree": 24.3, "lon_absolute": 84.3},
+        "moon": {"sign": "Fische", "degree": 12.1, "lon_absolute": 342.1}
+    }
+}
+
+
+@pytest.mark.asyncio
+async def test_natal_chart_matches_service():
+    """Awaitable natal chart equals the synchronous result"""
+    engine = AstroEngine(pool_size=2)
+    birth_utc = datetime(1990, 6, 15, 14, 30, tzinfo=timezone.utc)
+
+    result = await engine.natal_chart(birth_utc, 52.52, 13.40)
+
+    assert result == AstroService().calculate_natal_chart(birth_utc, 52.52, 13.40)
+    assert engine.stats()["completed"] == 1
+    engine.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_transits_concurrent():
+    """Concurrent transit calls all complete"""
+    engine = AstroEngine(pool_size=2)
+    transit_date = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    results = await asyncio.gather(*[
+        engine.transits(NATAL_CHART, transit_date) for _ in range(8)
+    ])
+
+    assert all(r.aspects == results[0].aspects for r in results)
+    stats = engine.stats()
+    assert stats["completed"] == 8
+    assert stats["in_flight"] == 0
+    engine.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_timeout():
+    """Slow calculations raise AstroTimeoutException"""
+    service = AstroService()
+    service.calculate_transits = lambda *args: time.sleep(0.5)
+    engine = AstroEngine(service=service, pool_size=1, timeout=0.05)
+
+    with pytest.raises(AstroTimeoutException) as exc_info:
+        await engine.transits(NATAL_CHART)
+
+    assert exc_info.value.status_code == 503
+    assert engine.stats()["timeouts"] == 1
+    engine.shutdown(wait=False)
+
+
+@pytest.mark.asyncio
+async def test_queue_depth():
+    """Calls beyond the pool size are reported as queued"""
+    service = AstroService()
+    service.calculate_transits = lambda *args: time.sleep(0.1)
+    engine = AstroEngine(service=service, pool_size=1)
+
+    tasks = [asyncio.create_task(engine.transits(NATAL_CHART)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+
+    assert engine.queue_depth == 2
+    await asyncio.gather(*tasks)
+    assert engine.queue_depth == 0
+    engine.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_session_transits_in_process_workers():
+    """Transit sessions work with process workers and stay incremental"""
+    engine = AstroEngine(pool_size=1, executor="process")
+    natal_chart = AstroService().calculate_natal_chart(datetime(1990, 6, 15, 14, 30, tzinfo=timezone.utc), 52.52, 13.40)
+    session = engine.transit_session("vs_1", lambda: natal_chart)
+
+    first = await engine.session_transits(session)
+    again = await engine.session_transits(session)
+
+    full = AstroService().calculate_transits(natal_chart)
+    assert [(a.transit_planet, a.type, a.natal_planet) for a in first] == [
+        (a.transit_planet, a.type, a.natal_planet) for a in full.aspects
+    ]
+    assert [a.transit_planet for a in again] == [a.transit_planet for a in first]
+    stats = engine.stats()["transit_sessions"]
+    assert (stats["full"], stats["unchanged"] + stats["partial"]) == (1, 1)
+    engine.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_start_warms_up_and_detects_moshier(tmp_path, monkeypatch, caplog):
+    """Startup warns loudly when the .se1 files are missing"""
+    monkeypatch.setattr("app.services.astro.settings.swisseph_path", str(tmp_path))
+    engine = AstroEngine(pool_size=2)
+
+    await engine.start()
+
+    assert engine.ephemeris_mode == "moshier"
+    assert "Moshier" in caplog.text
+    engine.shutdown()
+
+
+def test_worker_initializer_warms_up(monkeypatch):
+    """Process workers configure the ephemeris and warm up in their initializer"""
+    calls = []
+    monkeypatch.setattr(AstroService, "warmup", lambda self: calls.append(self) or "swisseph")
+
+    AstroService.init_worker()
+
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_start_process_executor():
+    """A process-backed engine starts and reports the ephemeris mode"""
+    engine = AstroEngine(pool_size=2, executor="process")
+
+    await engine.start()
+
+    assert engine.ephemeris_mode in ("swisseph", "moshier")
+    engine.shutdown()
+
+
+def test_missing_ephemeris_files(tmp_path, monkeypatch):
+    """Only files absent from the ephemeris path are reported"""
+    monkeypatch.setattr("app.services.astro.settings.swisseph_path", str(tmp_path))
+    (tmp_path / "sepl_18.se1").write_bytes(b"")
+
+    assert AstroService.missing_ephemeris_files() == ["semo_18.se1"]
+
+
+def test_health_reports_engine(client):
+    """The lifespan-owned engine is ready before requests are served"""
+    response = client.get("/health")
+
+    assert response.status_code == 200
+    assert response.json()["astro_engine"]["ephemeris_mode"] in ("swisseph", "moshier")
@@ -0,0 +1,78 @@
+"""Tests for astrocartography lines"""
+
+from datetime import datetime, timezone
+from unittest.mock import Mock
+import numpy as np
+import swisseph as swe
+from app.services.astro import AstroService
+from app.services.astrocartography import angular_lines, lines_to_payload
+
+BIRTH = datetime(1990, 6, 15, 14, 30, tzinfo=timezone.utc)
+
+
+def test_lines_are_on_the_angles():
+    """Bodies are on the horizon along ASC/DSC lines and on the meridian along MC/IC"""
+    service = AstroService()
+    lines = service.calculate_astrocartography(BIRTH)
+    jd = swe.julday(1990, 6, 15, 14.5)
+
+    assert len(lines) == 4 * len(AstroService.PLANETS)
+    planet_ids = dict((name, planet_id) for planet_id, name in AstroService.PLANETS)
+
+    for line in lines:
+        position = swe.calc_ut(jd, planet_ids[line["planet"]])[0][:3]
+        for segment in line["segments"]:
+            for lon, lat in segment[::20]:
+                azimuth, altitude, _ = swe.azalt(jd, swe.ECL2HOR, (lon, lat, 0), 0, 0, position)
+                if line["angle"] in ("asc", "dsc"):
+                    assert abs(altitude) < 0.05
+                    # Azimuth counts from south via west: rising bodies are in the east
+                    assert (azimuth > 180) == (line["angle"] == "asc") or abs(lat) > 60
+                else:
+                    # On the meridian: azimuth 0 (south) or 180 (north)
+                    assert min(azimuth % 180, 180 - azimuth % 180) < 0.05
+
+
+def test_rising_lines_split_at_antimeridian_and_poles():
+    """Segments never jump across the map and stay within bounds"""
+    lines = angular_lines(np.array([10.0, 200.0]), np.array([23.0, -3.0]), sidereal_time=250.0, lat_step=1.0)
+
+    # dec 23° is circumpolar above ~67°: no rising or setting
+    assert np.isnan(lines.asc[0, lines.lats > 67.5]).all()
+    assert not np.isnan(lines.asc[1]).any()
+
+    for line in lines_to_payload(lines, ["a", "b"]):
+        for segment in line["segments"]:
+            lons = np.array([lon for lon, _ in segment])
+            assert (np.abs(np.diff(lons)) <= 180).all()
+            assert (np.abs(lons) <= 180).all()
+
+
+def test_astrocartography_endpoint(client, mock_supabase):
+    """Lines for the user's birth moment, cached and ETag-revalidated"""
+    mock_supabase.execute.return_value = Mock(data=[{"birth_utc": "1990-06-15T14:30:00+00:00"}])
+
+    response = client.get("/v1/astro/astrocartography")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert {line["angle"] for line in data["lines"]} == {"asc", "dsc", "mc", "ic"}
+    assert response.headers["cache-control"] == "private, no-cache"
+
+    engine = client.app.state.astro_engine
+    hits = engine.line_cache.hits
+    assert client.get("/v1/astro/astrocartography").json() == data
+    assert engine.line_cache.hits == hits + 1
+
+    etag = response.headers["etag"]
+    response = client.get("/v1/astro/astrocartography", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+
+def test_astrocartography_requires_birth_data(client, mock_supabase):
+    """Without birth data the user is asked to enter it"""
+    mock_supabase.execute.return_value = Mock(data=[])
+
+    response = client.get("/v1/astro/astrocartography")
+
+    assert response.status_code == 404
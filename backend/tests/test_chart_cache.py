@@ -0,0 +1,150 @@
+"""Tests for natal chart memoization"""
+
+import pytest
+from app.services.astro_engine import AstroEngine
+from app.services.chart_cache import NatalChartCache
+from datetime import datetime, timezone, timedelta
+
+
+BIRTH = datetime(1990, 6, 15, 14, 30, tzinfo=timezone.utc)
+
+
+def test_key_is_canonical():
+    """Equivalent inputs share a key, different inputs don't"""
+    key = NatalChartCache.key(BIRTH, 52.52, 13.4, "P", "v1")
+
+    # Same instant in another timezone, naive UTC, case of the house system
+    cet = BIRTH.astimezone(timezone(timedelta(hours=1)))
+    assert NatalChartCache.key(cet, 52.52, 13.4, "p", "v1") == key
+    assert NatalChartCache.key(BIRTH.replace(tzinfo=None), 52.52, 13.40, "P", "v1") == key
+    assert NatalChartCache.key(BIRTH, 52.52, 13.4, "P", "v1") == key
+
+    assert NatalChartCache.key(BIRTH, 52.52, 13.4, "K", "v1") != key
+    assert NatalChartCache.key(BIRTH, 52.52, 13.4, "P", "v2") != key
+    assert NatalChartCache.key(BIRTH + timedelta(minutes=1), 52.52, 13.4, "P", "v1") != key
+
+
+def test_lru_eviction():
+    """Least recently used entries are evicted and counted"""
+    cache = NatalChartCache(max_entries=2)
+
+    cache.put("a", {"n": 1})
+    cache.put("b", {"n": 2})
+    cache.get("a")
+    cache.put("c", {"n": 3})
+
+    assert cache.get("b") is None
+    assert cache.get("a") == {"n": 1}
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert stats["memory_hits"] == 2
+    assert stats["misses"] == 1
+
+
+def test_results_are_copies():
+    """Mutating a returned payload doesn't corrupt the cache"""
+    cache = NatalChartCache()
+    cache.put("a", {"planets": {"sun": {"sign": "Widder"}}})
+
+    cache.get("a")["planets"]["sun"]["sign"] = "Stier"
+
+    assert cache.get("a")["planets"]["sun"]["sign"] == "Widder"
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    """Charts written to disk are found by a new cache instance"""
+    path = str(tmp_path / "charts.sqlite")
+    cache = NatalChartCache(disk_path=path)
+    cache.put("a", {"planets": {"sun": {"sign": "Löwe"}}})
+    cache.close()
+
+    restarted = NatalChartCache(disk_path=path)
+
+    assert restarted.get("a") == {"planets": {"sun": {"sign": "Löwe"}}}
+    assert restarted.stats()["disk_hits"] == 1
+
+    # Promoted to memory
+    restarted.get("a")
+    assert restarted.stats()["memory_hits"] == 1
+    restarted.close()
+
+
+@pytest.mark.asyncio
+async def test_engine_memoizes_natal_chart():
+    """Repeated natal charts are served from the cache"""
+    engine = AstroEngine(pool_size=1, chart_cache=NatalChartCache())
+
+    first = await engine.natal_chart(BIRTH, 52.52, 13.40)
+    second = await engine.natal_chart(BIRTH, 52.52, 13.40)
+
+    assert first == second
+    assert engine.stats()["completed"] == 1
+    assert engine.chart_cache.stats()["memory_hits"] == 1
+    engine.shutdown()
+
+
+def test_disk_tier_is_bounded(tmp_path):
+    """The oldest disk rows are evicted beyond disk_max_rows, also after a restart"""
+    path = str(tmp_path / "charts.sqlite")
+    cache = NatalChartCache(max_entries=1, disk_path=path, disk_max_rows=2)
+    for name in "abc":
+        cache.put(name, {"n": name})
+    cache.put("c", {"n": "c"})
+
+    stats = cache.stats()
+    assert stats["disk_rows"] == 2
+    assert stats["disk_evictions"] == 1
+    cache.close()
+
+    restarted = NatalChartCache(disk_path=path, disk_max_rows=2)
+    assert restarted.get("a") is None
+    assert restarted.get("b") == {"n": "b"}
+    restarted.put("d", {"n": "d"})
+    assert restarted.get_disk("b") is None
+    assert restarted.stats()["disk_rows"] == 2
+    restarted.close()
+
+
+def test_memory_tier_not_blocked_by_disk(tmp_path):
+    """Memory lookups don't wait for a SQLite call in progress"""
+    import threading
+
+    cache = NatalChartCache(disk_path=str(tmp_path / "charts.sqlite"))
+    cache.put("a", {"n": 1})
+    results = []
+
+    # Simulate a slow commit on a worker thread
+    with cache._disk_lock:
+        lookup = threading.Thread(target=lambda: results.append(cache.get_memory("a")))
+        lookup.start()
+        lookup.join(timeout=2)
+
+    assert results == [{"n": 1}]
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_engine_reads_disk_tier_off_the_event_loop(tmp_path, monkeypatch):
+    """Disk lookups and writes run on a worker thread"""
+    import threading
+
+    cache = NatalChartCache(disk_path=str(tmp_path / "charts.sqlite"))
+    engine = AstroEngine(pool_size=1, chart_cache=cache)
+    loop_thread = threading.get_ident()
+    threads = []
+
+    for name in ("get_disk", "put"):
+        original = getattr(cache, name)
+
+        def traced(*args, _original=original):
+            threads.append(threading.get_ident())
+            return _original(*args)
+
+        monkeypatch.setattr(cache, name, traced)
+
+    await engine.natal_chart(BIRTH, 52.52, 13.40)
+
+    assert len(threads) == 2
+    assert loop_thread not in threads
+    engine.shutdown()
+    cache.close()
@@ -0,0 +1,115 @@
+"""Tests for the binary natal chart payload (format v2)"""
+
+import copy
+import pickle
+from datetime import datetime, timezone, timedelta
+from unittest.mock import Mock
+import numpy as np
+import pytest
+from app.config import settings
+from app.jobs.backfill_payload_v2 import backfill_payload_v2
+from app.services.aspects import natal_longitudes
+from app.services.astro import AstroService
+from app.services.chart_codec import LazyChartPayload, decode_payload, encode_payload, is_encoded
+from app.services.natal_chart_store import load_latest_natal_payload
+
+
+@pytest.fixture
+def natal_payload():
+    service = AstroService()
+    return service.calculate_natal_chart(datetime(1990, 6, 15, 14, 30, tzinfo=timezone.utc), 52.52, 13.40)
+
+
+def test_roundtrip_is_lossless():
+    """Engine-built charts decode to exactly the JSON payload"""
+    service = AstroService()
+    birth = datetime(1940, 3, 1, tzinfo=timezone.utc)
+
+    for i in range(50):
+        payload = service.calculate_natal_chart(birth + timedelta(days=613 * i, hours=i), -50 + 2 * i, 170 - 7 * i)
+        encoded = encode_payload(payload)
+
+        assert encoded[:4] == b"NCHT"
+        assert decode_payload(encoded).to_dict() == payload
+
+
+def test_bytea_text_and_extras(sample_natal_chart):
+    """PostgREST hex text decodes; keys outside the layout are kept"""
+    payload = copy.deepcopy(sample_natal_chart["payload"])
+    payload["warnings"] = {"house_system": "fallback"}
+    payload["planets"]["sun"]["retrograde"] = False
+
+    text = "\\x" + encode_payload(payload).hex()
+
+    assert is_encoded(text)
+    assert decode_payload(text) == payload
+
+
+def test_lazy_decode(natal_payload):
+    """Only accessed planets are materialized; longitudes skip dicts entirely"""
+    lazy = decode_payload(encode_payload(natal_payload))
+
+    names, lons = natal_longitudes(lazy)
+    assert names == list(natal_payload["planets"])
+    np.testing.assert_array_equal(lons, [p["lon_absolute"] for p in natal_payload["planets"].values()])
+    assert "planets" not in lazy._cache
+
+    assert lazy["planets"]["moon"] == natal_payload["planets"]["moon"]
+    assert list(lazy["planets"]._cache) == ["moon"]
+
+    restored = pickle.loads(pickle.dumps(lazy))
+    assert isinstance(restored, LazyChartPayload)
+    assert restored == natal_payload
+
+
+def test_rejects_unrepresentable_payloads(natal_payload):
+    """Unknown planets or extra precision stay JSON"""
+    unknown = copy.deepcopy(natal_payload)
+    unknown["planets"]["chiron"] = dict(unknown["planets"]["sun"])
+    with pytest.raises(ValueError):
+        encode_payload(unknown)
+
+    precise = copy.deepcopy(natal_payload)
+    precise["planets"]["sun"]["lon_absolute"] += 1e-8
+    with pytest.raises(ValueError):
+        encode_payload(precise)
+
+
+def test_dual_read(mock_supabase, sample_natal_chart, monkeypatch):
+    """v2 rows decode from payload_v2, pending rows fall back to JSON"""
+    monkeypatch.setattr(settings, "natal_payload_v2_reads", True)
+    encoded = "\\x" + encode_payload(sample_natal_chart["payload"]).hex()
+    mock_supabase.execute.return_value = Mock(data=[{"id": "chart-123", "payload_v2": encoded}])
+
+    payload = load_latest_natal_payload(mock_supabase, "user-1")
+    assert isinstance(payload, LazyChartPayload)
+    assert payload == sample_natal_chart["payload"]
+
+    # Pending rows are served from the same request
+    mock_supabase.execute.reset_mock()
+    mock_supabase.execute.return_value = Mock(data=[{"payload_v2": None, "payload": sample_natal_chart["payload"]}])
+    assert load_latest_natal_payload(mock_supabase, "user-1") == sample_natal_chart["payload"]
+    assert mock_supabase.execute.call_count == 1
+
+
+def test_backfill_job(mock_supabase, natal_payload):
+    """The backfill pages by id, encodes and skips what it can't encode"""
+    mock_supabase.gt = Mock(return_value=mock_supabase)
+    broken = copy.deepcopy(natal_payload)
+    broken["planets"]["chiron"] = dict(broken["planets"]["sun"])
+
+    pages = [
+        Mock(data=[{"id": "a", "payload": natal_payload}, {"id": "b", "payload": broken}]),
+        Mock(data=[]),  # update of "a"
+        Mock(data=[{"id": "c", "payload": natal_payload}]),
+        Mock(data=[]),  # update of "c"
+    ]
+    mock_supabase.execute.side_effect = pages
+
+    counts = backfill_payload_v2(mock_supabase, batch_size=2)
+
+    assert counts == {"encoded": 2, "skipped": 1}
+    mock_supabase.gt.assert_called_once_with("id", "b")
+    update = mock_supabase.update.call_args[0][0]
+    assert update["payload_format"] == 2
+    assert decode_payload(update["payload_v2"]) == natal_payload
@@ -0,0 +1,102 @@
+"""Tests for the compact chart record"""
+
+import copy
+import numpy as np
+import swisseph as swe
+from datetime import datetime, timezone, timedelta
+from app.services.astro import AstroService
+from app.services.chart_record import ChartRecord, find_house, unwrap_cusps
+
+
+def legacy_find_house(planet_lon, houses_cusps):
+    """Original linear cusp scan"""
+    for i in range(12):
+        cusp_current = houses_cusps[i]
+        cusp_next = houses_cusps[(i + 1) % 12]
+        if cusp_next < cusp_current:
+            cusp_next += 360
+        planet_lon_adjusted = planet_lon
+        if planet_lon < cusp_current:
+            planet_lon_adjusted += 360
+        if cusp_current <= planet_lon_adjusted < cusp_next:
+            return i + 1
+    return 1
+
+
+def legacy_natal_chart(service, birth_utc, lat, lon, house_system="P"):
+    """Original dict-building natal chart"""
+    jd = swe.julday(
+        birth_utc.year, birth_utc.month, birth_utc.day,
+        birth_utc.hour + birth_utc.minute / 60.0 + birth_utc.second / 3600.0
+    )
+    planets = {}
+    for planet_id, planet_name in AstroService.PLANETS:
+        result, _ = swe.calc_ut(jd, planet_id)
+        sign, degree = service._to_zodiac(result[0])
+        planets[planet_name] = {"sign": sign, "degree": round(degree, 2), "lon_absolute": round(result[0], 6)}
+
+    houses_cusps, ascmc = swe.houses(jd, lat, lon, house_system.encode())
+    for planet_name in planets:
+        planets[planet_name]["house"] = legacy_find_house(planets[planet_name]["lon_absolute"], houses_cusps)
+
+    asc_sign, asc_deg = service._to_zodiac(ascmc[0])
+    mc_sign, mc_deg = service._to_zodiac(ascmc[1])
+    return {
+        "planets": planets,
+        "ascendant": {"sign": asc_sign, "degree": round(asc_deg, 2), "lon_absolute": round(ascmc[0], 6)},
+        "midheaven": {"sign": mc_sign, "degree": round(mc_deg, 2), "lon_absolute": round(ascmc[1], 6)},
+        "houses": [round(h, 2) for h in houses_cusps]
+    }
+
+
+def test_find_house_matches_linear_scan():
+    """Binary search over unwrapped cusps equals the original scan"""
+    rng = np.random.default_rng(11)
+    for _ in range(200):
+        start = rng.uniform(0, 360)
+        widths = rng.dirichlet(np.ones(12)) * 360
+        cusps = ((start + np.concatenate([[0], np.cumsum(widths[:-1])])) % 360).tolist()
+        unwrapped = unwrap_cusps(cusps)
+
+        for lon in rng.uniform(0, 360, 20).tolist() + cusps:
+            assert find_house(lon, unwrapped) == legacy_find_house(lon, cusps)
+
+
+def test_natal_chart_matches_legacy_payload():
+    """Charts built via ChartRecord equal the original dict output"""
+    service = AstroService()
+    birth = datetime(1950, 1, 1, 3, 17, tzinfo=timezone.utc)
+
+    for i in range(60):
+        birth_utc = birth + timedelta(days=397 * i, minutes=211 * i)
+        lat, lon = -60 + (i * 7) % 120, -180 + (i * 37) % 360
+        payload = service.calculate_natal_chart(birth_utc, lat, lon, include_patterns=True)
+        assert isinstance(payload.pop("patterns"), list)  # Added in payload version 2
+        for planet in payload["planets"].values():
+            assert isinstance(planet.pop("speed"), float)  # Added in payload version 3
+        assert payload == legacy_natal_chart(service, birth_utc, lat, lon)
+
+
+def test_payload_roundtrip_is_lossless(sample_natal_chart):
+    """from_payload -> to_payload reproduces the payload exactly"""
+    service = AstroService()
+    full = service.calculate_natal_chart(datetime(1990, 6, 15, 14, 30, tzinfo=timezone.utc), 52.52, 13.40, include_patterns=True)
+
+    partial = copy.deepcopy(sample_natal_chart["payload"])
+    partial["planets"]["moon"]["retrograde"] = True
+    partial["warnings"] = {"house_system": "fallback"}
+
+    for payload in (full, partial):
+        record = ChartRecord.from_payload(payload)
+        assert record.to_payload() == payload
+
+
+def test_natal_record_keeps_speeds():
+    """The record carries speeds and answers house lookups"""
+    service = AstroService()
+    record = service.calculate_natal_record(datetime(1990, 6, 15, 14, 30, tzinfo=timezone.utc), 52.52, 13.40)
+
+    assert len(record) == len(AstroService.PLANETS)
+    assert not np.isnan(record.speeds).any()
+    assert 0.9 < record.speeds[0] < 1.1  # sun
+    assert record.house_of(record.longitude("sun")) == record.houses[0]
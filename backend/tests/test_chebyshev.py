@@ -0,0 +1,98 @@
+"""Tests for the Chebyshev ephemeris"""
+
+import numpy as np
+import pytest
+import swisseph as swe
+from app.services.astro import AstroService
+from app.services import chebyshev
+from app.services.chebyshev import ChebyshevEphemeris
+
+
+@pytest.fixture(scope="module")
+def ephemeris(tmp_path_factory):
+    """One-year ephemeris for all planets"""
+    path = tmp_path_factory.mktemp("chebyshev")
+    return ChebyshevEphemeris.build(
+        str(path),
+        swe.julday(2025, 1, 1, 0.0),
+        swe.julday(2026, 1, 1, 0.0),
+        AstroService.PLANETS
+    )
+
+
+def test_longitudes_within_error_bound(ephemeris):
+    """Evaluated longitudes stay within the documented bound"""
+    rng = np.random.default_rng(3)
+    jds = rng.uniform(ephemeris.start_jd, ephemeris.end_jd, 300)
+
+    fitted = ephemeris.longitudes(jds)
+
+    for column, (planet_id, _) in enumerate(AstroService.PLANETS):
+        expected = np.array([swe.calc_ut(jd, planet_id)[0][0] for jd in jds])
+        error = np.abs((fitted[:, column] - expected + 180) % 360 - 180) * 3600
+        assert error.max() <= chebyshev.ERROR_BOUND_ARCSEC
+
+
+def test_speeds_within_error_bound(ephemeris):
+    """Evaluated speeds stay within the documented bound"""
+    rng = np.random.default_rng(4)
+    jds = rng.uniform(ephemeris.start_jd, ephemeris.end_jd, 300)
+
+    speeds = ephemeris.speeds(jds)
+
+    for column, (planet_id, _) in enumerate(AstroService.PLANETS):
+        expected = np.array([swe.calc_ut(jd, planet_id)[0][3] for jd in jds])
+        assert np.abs(speeds[:, column] - expected).max() <= chebyshev.SPEED_ERROR_BOUND
+
+
+def test_build_enforces_speed_bound(tmp_path, monkeypatch):
+    """A fit whose speeds exceed SPEED_ERROR_BOUND is not written"""
+    monkeypatch.setattr(chebyshev, "SPEED_ERROR_BOUND", 1e-12)
+
+    with pytest.raises(ValueError, match="speed error"):
+        ChebyshevEphemeris.build(
+            str(tmp_path),
+            swe.julday(2025, 1, 1, 0.0),
+            swe.julday(2025, 2, 1, 0.0),
+            [(swe.MOON, "moon")]
+        )
+
+    assert not (tmp_path / "moon.npy").exists()
+
+
+def test_shape_and_body_selection(ephemeris):
+    """Output shape follows the input shape and selected bodies"""
+    jds = np.full((4, 3), ephemeris.start_jd + 10)
+
+    assert ephemeris.longitudes(jds).shape == (4, 3, 10)
+    moon = ephemeris.longitudes(jds, bodies=["moon"])
+    assert moon.shape == (4, 3, 1)
+    assert np.all((moon >= 0) & (moon < 360))
+
+
+def test_reload_is_memory_mapped(ephemeris):
+    """A reloaded ephemeris maps the coefficient files"""
+    reloaded = ChebyshevEphemeris(ephemeris.path)
+
+    assert isinstance(reloaded.coefficients[0], np.memmap)
+    jd = ephemeris.start_jd + 100.25
+    assert reloaded.longitudes(jd).tolist() == ephemeris.longitudes(jd).tolist()
+
+
+def test_out_of_range(ephemeris):
+    """Julian days outside the built range are rejected"""
+    with pytest.raises(ValueError):
+        ephemeris.longitudes(np.array([ephemeris.end_jd + 1]))
+
+
+def test_build_enforces_error_bound(tmp_path, monkeypatch):
+    """The build refuses fits worse than the documented bound"""
+    monkeypatch.setattr(chebyshev, "ERROR_BOUND_ARCSEC", 1e-9)
+
+    with pytest.raises(ValueError):
+        ChebyshevEphemeris.build(
+            str(tmp_path),
+            swe.julday(2025, 1, 1, 0.0),
+            swe.julday(2025, 3, 1, 0.0),
+            [(swe.MARS, "mars")]
+        )
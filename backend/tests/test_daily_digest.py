@@ -0,0 +1,107 @@
+"""Tests for the daily transit digest job"""
+
+from datetime import date, datetime, timezone
+from unittest.mock import Mock
+import pytest
+from app.jobs.daily_digest import DIGEST_MAX_ASPECTS, run_daily_digest
+from app.services.astro import AstroService
+from app.services.chart_codec import encode_payload
+
+DIGEST_DATE = date(2024, 3, 20)
+
+
+@pytest.fixture
+def payloads():
+    service = AstroService()
+    return [
+        service.calculate_natal_chart(datetime(1970 + 9 * i, 1 + i, 10, 6, tzinfo=timezone.utc), 48.1, 11.6)
+        for i in range(3)
+    ]
+
+
+@pytest.fixture
+def job_supabase(mock_supabase):
+    mock_supabase.gt = Mock(return_value=mock_supabase)
+    mock_supabase.in_ = Mock(return_value=mock_supabase)
+    mock_supabase.upsert = Mock(return_value=mock_supabase)
+    return mock_supabase
+
+
+def _upserts(mock_supabase, table):
+    """Upsert payloads sent to a table, in call order"""
+    calls = []
+    table_name = None
+    for name, args, _ in mock_supabase.mock_calls:
+        if name == "table":
+            table_name = args[0]
+        elif name == "upsert" and table_name == table:
+            calls.append(args[0])
+    return calls
+
+
+def test_digest_pages_users_and_checkpoints(job_supabase, payloads):
+    """Latest chart per user, v2 and JSON payloads, checkpoint per page"""
+    encoded = "\\x" + encode_payload(payloads[0]).hex()
+    job_supabase.execute.side_effect = [
+        Mock(data=[]),  # no checkpoint
+        Mock(data=[
+            {"id": "c1", "user_id": "u1", "payload_v2": encoded},
+            {"id": "c1-old", "user_id": "u1", "payload_v2": None},
+            {"id": "c2", "user_id": "u2", "payload_v2": None},
+        ]),
+        Mock(data=[{"id": "c2", "payload": payloads[1]}]),  # JSON fallback
+        Mock(data=[]),  # digest upsert
+        Mock(data=[]),  # checkpoint
+        Mock(data=[{"id": "c3", "user_id": "u3", "payload_v2": "\\x" + encode_payload(payloads[2]).hex()}]),
+        Mock(data=[]),  # digest upsert
+        Mock(data=[]),  # checkpoint
+        Mock(data=[]),  # final checkpoint
+    ]
+
+    stats = run_daily_digest(job_supabase, DIGEST_DATE, batch_size=3)
+
+    assert stats["charts"] == 3 and stats["processed"] == 3
+    assert stats["charts_per_second"] > 0
+    job_supabase.gt.assert_called_once_with("user_id", "u2")
+    job_supabase.in_.assert_called_once_with("id", ["c2"])
+
+    digests = [row for page in _upserts(job_supabase, "daily_transit_digests") for row in page]
+    assert [(row["user_id"], row["natal_chart_id"]) for row in digests] == [("u1", "c1"), ("u2", "c2"), ("u3", "c3")]
+
+    # Same aspects as a single-chart calculation, tightest first
+    transits = AstroService().calculate_transits(payloads[1], datetime(2024, 3, 20, 12, tzinfo=timezone.utc))
+    expected = sorted(transits.aspects, key=lambda aspect: aspect.orb)[:DIGEST_MAX_ASPECTS]
+    aspects = digests[1]["aspects"]
+    assert [orb for *_, orb in aspects] == sorted(orb for *_, orb in aspects)
+    assert {(t, a, n) for t, a, n, _ in aspects} == {(e.transit_planet, e.type, e.natal_planet) for e in expected}
+
+    checkpoints = _upserts(job_supabase, "batch_job_checkpoints")
+    assert [(c["cursor"], c["processed"]) for c in checkpoints] == [("u2", 2), ("u3", 3), ("u3", 3)]
+    assert checkpoints[-1]["finished_at"] is not None
+    assert checkpoints[0]["run_key"] == "2024-03-20"
+
+
+def test_digest_resumes_from_checkpoint(job_supabase):
+    """A crashed run continues after the last committed user"""
+    job_supabase.execute.side_effect = [
+        Mock(data=[{"cursor": "u2", "processed": 2, "finished_at": None}]),
+        Mock(data=[]),  # nothing left
+        Mock(data=[]),  # final checkpoint
+    ]
+
+    stats = run_daily_digest(job_supabase, DIGEST_DATE)
+
+    job_supabase.gt.assert_called_once_with("user_id", "u2")
+    assert stats["processed"] == 2 and stats["charts"] == 0
+
+
+def test_finished_run_is_not_repeated(job_supabase):
+    """A finished date is skipped"""
+    job_supabase.execute.side_effect = [
+        Mock(data=[{"cursor": "u9", "processed": 9, "finished_at": "2024-03-21T01:00:00+00:00"}]),
+    ]
+
+    stats = run_daily_digest(job_supabase, DIGEST_DATE)
+
+    assert stats["charts"] == 0
+    job_supabase.upsert.assert_not_called()
@@ -0,0 +1,121 @@
+"""Tests for the precomputed sky event catalog"""
+
+from datetime import datetime, timezone
+import pytest
+import swisseph as swe
+from app.services.astro import AstroService
+from app.services.chart_codec import decode_payload, encode_payload
+from app.services.event_catalog import EventCatalog
+from app.services.exact_time import datetime_from_jd
+
+
+@pytest.fixture(scope="module")
+def catalog(tmp_path_factory):
+    """Catalog for March-April 2024 (Mercury retrograde, total solar eclipse)"""
+    AstroService.configure_ephemeris()
+    return EventCatalog.build(
+        str(tmp_path_factory.mktemp("events")),
+        swe.julday(2024, 3, 1, 0.0),
+        swe.julday(2024, 5, 1, 0.0),
+        AstroService.PLANETS
+    )
+
+
+@pytest.fixture
+def event_service(catalog, monkeypatch):
+    """AstroService with the test catalog loaded"""
+    monkeypatch.setattr(AstroService, "_event_catalog", catalog)
+    return AstroService()
+
+
+def test_catalog_finds_known_events(catalog):
+    """Stations, ingresses and eclipses land on the known dates"""
+    station = catalog.next("station_retrograde", swe.julday(2024, 3, 1, 0.0), "mercury")
+    assert abs(datetime_from_jd(station.jd) - datetime(2024, 4, 1, 22, 14, tzinfo=timezone.utc)).total_seconds() < 600
+    assert AstroService.SIGNS[station.detail] == "Widder"
+
+    eclipse = catalog.next("solar_eclipse", swe.julday(2024, 3, 1, 0.0))
+    assert datetime_from_jd(eclipse.jd).date() == datetime(2024, 4, 8).date()
+    assert eclipse.body is None
+
+    # Sun enters Aries at the March equinox
+    ingress = catalog.next("ingress", swe.julday(2024, 3, 1, 0.0), "sun")
+    assert datetime_from_jd(ingress.jd).date() == datetime(2024, 3, 20).date()
+    assert ingress.detail == 0
+
+
+def test_catalog_lookups_are_consistent(catalog):
+    """next/previous/between agree with each other and with the time order"""
+    events = catalog.between(catalog.start_jd, catalog.end_jd)
+    jds = [event.jd for event in events]
+    assert jds == sorted(jds) and len(events) == len(catalog)
+
+    new_moons = catalog.between(catalog.start_jd, catalog.end_jd, kinds=["new_moon"])
+    assert len(new_moons) == 2  # 2024-03-10 and 2024-04-08
+
+    first, second = new_moons
+    assert catalog.next("new_moon", first.jd + 1e-6) == second
+    assert catalog.previous("new_moon", second.jd) == first
+    assert catalog.previous("new_moon", first.jd) is None
+
+    # Without a body, the earliest station of any planet
+    any_station = catalog.next("station_retrograde", catalog.start_jd)
+    stations = [event for event in events if event.kind == "station_retrograde"]
+    assert any_station == stations[0]
+
+    mercury = catalog.between(catalog.start_jd, catalog.end_jd, body="mercury")
+    assert all(event.body == "mercury" for event in mercury)
+
+
+def test_catalog_reload_from_disk(catalog):
+    """A loaded catalog returns the same events as the built one"""
+    reloaded = EventCatalog(catalog.path)
+
+    assert reloaded.between(reloaded.start_jd, reloaded.end_jd) == catalog.between(catalog.start_jd, catalog.end_jd)
+    assert not reloaded.covers(swe.julday(2025, 1, 1, 0.0))
+
+
+def test_natal_payload_carries_speeds():
+    """Planet speeds are stored and survive the binary codec"""
+    payload = AstroService().calculate_natal_chart(datetime(1990, 6, 15, 14, 30, tzinfo=timezone.utc), 52.52, 13.40)
+
+    assert payload["planets"]["moon"]["speed"] > 11
+    assert all("speed" in planet for planet in payload["planets"].values())
+    assert decode_payload(encode_payload(payload)).to_dict() == payload
+
+
+def test_events_endpoint(client, event_service):
+    """Events are listed by window and filters"""
+    response = client.get("/v1/astro/events", params={
+        "start": "2024-03-01T00:00:00Z", "days": 60, "kind": ["solar_eclipse", "lunar_eclipse"]
+    })
+
+    assert response.status_code == 200
+    events = response.json()
+    assert [event["kind"] for event in events] == ["lunar_eclipse", "solar_eclipse"]
+    assert events[1]["eclipse_type"] == "total"
+    assert events[1]["sign"] is None
+
+
+def test_next_event_endpoint(client, event_service):
+    """The next Mercury retrograde station is found with its sign"""
+    response = client.get("/v1/astro/events/next", params={
+        "kind": "station_retrograde", "body": "mercury", "after": "2024-03-01T00:00:00Z"
+    })
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["date"].startswith("2024-04-01")
+    assert data["sign"] == "Widder"
+
+    response = client.get("/v1/astro/events/next", params={"kind": "station_retrograde", "body": "chiron"})
+    assert response.status_code == 422
+
+
+def test_events_endpoint_without_catalog(client, monkeypatch):
+    """Without a catalog the endpoints report 503"""
+    monkeypatch.setattr(AstroService, "_event_catalog", None)
+
+    response = client.get("/v1/astro/events/next", params={"kind": "new_moon"})
+
+    assert response.status_code == 503
@@ -0,0 +1,121 @@
+"""Tests for the exact-time solver"""
+
+import pytest
+import swisseph as swe
+from app.services.astro import AstroService, sky_cache
+from app.services.exact_time import ExactTimeSolver, datetime_from_jd
+from datetime import datetime, timezone
+
+
+PLANET_IDS = {planet_name: planet_id for planet_id, planet_name in AstroService.PLANETS}
+
+
+def separation(jd: float, planet_id: int, natal_lon: float) -> float:
+    """Smallest angle between a transiting planet and a natal point"""
+    lon = swe.calc_ut(jd, planet_id)[0][0]
+    diff = abs(lon - natal_lon) % 360
+    return min(diff, 360 - diff)
+
+
+def solve(solver, planet, natal_lon, angle, orb, when):
+    """Run the solver from the sky at `when`"""
+    jd = swe.julday(when.year, when.month, when.day, when.hour + when.minute / 60.0)
+    result, _ = swe.calc_ut(jd, PLANET_IDS[planet])
+    return solver.exact_jd(planet, natal_lon, angle, orb, jd, result[0], result[3])
+
+
+def test_sun_equinox():
+    """Sun conjunct 0° Aries is exact at the March equinox"""
+    solver = ExactTimeSolver(PLANET_IDS)
+
+    exact = solve(solver, "sun", 0.0, 0, 8, datetime(2025, 3, 15, tzinfo=timezone.utc))
+
+    # Equinox: 2025-03-20 09:01 UTC
+    equinox = datetime(2025, 3, 20, 9, 1, tzinfo=timezone.utc)
+    assert abs((datetime_from_jd(exact) - equinox).total_seconds()) < 300
+
+
+def test_past_exactness():
+    """An aspect already separating finds the past exact time"""
+    solver = ExactTimeSolver(PLANET_IDS)
+    when = datetime(2025, 3, 25, tzinfo=timezone.utc)
+
+    exact = solve(solver, "sun", 270.0, 90, 8, when)
+
+    assert datetime_from_jd(exact) < when
+    assert separation(exact, swe.SUN, 270.0) == pytest.approx(90, abs=0.01)
+
+
+@pytest.mark.parametrize("planet,angle", [
+    ("moon", 120), ("mercury", 60), ("mars", 180), ("saturn", 90), ("pluto", 0)
+])
+def test_exactness_for_bodies(planet, angle):
+    """Found times put the planet on the aspect point"""
+    solver = ExactTimeSolver(PLANET_IDS)
+    when = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    jd = swe.julday(2025, 6, 1, 0.0)
+    lon = swe.calc_ut(jd, PLANET_IDS[planet])[0][0]
+    natal_lon = (lon - angle + 3) % 360  # 3° from exact
+
+    exact = solve(solver, planet, natal_lon, angle, 8, when)
+
+    assert exact is not None
+    assert separation(exact, PLANET_IDS[planet], natal_lon) == pytest.approx(angle, abs=0.01)
+
+
+def test_cache_per_chart_and_aspect():
+    """Repeated lookups for the same aspect are served from the cache"""
+    solver = ExactTimeSolver(PLANET_IDS)
+    when = datetime(2025, 3, 15, tzinfo=timezone.utc)
+
+    first = solve(solver, "sun", 0.0, 0, 8, when)
+    second = solve(solver, "sun", 0.0, 0, 8, when)
+
+    assert first == second
+    assert solver.stats()["hits"] == 1
+    assert solver.stats()["misses"] == 1
+
+
+@pytest.mark.parametrize("planet,angle", [("uranus", 60), ("neptune", 60), ("uranus", 90), ("mars", 120)])
+def test_cache_is_per_reference_time(planet, angle):
+    """A warm cache answers a later date like a fresh solve does"""
+    first_date = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    later_date = datetime(2020, 1, 20, tzinfo=timezone.utc)
+    lon = swe.calc_ut(swe.julday(2020, 1, 1, 0.0), PLANET_IDS[planet])[0][0]
+    natal_lon = (lon - angle + 3) % 360  # 3° from exact on the first date
+
+    warm = ExactTimeSolver(PLANET_IDS)
+    solve(warm, planet, natal_lon, angle, 8, first_date)
+
+    assert solve(warm, planet, natal_lon, angle, 8, later_date) == solve(
+        ExactTimeSolver(PLANET_IDS), planet, natal_lon, angle, 8, later_date
+    )
+    assert warm.stats()["hits"] == 0
+
+
+def test_calculate_transits_fills_exact_date():
+    """calculate_transits resolves exact dates on request"""
+    service = AstroService()
+    natal_chart = service.calculate_natal_chart(datetime(1990, 6, 15, 14, 30, tzinfo=timezone.utc), 52.52, 13.40)
+    transit_date = datetime(2025, 6, 1, 12, 0, tzinfo=timezone.utc)
+
+    transits = service.calculate_transits(natal_chart, transit_date, resolve_exact_dates=True)
+
+    angles = {name: angle for name, angle, _ in AstroService.ASPECTS}
+    assert transits.aspects
+    for aspect in transits.aspects:
+        if aspect.exact_date is None:
+            # Slow planets may not reach exactness within the search window
+            assert aspect.transit_planet in ("jupiter", "saturn", "uranus", "neptune", "pluto")
+            continue
+
+        jd = swe.julday(
+            aspect.exact_date.year, aspect.exact_date.month, aspect.exact_date.day,
+            aspect.exact_date.hour + aspect.exact_date.minute / 60.0 + aspect.exact_date.second / 3600.0
+        )
+        natal_lon = natal_chart["planets"][aspect.natal_planet]["lon_absolute"]
+        assert separation(jd, PLANET_IDS[aspect.transit_planet], natal_lon) == pytest.approx(
+            angles[aspect.type], abs=0.02
+        )
+
+    assert "exact_date" in transits.to_agent_format()[next(iter(transits.to_agent_format()))]
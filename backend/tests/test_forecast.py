@@ -0,0 +1,89 @@
+"""Tests for the transit forecast sweep and endpoint"""
+
+import json
+from datetime import datetime, timezone
+import numpy as np
+import swisseph as swe
+from app.services.astro import AstroService
+from app.services.aspects import natal_longitudes
+from app.services.astro_batch import to_julian_days
+
+
+def _separation(a: float, b: float) -> float:
+    return abs((a - b + 180) % 360 - 180)
+
+
+def test_forecast_events_match_aspect_geometry(sample_natal_chart):
+    """Exact events sit on the aspect angle, orb events on the orb boundary"""
+    astro = AstroService()
+    natal = dict(zip(*natal_longitudes(sample_natal_chart["payload"])))
+    planet_ids = {name: planet_id for planet_id, name in AstroService.PLANETS}
+    aspects = {name: (angle, orb) for name, angle, orb in AstroService.ASPECTS}
+
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    end = datetime(2025, 3, 1, tzinfo=timezone.utc)
+    events = list(astro.iter_transit_events(sample_natal_chart["payload"], start, end))
+
+    assert events
+    assert [e.date for e in events] == sorted(e.date for e in events)
+    assert {e.event for e in events} <= {"active", "orb_start", "exact", "orb_end"}
+    assert any(e.event == "exact" for e in events)
+
+    for event in events:
+        assert start <= event.date <= end
+        angle, orb = aspects[event.type]
+        jd = float(to_julian_days([event.date])[0])
+        lon = swe.calc_ut(jd, planet_ids[event.transit_planet])[0][0]
+        deviation = abs(_separation(lon, natal[event.natal_planet]) - angle)
+
+        if event.event == "exact":
+            # Linear interpolation over 6h steps; the moon moves fastest
+            assert deviation < 0.1
+        elif event.event in ("orb_start", "orb_end"):
+            assert abs(deviation - orb) < 0.1
+        else:
+            assert deviation <= orb + 1e-6
+
+
+def test_forecast_uses_vectorized_positions():
+    """transit_longitudes returns one row per Julian day"""
+    astro = AstroService()
+    jds = np.array([2460676.5, 2460677.5, 2460678.5])
+    lons = astro.transit_longitudes(jds)
+
+    assert lons.shape == (3, len(AstroService.PLANETS))
+    assert lons[1, 0] == swe.calc_ut(jds[1], swe.SUN)[0][0]
+
+
+def test_forecast_endpoint_streams_ndjson(client, mock_supabase, sample_natal_chart):
+    """The endpoint streams one JSON event per line"""
+    mock_supabase.execute.return_value.data = [sample_natal_chart]
+
+    response = client.get(
+        "/v1/astro/forecast",
+        params={"start": "2025-01-01T00:00:00Z", "days": 30}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+
+    lines = response.text.strip().split("\n")
+    assert len(lines) > 1
+    events = [json.loads(line) for line in lines]
+    assert set(events[0]) == {"event", "type", "transit_planet", "natal_planet", "date", "orb"}
+
+
+def test_forecast_endpoint_requires_natal_chart(client, mock_supabase):
+    """No natal chart yields 404"""
+    mock_supabase.execute.return_value.data = []
+
+    response = client.get("/v1/astro/forecast")
+
+    assert response.status_code == 404
+
+
+def test_forecast_endpoint_rejects_long_windows(client):
+    """Windows beyond FORECAST_MAX_DAYS are rejected"""
+    response = client.get("/v1/astro/forecast", params={"days": 10000})
+
+    assert response.status_code == 422
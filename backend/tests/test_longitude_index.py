@@ -0,0 +1,109 @@
+"""Tests for the inverted longitude index"""
+
+import numpy as np
+import pytest
+from app.services.astro import AstroService
+from app.services.longitude_index import LongitudeIndex
+
+PLANETS = ["sun", "moon"]
+
+
+def _chart(sun: float, moon: float) -> dict:
+    return {"planets": {
+        "sun": {"lon_absolute": sun},
+        "moon": {"lon_absolute": moon}
+    }}
+
+
+def _brute_force(charts: dict, planet: str, lon: float, orb: float) -> set:
+    return {
+        user_id for user_id, chart in charts.items()
+        if abs((chart["planets"][planet]["lon_absolute"] - lon + 180) % 360 - 180) <= orb
+    }
+
+
+@pytest.fixture
+def charts():
+    rng = np.random.default_rng(7)
+    return {
+        f"user-{i}": _chart(*rng.uniform(0, 360, 2).tolist())
+        for i in range(2000)
+    }
+
+
+def test_query_matches_brute_force(charts):
+    """Range queries, including wrap-around at 0°, match a linear scan"""
+    index = LongitudeIndex.from_rows(
+        PLANETS, ({"user_id": u, "payload": c} for u, c in charts.items())
+    )
+
+    assert len(index) == len(charts)
+    for lon in (0.5, 90.0, 180.0, 359.5):
+        for orb in (1.0, 8.0):
+            assert index.query("sun", lon, orb) == _brute_force(charts, "sun", lon, orb)
+
+
+def test_incremental_updates(charts):
+    """Upserts and removals are visible before and after compaction"""
+    index = LongitudeIndex.from_rows(
+        PLANETS,
+        ({"user_id": u, "payload": c} for u, c in charts.items()),
+        compact_threshold=10_000
+    )
+
+    charts["user-1"] = _chart(10.0, 20.0)
+    charts["new-user"] = _chart(10.5, 200.0)
+    index.upsert("user-1", charts["user-1"])
+    index.upsert("new-user", charts["new-user"])
+    index.remove("user-2")
+    del charts["user-2"]
+
+    expected = _brute_force(charts, "sun", 10.0, 3.0)
+    assert {"user-1", "new-user"} <= expected
+    assert index.query("sun", 10.0, 3.0) == expected
+
+    index.compact()
+    assert index.query("sun", 10.0, 3.0) == expected
+    assert len(index) == len(charts)
+
+
+def test_from_rows_keeps_latest_chart():
+    """Only the most recent chart per user is indexed"""
+    index = LongitudeIndex.from_rows(PLANETS, [
+        {"user_id": "a", "computed_at": "2025-01-02T00:00:00", "payload": _chart(100.0, 0.0)},
+        {"user_id": "a", "computed_at": "2025-01-01T00:00:00", "payload": _chart(50.0, 0.0)},
+    ])
+
+    assert index.query("sun", 100.0, 1.0) == {"a"}
+    assert index.query("sun", 50.0, 1.0) == set()
+
+
+def test_match_aspects():
+    """A transit finds users via every aspect point"""
+    index = LongitudeIndex.from_rows(PLANETS, [
+        {"user_id": "conj", "payload": _chart(100.0, 300.0)},
+        {"user_id": "square", "payload": _chart(10.0, 300.0)},
+        {"user_id": "none", "payload": _chart(135.0, 255.0)},
+    ])
+
+    hits = index.match(100.0, AstroService.ASPECTS)
+
+    assert ("sun", "conjunction") in hits["conj"]
+    assert ("sun", "square") in hits["square"]
+    assert "none" not in hits
+
+
+def test_snapshot_roundtrip(tmp_path, charts):
+    """A saved snapshot answers the same queries after loading"""
+    index = LongitudeIndex.from_rows(
+        PLANETS, ({"user_id": u, "payload": c} for u, c in charts.items())
+    )
+    index.upsert("late-user", _chart(42.0, 42.0))
+    path = str(tmp_path / "index.npz")
+    index.save(path)
+
+    loaded = LongitudeIndex.load(path)
+
+    assert len(loaded) == len(index)
+    assert loaded.query("moon", 42.0, 5.0) == index.query("moon", 42.0, 5.0)
+    assert "late-user" in loaded.query("sun", 42.0, 0.1)
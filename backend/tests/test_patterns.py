@@ -0,0 +1,99 @@
+"""Tests for aspect-pattern detection"""
+
+from datetime import datetime, timezone
+from itertools import combinations, permutations
+import numpy as np
+from app.services.astro import AstroService
+from app.services.patterns import PATTERN_TYPES, QUINCUNX, STELLIUM_MIN_PLANETS, detect_patterns
+
+
+def _aspect(a, b, angle, orb):
+    separation = abs(a - b)
+    separation = 360 - separation if separation > 180 else separation
+    return abs(separation - angle) <= orb
+
+
+def reference_patterns(lons):
+    """Combinatorial loops over planet triples"""
+    aspects = {name: (angle, orb) for name, angle, orb in AstroService.ASPECTS + [QUINCUNX]}
+    is_ = lambda name, a, b: _aspect(lons[a], lons[b], *aspects[name])
+    found = set()
+
+    for i, j, k in combinations(range(len(lons)), 3):
+        if is_("trine", i, j) and is_("trine", i, k) and is_("trine", j, k):
+            found.add(("grand_trine", frozenset((i, j, k)), -1))
+    for i, j, k in permutations(range(len(lons)), 3):
+        if i < j and is_("opposition", i, j) and is_("square", i, k) and is_("square", j, k):
+            found.add(("t_square", frozenset((i, j, k)), k))
+        if i < j and is_("sextile", i, j) and is_("quincunx", i, k) and is_("quincunx", j, k):
+            found.add(("yod", frozenset((i, j, k)), k))
+
+    signs = [int(lon // 30) for lon in lons]
+    for sign in set(signs):
+        members = frozenset(i for i, s in enumerate(signs) if s == sign)
+        if len(members) >= STELLIUM_MIN_PLANETS:
+            found.add(("stellium", members, -1))
+    return found
+
+
+def test_patterns_match_combinatorial_search():
+    """Bitmask search equals the triple loop on random charts"""
+    rng = np.random.default_rng(9)
+    lons = rng.uniform(0, 360, (300, 10))
+    signs = (lons // 30).astype(np.int8)
+
+    hits = detect_patterns(lons, signs, AstroService.ASPECTS, chunk_size=64)
+
+    for chart in range(len(lons)):
+        selected = hits.chart == chart
+        actual = {
+            (PATTERN_TYPES[kind], frozenset(b for b in range(10) if (members >> b) & 1), apex)
+            for kind, members, apex in zip(
+                hits.kind[selected].tolist(), hits.members[selected].tolist(), hits.apex[selected].tolist()
+            )
+        }
+        assert actual == reference_patterns(lons[chart].tolist())
+
+
+def test_known_patterns():
+    """Textbook configurations are detected with the right apex"""
+    names = [name for _, name in AstroService.PLANETS]
+    nan = np.nan
+    lons = np.array([
+        [10, 130, 250, nan, nan, nan, nan, nan, nan, nan],   # grand trine
+        [0, nan, nan, 180, 90, nan, nan, nan, nan, nan],     # T-square, apex mars
+        [0, 60, nan, nan, nan, nan, nan, nan, nan, 210],     # yod, apex pluto
+        [1, 5, 9, 40, nan, nan, nan, nan, nan, nan],         # stellium in Aries
+    ])
+    signs = np.where(np.isnan(lons), -1, lons // 30).astype(np.int8)
+
+    hits = detect_patterns(lons, signs, AstroService.ASPECTS)
+    found = [
+        (c, PATTERN_TYPES[k], tuple(n for b, n in enumerate(names) if (m >> b) & 1), names[a] if a >= 0 else None)
+        for c, k, m, a in zip(hits.chart.tolist(), hits.kind.tolist(), hits.members.tolist(), hits.apex.tolist())
+    ]
+
+    assert (0, "grand_trine", ("sun", "moon", "mercury"), None) in found
+    assert (1, "t_square", ("sun", "venus", "mars"), "mars") in found
+    assert (2, "yod", ("sun", "moon", "pluto"), "pluto") in found
+    assert (3, "stellium", ("sun", "moon", "mercury"), None) in found
+
+
+def test_payloads_include_patterns():
+    """Natal payloads carry patterns on request; transit patterns mix natal and sky"""
+    service = AstroService()
+    birth_utc = datetime(1990, 6, 15, 14, 30, tzinfo=timezone.utc)
+
+    assert "patterns" not in service.calculate_natal_chart(birth_utc, 52.52, 13.40)
+
+    natal_chart = service.calculate_natal_chart(birth_utc, 52.52, 13.40, include_patterns=True)
+    assert all(set(p) == {"type", "planets", "apex"} for p in natal_chart["patterns"])
+    assert service.detect_patterns_batch([natal_chart, {"planets": {}}]) == [natal_chart["patterns"], []]
+
+    transit_date = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    assert service.calculate_transits(natal_chart, transit_date).patterns == []
+
+    transits = service.calculate_transits(natal_chart, transit_date, include_patterns=True)
+    for pattern in transits.patterns:
+        transit = [p for p in pattern.planets if p.startswith("transit_")]
+        assert transit and len(transit) < len(pattern.planets)
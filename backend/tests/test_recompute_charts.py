@@ -0,0 +1,132 @@
+"""Tests for the engine version recompute job"""
+
+from copy import deepcopy
+from datetime import datetime, timezone
+from unittest.mock import Mock
+import pytest
+from app.jobs.recompute_charts import diff_payloads, recompute_natal_charts
+from app.services.astro import AstroService
+from app.services.chart_codec import decode_payload
+
+BIRTH_UTC = datetime(1990, 6, 15, 14, 30, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def job_supabase(mock_supabase):
+    mock_supabase.gt = Mock(return_value=mock_supabase)
+    mock_supabase.neq = Mock(return_value=mock_supabase)
+    mock_supabase.in_ = Mock(return_value=mock_supabase)
+    mock_supabase.upsert = Mock(return_value=mock_supabase)
+    return mock_supabase
+
+
+def _upserts(mock_supabase, table):
+    """Upsert payloads sent to a table, in call order"""
+    calls = []
+    table_name = None
+    for name, args, _ in mock_supabase.mock_calls:
+        if name == "table":
+            table_name = args[0]
+        elif name == "upsert" and table_name == table:
+            calls.append(args[0])
+    return calls
+
+
+def _chart_row(chart_id, user_id, payload, computed_at="2024-01-01T00:00:00+00:00"):
+    return {
+        "id": chart_id,
+        "user_id": user_id,
+        "computed_at": computed_at,
+        "engine_version": "swisseph-2.08",
+        "house_system": "placidus",
+        "payload": payload
+    }
+
+
+def _birth_row(user_id, updated_at="2023-12-31T00:00:00+00:00"):
+    return {"user_id": user_id, "birth_utc": BIRTH_UTC.isoformat(), "lat": "52.520000", "lon": "13.400000", "updated_at": updated_at}
+
+
+def test_recompute_diffs_and_writes_in_bulk(job_supabase):
+    """Outdated charts are recomputed from birth data and upserted per page"""
+    current = AstroService().calculate_natal_chart(BIRTH_UTC, 52.52, 13.40, include_patterns=True)
+    shifted = deepcopy(current)
+    shifted["planets"]["moon"]["lon_absolute"] -= 0.5
+    shifted["planets"]["moon"]["house"] = 1
+
+    job_supabase.execute.side_effect = [
+        Mock(data=[]),  # no checkpoint
+        Mock(data=[
+            _chart_row("c1", "u1", current),
+            _chart_row("c2", "u2", shifted),
+            _chart_row("c3", "u3", current),
+            _chart_row("c4", "u1", current, computed_at="2023-06-01T00:00:00+00:00"),
+        ]),
+        Mock(data=[_birth_row("u1"), _birth_row("u2")]),
+        Mock(data=[]),  # chart upsert
+        Mock(data=[]),  # checkpoint
+        Mock(data=[]),  # final checkpoint
+    ]
+
+    counts = recompute_natal_charts(job_supabase, batch_size=10, max_workers=1)
+
+    assert (counts["updated"], counts["unchanged"], counts["changed"]) == (2, 1, 1)
+    assert counts["skipped"] == {"no_birth_data": 1, "birth_data_changed": 1, "house_system": 0}
+    job_supabase.neq.assert_called_once_with("engine_version", AstroService.ENGINE_VERSION)
+
+    [updates] = _upserts(job_supabase, "natal_charts")
+    assert [row["id"] for row in updates] == ["c1", "c2"]
+    for row in updates:
+        assert row["engine_version"] == AstroService.ENGINE_VERSION
+        assert row["payload"] == current
+        assert "computed_at" not in row
+        assert dict(decode_payload(row["payload_v2"]))["planets"] == current["planets"]
+
+    checkpoints = _upserts(job_supabase, "batch_job_checkpoints")
+    assert [(c["cursor"], c["processed"]) for c in checkpoints] == [("c4", 4), ("c4", 4)]
+    assert checkpoints[-1]["run_key"] == AstroService.ENGINE_VERSION
+
+
+def test_dry_run_writes_nothing(job_supabase):
+    """A dry run only diffs"""
+    current = AstroService().calculate_natal_chart(BIRTH_UTC, 52.52, 13.40, include_patterns=True)
+    job_supabase.execute.side_effect = [
+        Mock(data=[_chart_row("c1", "u1", current)]),
+        Mock(data=[_birth_row("u1")]),
+    ]
+
+    counts = recompute_natal_charts(job_supabase, batch_size=10, max_workers=1, dry_run=True)
+
+    assert counts["updated"] == 0 and counts["unchanged"] == 1
+    job_supabase.upsert.assert_not_called()
+
+
+def test_recompute_resumes_from_checkpoint(job_supabase):
+    """An interrupted run continues after the last committed chart"""
+    job_supabase.execute.side_effect = [
+        Mock(data=[{"cursor": "c4", "processed": 4, "finished_at": None}]),
+        Mock(data=[]),  # nothing left
+        Mock(data=[]),  # final checkpoint
+    ]
+
+    recompute_natal_charts(job_supabase)
+
+    job_supabase.gt.assert_called_once_with("id", "c4")
+
+
+def test_diff_payloads():
+    """Sign, house and shift changes are reported; rounding noise is not"""
+    old = AstroService().calculate_natal_chart(BIRTH_UTC, 52.52, 13.40, include_patterns=True)
+    assert diff_payloads(old, deepcopy(old)) is None
+
+    new = deepcopy(old)
+    new["planets"]["sun"]["lon_absolute"] += 0.00005
+    assert diff_payloads(old, new) is None
+
+    new["planets"]["sun"]["house"] = 12 if old["planets"]["sun"]["house"] != 12 else 1
+    new["ascendant"]["sign"] = "Fische" if old["ascendant"]["sign"] != "Fische" else "Widder"
+    new["ascendant"]["lon_absolute"] = (old["ascendant"]["lon_absolute"] + 359.0) % 360
+    diff = diff_payloads(old, new)
+    assert diff["houses"] == ["sun"]
+    assert diff["signs"] == ["ascendant"]
+    assert diff["max_shift"] == pytest.approx(1.0)
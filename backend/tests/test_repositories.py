@@ -0,0 +1,181 @@
+"""Tests for the async repository layer"""
+
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+from uuid import UUID
+import threading
+import pytest
+from app.config import settings
+from app.dependencies import get_repositories, get_supabase
+from app.repositories.postgres import _row, postgres_repositories
+from app.repositories.supabase import SupabaseEntitlementsRepository, supabase_repositories
+from app.services.astro import AstroService
+from app.services.chart_codec import encode_payload
+
+USER_ID = "550e8400-e29b-41d4-a716-446655440000"
+
+
+def _request(repositories, overrides=None):
+    app = SimpleNamespace(state=SimpleNamespace(repositories=repositories), dependency_overrides=overrides or {})
+    return SimpleNamespace(app=app)
+
+
+def test_get_repositories_prefers_pool_unless_supabase_overridden(mock_supabase):
+    """The asyncpg repositories are used unless get_supabase is overridden"""
+    pooled = postgres_repositories(Mock())
+
+    assert get_repositories(_request(pooled), mock_supabase) is pooled
+
+    fallback = get_repositories(_request(pooled, {get_supabase: lambda: mock_supabase}), mock_supabase)
+    assert fallback is not pooled
+    assert fallback.entitlements.supabase is mock_supabase
+
+    assert get_repositories(_request(None), mock_supabase).profiles.supabase is mock_supabase
+
+
+@pytest.mark.asyncio
+async def test_supabase_queries_run_off_the_event_loop(mock_supabase):
+    """The synchronous client is called from a worker thread"""
+    loop_thread = threading.get_ident()
+    threads = []
+
+    def execute():
+        threads.append(threading.get_ident())
+        return Mock(data=[{"user_id": USER_ID, "voice_minutes_used": 4}])
+
+    mock_supabase.execute.side_effect = execute
+
+    row = await SupabaseEntitlementsRepository(mock_supabase).get(USER_ID)
+
+    assert row["voice_minutes_used"] == 4
+    assert threads and loop_thread not in threads
+
+
+@pytest.mark.asyncio
+async def test_supabase_usage_is_one_rpc(mock_supabase):
+    """The Supabase fallback books usage through the ledger function too"""
+    mock_supabase.rpc = Mock(return_value=mock_supabase)
+    mock_supabase.execute.return_value = Mock(data=True)
+    ended_at = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+    recorded = await supabase_repositories(mock_supabase).voice_usage.record("vs_1", USER_ID, "conv_1", 150, 3, ended_at)
+
+    assert recorded
+    assert mock_supabase.rpc.call_args.args[0] == "record_voice_usage"
+    assert mock_supabase.rpc.call_args.args[1]["p_minutes"] == 3
+    mock_supabase.table.assert_not_called()
+    mock_supabase.update.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_postgres_usage_is_one_atomic_call():
+    """The webhook's accounting is a single function call; repeats book nothing"""
+    pool = Mock()
+    pool.fetchval = AsyncMock(return_value=True)
+    usage = postgres_repositories(pool).voice_usage
+    ended_at = datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+
+    assert await usage.record("vs_1", USER_ID, "conv_1", 150, 3, ended_at) is True
+    pool.fetchval.assert_awaited_once()
+    assert "record_voice_usage" in pool.fetchval.await_args.args[0]
+    assert pool.fetchval.await_args.args[1:] == ("vs_1", USER_ID, "conv_1", 150, 3, ended_at)
+
+    pool.fetchval.return_value = False
+    assert await usage.record("vs_1", USER_ID, "conv_1", 150, 3, ended_at) is False
+
+
+def test_postgres_rows_match_postgrest_shape():
+    """UUIDs, timestamps and numerics come back as JSON values"""
+    record = {
+        "user_id": UUID(USER_ID),
+        "started_at": datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+        "lat": Decimal("52.520000"),
+        "status": "active"
+    }
+
+    assert _row(record) == {
+        "user_id": USER_ID,
+        "started_at": "2025-01-02T03:04:05+00:00",
+        "lat": 52.52,
+        "status": "active"
+    }
+    assert _row(None) is None
+
+
+@pytest.mark.asyncio
+async def test_postgres_birth_data_shape():
+    """Birth data comes back as PostgREST would return it"""
+    pool = Mock()
+    pool.fetchrow = AsyncMock(return_value={
+        "birth_utc": datetime(1990, 6, 15, 14, 30, tzinfo=timezone.utc),
+        "lat": Decimal("52.520000"),
+        "lon": Decimal("13.400000")
+    })
+
+    birth = await postgres_repositories(pool).birth_data.get(USER_ID)
+
+    assert birth == {"birth_utc": "1990-06-15T14:30:00+00:00", "lat": 52.52, "lon": 13.4}
+    assert pool.fetchrow.await_args.args[1:] == (USER_ID,)
+
+
+@pytest.mark.asyncio
+async def test_postgres_latest_payload_single_round_trip(monkeypatch):
+    """The v2 payload is decoded; JSON is only used for rows without it"""
+    monkeypatch.setattr(settings, "natal_payload_v2_reads", True)
+    payload = AstroService().calculate_natal_chart(datetime(1990, 6, 15, 14, 30, tzinfo=timezone.utc), 52.52, 13.40)
+    pool = Mock()
+    pool.fetchrow = AsyncMock(return_value={"payload_v2": encode_payload(payload), "payload": None})
+    charts = postgres_repositories(pool).natal_charts
+
+    loaded = await charts.latest_payload(USER_ID)
+
+    assert dict(loaded)["planets"] == payload["planets"]
+    pool.fetchrow.assert_awaited_once()
+    assert pool.fetchrow.await_args.args[1:] == (USER_ID, None)
+
+    pool.fetchrow.return_value = {"payload_v2": None, "payload": payload}
+    assert await charts.latest_payload(USER_ID, chart_id="chart-1") == payload
+
+
+@pytest.mark.asyncio
+async def test_postgres_bootstrap_single_round_trip():
+    """Session bootstrap is one function call returning a typed error or the context"""
+    pool = Mock()
+    pool.fetchval = AsyncMock(return_value={"error": "minutes_exhausted"})
+    sessions = postgres_repositories(pool).voice_sessions
+
+    refused = await sessions.bootstrap("vs_1", USER_ID, "warm", "v1.0.0", "127.0.0.1", "pytest")
+
+    assert refused.error == "minutes_exhausted"
+    pool.fetchval.assert_awaited_once()
+    assert pool.fetchval.await_args.args[1:] == ("vs_1", USER_ID, "warm", "v1.0.0", "127.0.0.1", "pytest")
+
+    pool.fetchval.return_value = {
+        "error": None,
+        "entitlements": {"plan": "premium", "voice_minutes_monthly": 60, "voice_minutes_used": 12},
+        "natal_chart": {"planets": {}},
+        "display_name": "Anna",
+        "locale": None
+    }
+    started = await sessions.bootstrap("vs_2", USER_ID, "warm", "v1.0.0")
+
+    assert started.error is None
+    assert started.entitlements["voice_minutes_used"] == 12
+    assert started.display_name == "Anna" and started.locale is None
+
+
+@pytest.mark.asyncio
+async def test_supabase_bootstrap_uses_rpc_when_enabled(mock_supabase, monkeypatch):
+    """With VOICE_SESSION_BOOTSTRAP_RPC the SQL function replaces the query sequence"""
+    monkeypatch.setattr(settings, "voice_session_bootstrap_rpc", True)
+    mock_supabase.rpc = Mock(return_value=mock_supabase)
+    mock_supabase.execute.return_value = Mock(data={"error": "consent_outdated"})
+
+    result = await supabase_repositories(mock_supabase).voice_sessions.bootstrap("vs_1", USER_ID, "warm", "v1.0.0")
+
+    assert result.error == "consent_outdated"
+    assert mock_supabase.rpc.call_args.args[0] == "bootstrap_voice_session"
+    assert mock_supabase.rpc.call_args.args[1]["p_session_id"] == "vs_1"
+    mock_supabase.table.assert_not_called()
@@ -0,0 +1,227 @@
+"""Tests for the get_context tool: session context cache and concurrent data branches"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock, patch
+import asyncio
+import threading
+import time
+import pytest
+from app.config import settings
+from app.routers.elevenlabs import _gather_branches
+from app.services.session_context import SessionContext, SessionContextCache, session_context_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    session_context_cache.clear()
+    yield
+    session_context_cache.clear()
+
+
+@pytest.fixture
+def voice_supabase(mock_supabase, sample_voice_consent, sample_entitlements, sample_natal_chart):
+    """Supabase mock answering by table, for session creation and fallbacks"""
+    session_row = {
+        "id": "vs_db",
+        "user_id": sample_natal_chart["user_id"],
+        "status": "active",
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "elevenlabs_conversation_id": None
+    }
+
+    # Queries may run concurrently in worker threads: answer by the table
+    # the calling thread selected
+    selected = threading.local()
+
+    def table(name):
+        selected.name = name
+        return mock_supabase
+
+    def execute():
+        table = selected.name
+        if table == "voice_consents":
+            return Mock(data=[sample_voice_consent])
+        if table == "entitlements":
+            return Mock(data=[sample_entitlements])
+        if table == "natal_charts":
+            return Mock(data=[{"id": "chart-123", "payload_v2": None, **sample_natal_chart}])
+        if table == "profiles":
+            return Mock(data=[{"display_name": "TestUser", "locale": "de"}])
+        if table == "voice_sessions":
+            return Mock(data=[session_row])
+        return Mock(data=[])
+
+    mock_supabase.table.side_effect = table
+    mock_supabase.execute.side_effect = execute
+    mock_supabase.session_row = session_row
+    return mock_supabase
+
+
+def _tool_call(client, session_id, data_types):
+    with patch("app.routers.elevenlabs.validate_elevenlabs_signature", return_value=True):
+        return client.post(
+            "/v1/elevenlabs/tool/get_context",
+            json={"session_id": session_id, "conversation_id": "conv_1", "parameters": {"data_types": data_types}}
+        )
+
+
+def _tables(mock_supabase):
+    return [call.args[0] for call in mock_supabase.table.call_args_list]
+
+
+def test_cache_expiry_and_hit_rate():
+    """Entries expire with the signed URL and count hits and misses"""
+    cache = SessionContextCache(max_entries=2)
+    context = SessionContext(user_id="u1", display_name="A", locale="de", natal_chart=None)
+
+    cache.put("s1", context, datetime.now(timezone.utc) + timedelta(minutes=5))
+    cache.put("s2", context, datetime.utcnow() - timedelta(seconds=1))  # already expired
+
+    assert cache.get("s1") is context
+    assert cache.get("s2") is None
+
+    cache.invalidate("s1")
+    assert cache.get("s1") is None
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 2, pytest.approx(1 / 3, abs=1e-4))
+
+
+def test_warm_tool_call_reads_nothing(client, voice_supabase):
+    """A session created on this worker serves tool calls without DB reads"""
+    session_id = client.post("/v1/voice/session", json={"voice_mode": "analytical"}).json()["session_id"]
+    voice_supabase.table.reset_mock()
+
+    response = _tool_call(client, session_id, ["profile", "natal_chart", "current_transits"])
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["user_context"] == {"display_name": "TestUser", "locale": "de"}
+    assert data["natal_chart"]["sun"] == {"sign": "Zwillinge", "degree": 24.3, "house": 10}
+    assert "current_transits" in data
+
+    # Only writes: conversation id (background, first call) and the audit log
+    assert sorted(_tables(voice_supabase)) == ["voice_audit_logs", "voice_sessions"]
+    voice_supabase.update.assert_called_once_with({"elevenlabs_conversation_id": "conv_1"})
+
+    voice_supabase.table.reset_mock()
+    assert _tool_call(client, session_id, ["natal_chart"]).status_code == 200
+    assert _tables(voice_supabase) == ["voice_audit_logs"]
+    assert session_context_cache.stats()["hits"] == 2
+
+
+def test_cold_tool_call_loads_and_caches(client, voice_supabase):
+    """Another worker's session is loaded once, then served from the cache"""
+    assert _tool_call(client, "vs_db", ["profile"]).json()["user_context"]["display_name"] == "TestUser"
+    assert {"voice_sessions", "profiles", "natal_charts"} <= set(_tables(voice_supabase))
+
+    voice_supabase.table.reset_mock()
+    _tool_call(client, "vs_db", ["profile"])
+    assert _tables(voice_supabase) == ["voice_audit_logs"]
+
+
+def _answer_empty(voice_supabase, empty_table):
+    """Wrap the table mock: no rows for `empty_table`"""
+    selected = threading.local()
+    table, execute = voice_supabase.table.side_effect, voice_supabase.execute.side_effect
+
+    def select(name):
+        selected.name = name
+        return table(name)
+
+    def answer():
+        if selected.name == empty_table:
+            return Mock(data=[])
+        return execute()
+
+    voice_supabase.table.side_effect = select
+    voice_supabase.execute.side_effect = answer
+
+
+def test_tool_call_without_profile_omits_user_context(client, voice_supabase):
+    """Users without a profile row get no user_context, as before the cache"""
+    _answer_empty(voice_supabase, "profiles")
+
+    data = _tool_call(client, "vs_db", ["profile", "natal_chart"]).json()
+
+    assert "user_context" not in data
+    assert "natal_chart" in data
+
+
+def test_post_call_webhook_invalidates(client, voice_supabase):
+    """The post-call webhook drops the session's context"""
+    session_id = client.post("/v1/voice/session", json={"voice_mode": "analytical"}).json()["session_id"]
+    voice_supabase.session_row["id"] = session_id
+    assert session_context_cache.stats()["entries"] == 1
+
+    with patch("app.routers.elevenlabs.validate_elevenlabs_signature", return_value=True):
+        response = client.post("/v1/elevenlabs/webhook/post-call", json={
+            "conversation_id": "conv_1",
+            "session_id": session_id,
+            "duration_seconds": 90,
+            "ended_at": datetime.now(timezone.utc).isoformat(),
+            "status": "done"
+        })
+
+    assert response.status_code == 200
+    assert session_context_cache.stats()["entries"] == 0
+
+
+def test_slow_branch_is_marked_unavailable(client, voice_supabase, monkeypatch):
+    """A branch that exceeds its timeout is reported; the others are returned"""
+    session_id = client.post("/v1/voice/session", json={"voice_mode": "analytical"}).json()["session_id"]
+    monkeypatch.setattr(settings, "context_branch_timeout_seconds", 0.05)
+
+    async def slow_transits(*args, **kwargs):
+        await asyncio.sleep(1)
+
+    with patch("app.services.astro_engine.AstroEngine.session_transits", side_effect=slow_transits):
+        response = _tool_call(client, session_id, ["profile", "natal_chart", "current_transits"])
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["unavailable"] == ["current_transits"]
+    assert data["user_context"]["display_name"] == "TestUser"
+    assert "sun" in data["natal_chart"]
+    assert "current_transits" not in data
+
+
+@pytest.mark.asyncio
+async def test_branches_run_concurrently():
+    """Gathering takes as long as the slowest branch, not the sum"""
+    async def branch(value):
+        await asyncio.sleep(0.2)
+        return value
+
+    async def failing():
+        raise RuntimeError("boom")
+
+    started = time.perf_counter()
+    results, unavailable = await _gather_branches(
+        {"profile": branch(1), "natal_chart": branch(2), "current_transits": failing()},
+        timeout=1.0
+    )
+
+    assert time.perf_counter() - started < 0.35
+    assert results == {"profile": 1, "natal_chart": 2}
+    assert unavailable == ["current_transits"]
+
+
+def test_repeated_post_call_webhook_books_nothing(client, voice_supabase):
+    """A webhook for a session whose usage is already recorded changes nothing"""
+    voice_supabase.rpc = Mock(return_value=Mock(execute=Mock(return_value=Mock(data=False))))
+
+    with patch("app.routers.elevenlabs.validate_elevenlabs_signature", return_value=True):
+        response = client.post("/v1/elevenlabs/webhook/post-call", json={
+            "conversation_id": "conv_1",
+            "session_id": "vs_db",
+            "duration_seconds": 90,
+            "ended_at": datetime.now(timezone.utc).isoformat(),
+            "status": "done"
+        })
+
+    assert response.json() == {"status": "ok", "minutes_used": 0}
+    assert voice_supabase.rpc.call_args.args[0] == "record_voice_usage"
+    assert voice_supabase.rpc.call_args.args[1]["p_minutes"] == 2
+    assert "voice_audit_logs" not in _tables(voice_supabase)
+    voice_supabase.update.assert_not_called()
@@ -0,0 +1,78 @@
+"""Tests for the shared sky cache"""
+
+import pytest
+import swisseph as swe
+from app.services.astro import AstroService
+from app.services.sky_cache import SkyCache
+from datetime import datetime, timezone, timedelta
+
+
+def test_positions_match_swisseph():
+    """Cached positions equal a direct calculation at the bucket start"""
+    cache = SkyCache(AstroService.PLANETS, bucket_seconds=60)
+    moment = datetime(2025, 3, 1, 12, 30, 45, tzinfo=timezone.utc)
+
+    positions = cache.get(moment)
+
+    assert positions.computed_at == datetime(2025, 3, 1, 12, 30, tzinfo=timezone.utc)
+
+    jd = swe.julday(2025, 3, 1, 12 + 30 / 60.0)
+    result, _ = swe.calc_ut(jd, swe.MARS)
+    assert positions.longitudes["mars"] == result[0]
+    assert positions.speeds["mars"] == result[3]
+
+
+def test_hits_misses_and_precompute():
+    """Same bucket is a hit, the bucket after "now" is precomputed in the background"""
+    cache = SkyCache(AstroService.PLANETS, bucket_seconds=3600)
+
+    first = cache.get()
+    cache.wait()
+    bucket = first.bucket
+    assert cache.get(cache.bucket_start(bucket)) is first
+
+    # Rollover into the precomputed bucket is a hit
+    cache.get(cache.bucket_start(bucket + 1))
+
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 2
+    assert stats["precomputed"] == 1
+
+
+def test_explicit_moments_are_not_precomputed():
+    """Past or future moments only compute their own bucket"""
+    cache = SkyCache(AstroService.PLANETS, bucket_seconds=60)
+    moment = datetime(2025, 3, 1, 12, 0, 5, tzinfo=timezone.utc)
+
+    cache.get(moment)
+    cache.wait()
+
+    assert cache.stats()["entries"] == 1
+    assert cache.stats()["precomputed"] == 0
+
+
+def test_bounded_size():
+    """Cache never holds more than max_entries buckets"""
+    cache = SkyCache(AstroService.PLANETS, bucket_seconds=60, max_entries=4)
+    moment = datetime(2025, 3, 1, tzinfo=timezone.utc)
+
+    for i in range(10):
+        cache.get(moment + timedelta(minutes=i * 5))
+
+    assert cache.stats()["entries"] == 4
+
+
+def test_naive_datetime_is_utc():
+    """Naive datetimes are treated as UTC"""
+    cache = SkyCache(AstroService.PLANETS, bucket_seconds=3600)
+
+    naive = cache.bucket_for(datetime(2025, 3, 1, 12, 0))
+    aware = cache.bucket_for(datetime(2025, 3, 1, 12, 0, tzinfo=timezone.utc))
+    assert naive == aware
+
+
+def test_invalid_bucket_size():
+    """Bucket size must be positive"""
+    with pytest.raises(ValueError):
+        SkyCache(AstroService.PLANETS, bucket_seconds=0)
@@ -0,0 +1,70 @@
+"""Tests for synastry scoring"""
+
+import numpy as np
+from app.services.astro import AstroService
+from app.services.synastry import ASPECT_WEIGHTS, SynastryKernel
+
+
+def reference_score(lons_a, lons_b):
+    """Per-pair Python loop over planets and aspects"""
+    score = 0.0
+    for lon_a in lons_a:
+        for lon_b in lons_b:
+            separation = abs(lon_a - lon_b)
+            if separation > 180:
+                separation = 360 - separation
+            for name, angle, orb in AstroService.ASPECTS:
+                deviation = abs(separation - angle)
+                if deviation <= orb:
+                    score += ASPECT_WEIGHTS[name] * (1 - deviation / orb)
+    return score
+
+
+def test_score_matches_reference():
+    """Tiled one-vs-N scores equal the per-pair loop"""
+    rng = np.random.default_rng(3)
+    chart = rng.uniform(0, 360, 10)
+    candidates = rng.uniform(0, 360, (50, 10))
+    kernel = SynastryKernel(AstroService.ASPECTS)
+
+    scores = kernel.score(chart, candidates, tile_size=7)
+
+    expected = [reference_score(chart, candidate) for candidate in candidates]
+    np.testing.assert_allclose(scores, expected, atol=1e-4)
+
+
+def test_matrix_is_symmetric_and_consistent():
+    """The cohort matrix matches one-vs-N scoring for every row"""
+    rng = np.random.default_rng(5)
+    lons = rng.uniform(0, 360, (40, 10))
+    lons[3, 2] = np.nan
+    kernel = SynastryKernel(AstroService.ASPECTS)
+
+    matrix = kernel.matrix(lons, tile_size=16)
+
+    assert matrix.shape == (40, 40)
+    assert np.isnan(np.diag(matrix)).all()
+    np.testing.assert_allclose(matrix, matrix.T, equal_nan=True)
+
+    row = kernel.score(lons[3], lons)
+    mask = np.arange(40) != 3
+    np.testing.assert_allclose(matrix[3, mask], row[mask], rtol=1e-5, atol=1e-4)
+
+
+def test_calculate_synastry(sample_natal_chart):
+    """Chart-to-chart aspects use the payload format"""
+    service = AstroService()
+    other = {"planets": {
+        "venus": {"lon_absolute": 204.3},   # trine sun (84.3)
+        "mars": {"lon_absolute": 342.1},    # conjunct moon
+    }}
+
+    aspects = service.calculate_synastry(sample_natal_chart["payload"], other)
+    found = {(a.type, a.planet_a, a.planet_b) for a in aspects}
+
+    assert ("trine", "sun", "venus") in found
+    assert ("conjunction", "moon", "mars") in found
+
+    scores = service.compatibility_scores(sample_natal_chart["payload"], [other, {"planets": {}}])
+    assert scores[0] > 0
+    assert scores[1] == 0
@@ -0,0 +1,95 @@
+"""Tests for incremental per-conversation transit state"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import Mock
+import numpy as np
+from app.services.astro import AstroService, sky_cache
+from app.services.transit_session import TransitSession, TransitSessionStore
+
+PLANET_NAMES = [name for _, name in AstroService.PLANETS]
+START = datetime(2024, 3, 20, 12, 0, tzinfo=timezone.utc)
+
+
+def _natal_chart():
+    return AstroService().calculate_natal_chart(datetime(1990, 6, 15, 14, 30, tzinfo=timezone.utc), 52.52, 13.40)
+
+
+def _key(aspects):
+    return [(a.transit_planet, a.type, a.natal_planet) for a in aspects]
+
+
+def test_boundary_distance_bounds_aspect_changes():
+    """Moving less than the boundary distance never changes the matched aspects"""
+    kernel = AstroService.aspect_kernel
+    rng = np.random.default_rng(7)
+    natal = rng.uniform(0, 360, 10)
+
+    for transit in rng.uniform(0, 360, 200):
+        margin = kernel.boundary_distance(np.array([transit]), natal)[0]
+        before = kernel.match(np.array([transit]), natal)
+        for step in (-0.99 * margin, 0.99 * margin):
+            after = kernel.match(np.array([(transit + step) % 360]), natal)
+            assert (before.natal.tolist(), before.aspect.tolist()) == (after.natal.tolist(), after.aspect.tolist())
+
+
+def test_incremental_matches_full_calculation():
+    """Aspects over a conversation equal a full calculation at each step"""
+    service = AstroService()
+    natal_chart = _natal_chart()
+    session = TransitSession(natal_chart, PLANET_NAMES)
+
+    moment = START
+    for minutes in (0, 1, 3, 10, 30, 120, 600):
+        moment = START + timedelta(minutes=minutes)
+        aspects, _ = service.evaluate_transit_session(session, moment)
+        full = service.calculate_transits(natal_chart, moment)
+        assert _key(aspects) == _key(full.aspects)
+
+
+def test_unchanged_planets_are_not_rechecked():
+    """Calls within minutes only re-check planets near an orb boundary"""
+    service = AstroService()
+    session = TransitSession(_natal_chart(), PLANET_NAMES)
+
+    first, rechecked = service.evaluate_transit_session(session, START)
+    assert rechecked == len(PLANET_NAMES)
+
+    again, rechecked = service.evaluate_transit_session(session, START)
+    assert rechecked == 0
+    assert again == first
+
+    _, rechecked = service.evaluate_transit_session(session, START + timedelta(minutes=2))
+    assert rechecked < len(PLANET_NAMES)
+
+    # Requesting exact dates for the first time forces a full evaluation
+    _, rechecked = service.evaluate_transit_session(session, START + timedelta(minutes=2), resolve_exact_dates=True)
+    assert rechecked == len(PLANET_NAMES)
+
+
+def test_session_expires_after_max_age(monkeypatch):
+    """Every planet is re-checked once its evaluation is older than the max age"""
+    service = AstroService()
+    session = TransitSession(_natal_chart(), PLANET_NAMES)
+    service.evaluate_transit_session(session, START)
+
+    later = START + timedelta(seconds=sky_cache.bucket_seconds * 20)
+    monkeypatch.setattr("app.services.astro.settings.transit_session_max_age_seconds", 60)
+    _, rechecked = service.evaluate_transit_session(session, later)
+
+    assert rechecked == len(PLANET_NAMES)
+
+
+def test_store_loads_natal_chart_once():
+    """The natal chart is fetched on first use and dropped on discard"""
+    store = TransitSessionStore(max_sessions=2)
+    loader = Mock(return_value=_natal_chart())
+
+    session = store.get_or_create("s1", loader, PLANET_NAMES)
+    assert store.get_or_create("s1", loader, PLANET_NAMES) is session
+    assert loader.call_count == 1
+
+    store.discard("s1")
+    assert store.get_or_create("s1", loader, PLANET_NAMES) is not session
+    assert loader.call_count == 2
+
+    assert store.get_or_create("s2", Mock(return_value=None), PLANET_NAMES) is None